@@ -42,6 +42,9 @@ def main() -> int:
     if cmd == "er":
         from src.combo.er.cli import main as er_main
         return er_main(args[1:])
+    if cmd == "coref":
+        from src.combo.coref.cli import main as coref_main
+        return coref_main(args[1:])
     if cmd == "fourw":
         from src.combo.docprops.aggregate_4w import main as fourw_main
         return fourw_main(args[1:])
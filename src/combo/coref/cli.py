@@ -4,7 +4,8 @@ import argparse
 import json
 import os
 from collections import Counter, defaultdict
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 
 from .within_doc import resolve_coref, _derive_mention_features
 
@@ -99,7 +100,62 @@ def _build_chains(ents: List[Dict[str, Any]]) -> Dict[str, List[str]]:
     return groups
 
 
-def process_er_dir(er_dir: str, out_dir: str, max_sent_back: int, max_mentions_back: int) -> Dict[str, Any]:
+def _doc_stats(resolved: List[Dict[str, Any]]) -> Tuple[Dict[str, int], Counter]:
+    """Computes the stats and rule histogram of a resolved document in one pass.
+
+    Args:
+        resolved: The resolved mentions of one document.
+
+    Returns:
+        A tuple of the stats (mentions, pronouns, resolved, unresolved) and
+        the histogram of fired coref rules.
+    """
+    pronouns = n_resolved = unresolved = 0
+    rules: Counter = Counter()
+    for e in resolved:
+        has_ant = bool(e.get('antecedent_mention_id'))
+        if e.get('is_pronoun'):
+            pronouns += 1
+            if not has_ant:
+                unresolved += 1
+        if has_ant:
+            n_resolved += 1
+        rules[e.get('coref_rule', 'unresolved')] += 1
+    return {'mentions': len(resolved), 'pronouns': pronouns, 'resolved': n_resolved, 'unresolved': unresolved}, rules
+
+
+def _process_doc(task: Tuple[str, str, str, int, int]) -> Tuple[Dict[str, int], Counter]:
+    """Resolves coreference for one entity file (process pool worker).
+
+    Args:
+        task: A tuple of the input directory, output directory, file name,
+            max sentences back and max mentions back.
+
+    Returns:
+        A tuple of the document stats and its rule histogram.
+    """
+    er_dir, out_dir, name, max_sent_back, max_mentions_back = task
+    ents = _read_entities(os.path.join(er_dir, name))
+    # Derive minimal features if absent
+    ents = [_derive_mention_features(e) for e in ents]
+    resolved = resolve_coref(ents, max_sent_back=max_sent_back, max_mentions_back=max_mentions_back)
+    # Write augmented entities
+    _write_jsonl(os.path.join(out_dir, name), resolved)
+    stats, rules = _doc_stats(resolved)
+    # Chains per document (approximate per file)
+    chains = _build_chains(resolved)
+    doc_id = (resolved[0].get('doc_id') if resolved else None) or 'doc'
+    chain_rows: List[Dict[str, Any]] = [{
+        'doc_id': doc_id,
+        'chains': [{'chain_id': f"{doc_id}:{i}", 'mention_ids': mids} for i, mids in enumerate(chains.values())],
+        'stats': {'mentions': stats['mentions'], 'chains': len(chains), 'resolved': stats['resolved'], 'pronouns': stats['pronouns']},
+    }]
+    out_chains = os.path.join(out_dir, os.path.splitext(name)[0] + '.coref_chains.jsonl')
+    _write_jsonl(out_chains, chain_rows)
+    return stats, rules
+
+
+def process_er_dir(er_dir: str, out_dir: str, max_sent_back: int, max_mentions_back: int, workers: int = 1) -> Dict[str, Any]:
     """Processes a directory of entity files to resolve coreferences.
 
     This function reads all `.entities.jsonl` files from the input directory,
@@ -107,6 +163,10 @@ def process_er_dir(er_dir: str, out_dir: str, max_sent_back: int, max_mentions_b
     chains to the output directory. It also generates a run report with
     statistics.
 
+    Documents are resolved in a process pool when `workers > 1`. Files are
+    processed in sorted name order and per-document stats are merged in that
+    order, so outputs and the run report do not depend on the worker count.
+
     Args:
         er_dir: The directory containing the entity files.
         out_dir: The directory to write the results to.
@@ -114,6 +174,7 @@ def process_er_dir(er_dir: str, out_dir: str, max_sent_back: int, max_mentions_b
             candidate.
         max_mentions_back: The maximum number of mentions to look back for a
             candidate.
+        workers: The number of worker processes.
 
     Returns:
         A dictionary containing statistics about the run.
@@ -122,39 +183,26 @@ def process_er_dir(er_dir: str, out_dir: str, max_sent_back: int, max_mentions_b
     out_dir = _resolve(out_dir)
     os.makedirs(out_dir, exist_ok=True)
 
+    tasks = [
+        (er_dir, out_dir, name, max_sent_back, max_mentions_back)
+        for name in sorted(os.listdir(er_dir))
+        if name.endswith('.entities.jsonl')
+    ]
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_process_doc, tasks))
+    else:
+        results = [_process_doc(t) for t in tasks]
+
     all_stats = Counter()
     rules_hist = Counter()
-    docs = 0
-    for name in os.listdir(er_dir):
-        if not name.endswith('.entities.jsonl'):
-            continue
-        in_path = os.path.join(er_dir, name)
-        ents = _read_entities(in_path)
-        # Derive minimal features if absent
-        ents = [_derive_mention_features(e) for e in ents]
-        resolved = resolve_coref(ents, max_sent_back=max_sent_back, max_mentions_back=max_mentions_back)
-        # Write augmented entities
-        out_entities = os.path.join(out_dir, name)
-        _write_jsonl(out_entities, resolved)
-        # Chains per document (approximate per file)
-        chains = _build_chains(resolved)
-        chain_rows: List[Dict[str, Any]] = []
-        doc_id = (resolved[0].get('doc_id') if resolved else None) or 'doc'
-        chain_rows.append({
-            'doc_id': doc_id,
-            'chains': [{'chain_id': f"{doc_id}:{i}", 'mention_ids': mids} for i, mids in enumerate(chains.values())],
-            'stats': {'mentions': len(resolved), 'chains': len(chains), 'resolved': sum(1 for e in resolved if e.get('antecedent_mention_id')), 'pronouns': sum(1 for e in resolved if e.get('is_pronoun'))},
-        })
-        out_chains = os.path.join(out_dir, os.path.splitext(name)[0] + '.coref_chains.jsonl')
-        _write_jsonl(out_chains, chain_rows)
-        # Stats
-        docs += 1
-        all_stats['mentions'] += len(resolved)
-        all_stats['pronouns_total'] += sum(1 for e in resolved if e.get('is_pronoun'))
-        all_stats['resolved'] += sum(1 for e in resolved if e.get('antecedent_mention_id'))
-        all_stats['unresolved'] += sum(1 for e in resolved if e.get('is_pronoun') and not e.get('antecedent_mention_id'))
-        for e in resolved:
-            rules_hist[e.get('coref_rule', 'unresolved')] += 1
+    for stats, rules in results:
+        all_stats['mentions'] += stats['mentions']
+        all_stats['pronouns_total'] += stats['pronouns']
+        all_stats['resolved'] += stats['resolved']
+        all_stats['unresolved'] += stats['unresolved']
+        rules_hist.update(rules)
+    docs = len(results)
 
     # Run report
     rep_dir = os.path.join(out_dir, '_reports')
@@ -185,9 +233,10 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap.add_argument('--out', required=True, help='Output directory for coref results')
     ap.add_argument('--max-sent-back', type=int, default=3)
     ap.add_argument('--max-mentions-back', type=int, default=30)
+    ap.add_argument('--workers', type=int, default=1, help='Resolve documents in N worker processes')
     args = ap.parse_args(argv)
     try:
-        process_er_dir(args.er_dir, args.out, args.max_sent_back, args.max_mentions_back)
+        process_er_dir(args.er_dir, args.out, args.max_sent_back, args.max_mentions_back, workers=args.workers)
         return 0
     except Exception as e:
         print(f"Unexpected error: {e}")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional
 
 
 PRONOUNS = {
@@ -68,6 +68,27 @@ def _derive_mention_features(m: Dict) -> Dict:
     }
 
 
+def _sent_ord(m: Dict) -> int:
+    """Returns the sentence ordinal of a mention for window checks.
+
+    ER stamps `sent_index` (the document ordinal of the sentence) next to the
+    hashed `sent_id`; older inputs may carry a numeric `sent_id` instead.
+
+    Args:
+        m: The mention.
+
+    Returns:
+        The sentence ordinal, or 0 if unknown.
+    """
+    si = m.get("sent_index")
+    if isinstance(si, int):
+        return si
+    try:
+        return int(m.get("sent_id") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
 def _estimate_number_for_candidate(c: Dict) -> str:
     """Estimates the number (singular/plural) of a candidate mention.
 
@@ -125,7 +146,15 @@ def resolve_coref(
         A new list of entities with coreference fields populated.
     """
     aug = [_derive_mention_features(e) for e in ents]
-    # Keep original order; create an index for lookup
+    # Per-mention feature arrays, computed once per document
+    sent = [_sent_ord(m) for m in aug]
+    plural = [_estimate_number_for_candidate(m) == "plural" for m in aug]
+    gender = [m.get("gender", "unknown") for m in aug]
+    device = [_is_device_like(m) for m in aug]
+    # With non-decreasing sentence ordinals, the first mention found out of
+    # the sentence window going backwards ends the look-back
+    monotonic = all(sent[k] <= sent[k + 1] for k in range(len(sent) - 1))
+
     out: List[Dict] = []
     for i, m in enumerate(aug):
         m2 = dict(m)
@@ -138,57 +167,47 @@ def resolve_coref(
         if not m2.get("is_pronoun"):
             out.append(m2)
             continue
-        # Look back
-        candidates: List[Tuple[int, Dict]] = []
-        cur_sent = int(m2.get("sent_id") or 0)
+
+        form = (m2.get("pronoun_form") or "").lower()
+        num = m2.get("number") or "unknown"
+        # Allowed candidate genders (None: any) and number (None: any)
+        genders = {"masc", "unknown"} if form in {"he", "him"} else {"fem", "unknown"} if form in {"she", "her"} else None
+        want_plural = True if num == "plural" else False if num == "singular" else None
+        prefer_device = form in {"it", "this", "that"}
+
+        # Look back over the nearest candidates in the sentence window
+        cur_sent = sent[i]
+        first_compat = -1
+        first_device = -1
         back_count = 0
         j = i - 1
         while j >= 0 and back_count < max_mentions_back:
-            c = aug[j]
-            if abs(cur_sent - int(c.get("sent_id") or 0)) <= max_sent_back:
-                candidates.append((j, c))
+            if abs(cur_sent - sent[j]) <= max_sent_back:
                 back_count += 1
+                if (genders is None or gender[j] in genders) and (want_plural is None or plural[j] == want_plural):
+                    if first_compat < 0:
+                        first_compat = j
+                        if not prefer_device:
+                            break
+                    if prefer_device and device[j]:
+                        first_device = j
+                        break
+            elif monotonic:
+                break
             j -= 1
 
-        form = (m2.get("pronoun_form") or "").lower()
-        num = m2.get("number") or "unknown"
-        gen = m2.get("gender") or "unknown"
         chosen: Optional[Dict] = None
         rule = "unresolved"
         conf = 0.0
-
-        # Filter candidates by basic agreement
-        def compatible(c: Dict) -> bool:
-            # Gender agreement only for he/she/him/her
-            if form in {"he", "him"} and (c.get("gender", "unknown") not in {"masc", "unknown"}):
-                return False
-            if form in {"she", "her"} and (c.get("gender", "unknown") not in {"fem", "unknown"}):
-                return False
-            # Number agreement
-            if num == "plural" and _estimate_number_for_candidate(c) != "plural":
-                return False
-            if num == "singular" and _estimate_number_for_candidate(c) != "singular":
-                return False
-            return True
-
-        compat = [(idx, c) for idx, c in candidates if compatible(c)]
-
-        # Device-over-org preference for it/this/that
-        if form in {"it", "this", "that"}:
-            dev_first = [(idx, c) for idx, c in compat if _is_device_like(c)]
-            if dev_first:
-                chosen = dev_first[0][1]
-                rule = "prefer_device_over_org"
-                conf = 0.85
-            elif compat:
-                chosen = compat[0][1]
-                rule = "nearest_compatible"
-                conf = 0.75
-        else:
-            if compat:
-                chosen = compat[0][1]
-                rule = "nearest_compatible"
-                conf = 0.75 if num == "singular" else 0.7
+        if first_device >= 0:
+            # Device-over-org preference for it/this/that
+            chosen = aug[first_device]
+            rule = "prefer_device_over_org"
+            conf = 0.85
+        elif first_compat >= 0:
+            chosen = aug[first_compat]
+            rule = "nearest_compatible"
+            conf = 0.75 if prefer_device or num == "singular" else 0.7
 
         if chosen is not None:
             m2["antecedent_mention_id"] = chosen.get("mention_id")
@@ -7,6 +7,8 @@ import re
 from collections import Counter
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from ..io.shards import iter_normalized
+
 
 MIME_MAP: Dict[str, str] = {
     "application/pdf": "pdf",
@@ -117,7 +119,7 @@ def _iter_entities_from_dir(base_dir: str) -> Iterable[Tuple[str, Dict[str, Any]
 
 
 def _load_doc_meta_map(normalized_dir: Optional[str]) -> Dict[str, Dict[str, Any]]:
-    """Loads a map of document metadata from a directory of JSON files.
+    """Loads a map of document metadata from a normalized directory.
 
     Args:
         normalized_dir: The directory to read from.
@@ -128,13 +130,8 @@ def _load_doc_meta_map(normalized_dir: Optional[str]) -> Dict[str, Dict[str, Any
     if not normalized_dir:
         return {}
     out: Dict[str, Dict[str, Any]] = {}
-    for name in os.listdir(normalized_dir):
-        if not name.endswith('.json'):
-            continue
-        path = os.path.join(normalized_dir, name)
+    for _ref, data in iter_normalized(normalized_dir):
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
             doc = data.get('doc', {})
             src = (doc.get('source_path') or '')
             meta = {
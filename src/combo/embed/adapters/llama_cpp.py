@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from ..api import EmbeddingModel
 
@@ -94,3 +94,25 @@ class LlamaCppAdapter(EmbeddingModel):
         """
         toks = self._llm.tokenize(text.encode("utf-8"), add_bos=False)
         return len(toks)
+
+
+def load_token_counter(model_path: str) -> Callable[[str], int]:
+    """Loads only the vocabulary of a GGUF model and returns a token counter.
+
+    Args:
+        model_path: The path to the GGUF model file.
+
+    Returns:
+        A function returning the number of model tokens in a text.
+    """
+    try:
+        from llama_cpp import Llama  # type: ignore
+    except Exception as e:  # pragma: no cover - optional dep
+        raise RuntimeError("llama-cpp-python is not installed") from e
+
+    llm = Llama(model_path=model_path, vocab_only=True, verbose=False)
+
+    def count(text: str) -> int:
+        return len(llm.tokenize((text or "").encode("utf-8"), add_bos=False))
+
+    return count
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 
 from .api import LocalDeterministicAdapter, EmbeddingModel
 from .adapters import REGISTRY
 from .utils import select_gguf, _resolve as _resolve_path
+from ..io.shards import list_normalized, load_normalized
+from ..io.tables import iter_table, read_manifest
 
 
 def _resolve(path: str) -> str:
@@ -22,19 +25,6 @@ def _resolve(path: str) -> str:
     return os.path.abspath(os.path.realpath(path))
 
 
-def _load_normalized(path: str) -> Dict[str, Any]:
-    """Loads a normalized JSON file.
-
-    Args:
-        path: The path to the file.
-
-    Returns:
-        The loaded JSON data.
-    """
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def _write_jsonl(path: str, rows: List[Dict[str, Any]]) -> int:
     """Writes a list of dictionaries to a JSONL file.
 
@@ -127,8 +117,48 @@ def _truncate_text_by_tokens(model: EmbeddingModel, text: str, max_tokens: Optio
     return (" ".join(toks[:max_tokens]), True) if len(toks) > max_tokens else (text, False)
 
 
+def _doc_chunks(in_dir: str) -> Iterator[Tuple[str, Callable[[], Tuple[Optional[str], List[Dict[str, Any]]]]]]:
+    """Lists the documents of a normalized directory with a loader for their chunks.
+
+    If `combo normalize --tables` wrote a chunk table covering exactly the
+    documents of the directory, chunks are read from its `doc_base`,
+    `doc_id`, `chunk_id` and `text` columns only; otherwise each document is
+    loaded when its loader is called.
+
+    Args:
+        in_dir: The normalized directory.
+
+    Yields:
+        A tuple of the document base name and a function returning its
+        doc_id and chunks.
+    """
+    refs = list_normalized(in_dir)
+    tables_dir = os.path.join(in_dir, "_tables")
+    manifest = read_manifest(tables_dir)
+    if manifest and "chunks" in manifest.get("tables", {}) and sorted(manifest.get("docs", [])) == sorted(r.base for r in refs):
+        # Rows are written in document order, so each document is one run of rows
+        groups = itertools.groupby(iter_table(tables_dir, "chunks", ["doc_base", "doc_id", "chunk_id", "text"]), key=lambda r: r["doc_base"])
+        pending = next(groups, None)
+        for base in manifest["docs"]:
+            chunks: List[Dict[str, Any]] = []
+            if pending is not None and pending[0] == base:
+                chunks = list(pending[1])
+                pending = next(groups, None)
+            doc_id = chunks[0]["doc_id"] if chunks else None
+            yield base, (lambda d=doc_id, c=chunks: (d, c))
+        return
+    for ref in refs:
+        def _load(r=ref) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+            data = load_normalized(r)
+            return data.get("doc", {}).get("doc_id"), data.get("chunks", [])
+        yield ref.base, _load
+
+
 def embed_dir(in_dir: str, out_dir: str, model: EmbeddingModel, batch: int = 64, timeout_s: float = 60.0) -> tuple[List[str], int]:
-    """Embeds all normalized JSON files in a directory.
+    """Embeds all normalized documents in a directory (files or shards).
+
+    Chunks are read from the chunk table when the directory has one (see
+    `_doc_chunks`), without parsing the documents.
 
     Args:
         in_dir: The input directory.
@@ -149,11 +179,7 @@ def embed_dir(in_dir: str, out_dir: str, model: EmbeddingModel, batch: int = 64,
     skipped: List[str] = []
     errors: int = 0
     total_rows = 0
-    for name in os.listdir(in_dir):
-        if not name.lower().endswith(".json"):
-            continue
-        in_path = os.path.join(in_dir, name)
-        base = os.path.splitext(name)[0]
+    for base, load_chunks in _doc_chunks(in_dir):
         out_path = os.path.join(out_dir, f"{base}.embedded.jsonl")
         tmp_path = out_path + ".tmp"
 
@@ -162,8 +188,7 @@ def embed_dir(in_dir: str, out_dir: str, model: EmbeddingModel, batch: int = 64,
             skipped.append(out_path)
             continue
 
-        data = _load_normalized(in_path)
-        chunks = data.get("chunks", [])
+        doc_id, chunks = load_chunks()
         rows: List[Dict[str, Any]] = []
         texts: List[str] = []
         meta: List[Dict[str, Any]] = []
@@ -178,7 +203,7 @@ def embed_dir(in_dir: str, out_dir: str, model: EmbeddingModel, batch: int = 64,
             trunc_t, truncated = _truncate_text_by_tokens(model, t, eff_max)
             texts.append(trunc_t)
             meta.append({
-                "doc_id": data.get("doc", {}).get("doc_id"),
+                "doc_id": doc_id,
                 "chunk_id": ch.get("chunk_id"),
                 "truncated": truncated,
             })
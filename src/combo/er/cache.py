@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .contracts import Entity, Relation, _sha16
+
+
+def encode_result(ents: List[Entity], rels: List[Relation]) -> str:
+    """Encodes the ER result of a chunk relative to the chunk.
+
+    Entities keep only their offsets, type, confidence and canonical ID;
+    relations refer to entities by position. Everything that depends on the
+    doc_id/chunk_id (IDs) is recomputed by `decode_result`.
+
+    Args:
+        ents: The chunk entities, in output order.
+        rels: The chunk relations.
+
+    Returns:
+        The compact JSON payload.
+    """
+    pos = {e.id: i for i, e in enumerate(ents)}
+    payload = {
+        "e": [[e.start, e.end, e.type, e.conf, e.canonical_id] for e in ents],
+        "r": [[pos[r.head_ent_id], pos[r.tail_ent_id], r.type, r.conf] for r in rels],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_result(payload: str, text: str, doc_id: str, chunk_id: str, source_sha1: str) -> Tuple[List[Entity], List[Relation]]:
+    """Rebuilds a chunk's entities and relations from a cached payload.
+
+    IDs are re-stamped with the same formulas the extractors use, so the
+    result is identical to a fresh extraction of the same chunk.
+
+    Args:
+        payload: The payload from `encode_result`.
+        text: The chunk text.
+        doc_id: The ID of the document.
+        chunk_id: The ID of the chunk.
+        source_sha1: The SHA1 hash of the chunk text.
+
+    Returns:
+        A tuple of the entities and relations.
+    """
+    obj = json.loads(payload)
+    ents: List[Entity] = []
+    for a, b, etype, conf, cid in obj.get("e", []):
+        t = text[a:b]
+        ents.append(Entity(
+            id=_sha16(f"{doc_id}|{chunk_id}|{a}|{b}|{t}"), chunk_id=chunk_id, doc_id=doc_id, type=etype,
+            text=t, start=a, end=b, conf=conf, source_sha1=source_sha1, canonical_id=cid,
+        ))
+    rels: List[Relation] = []
+    for h, t, rtype, conf in obj.get("r", []):
+        head, tail = ents[h], ents[t]
+        rels.append(Relation(
+            id=_sha16(f"{doc_id}|{chunk_id}|{head.id}|{tail.id}|{rtype}"), head_ent_id=head.id, tail_ent_id=tail.id,
+            type=rtype, conf=conf, chunk_id=chunk_id, doc_id=doc_id, source_sha1=source_sha1,
+        ))
+    return ents, rels
+
+
+class ERCache:
+    """A persistent SQLite cache of chunk ER results.
+
+    Rows are keyed on (chunk text SHA1, engine name, engine version), so a
+    changed rule set, model or gazetteer never serves stale results.
+
+    Attributes:
+        engine: The engine name.
+        version: The engine version (including any gazetteer fingerprint).
+    """
+
+    def __init__(self, path: str, engine: str, version: str) -> None:
+        self.engine = engine
+        self.version = version
+        self._conn = sqlite3.connect(path, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS er_cache (
+                text_sha1 TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY(text_sha1, engine, version)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, sha1s: Iterable[str]) -> Dict[str, str]:
+        """Looks up cached payloads.
+
+        Args:
+            sha1s: The chunk text SHA1s.
+
+        Returns:
+            A dictionary mapping the SHA1s found to their payloads.
+        """
+        keys = sorted(set(sha1s))
+        out: Dict[str, str] = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ",".join("?" * len(part))
+            cur = self._conn.execute(
+                f"SELECT text_sha1, payload FROM er_cache WHERE engine=? AND version=? AND text_sha1 IN ({marks})",
+                (self.engine, self.version, *part),
+            )
+            out.update(cur.fetchall())
+        return out
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        """Stores payloads in a single transaction.
+
+        Args:
+            items: A dictionary mapping chunk text SHA1s to payloads.
+        """
+        if not items:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO er_cache(text_sha1, engine, version, payload) VALUES (?,?,?,?)",
+                [(k, self.engine, self.version, v) for k, v in items.items()],
+            )
+
+    def close(self) -> None:
+        """Closes the cache."""
+        self._conn.close()
+
+
+def cache_version(engine: Any, gazetteer: Any = None) -> str:
+    """Computes the cache version of an engine configuration.
+
+    Args:
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+
+    Returns:
+        The engine version, suffixed with the gazetteer fingerprint if any.
+    """
+    if gazetteer is None:
+        return str(engine.version)
+    return f"{engine.version}+gaz:{gazetteer.version}"
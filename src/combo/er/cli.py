@@ -4,9 +4,19 @@ import argparse
 import json
 import os
 import hashlib
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Union
 
-from .api import simple_ner, simple_link
+from .api import Entity, Relation, simple_link
+from .cache import ERCache, cache_version, decode_result, encode_result
+from .gazetteer import Gazetteer, load_gazetteer, merge_mentions
+from .rules import DEFAULT_ENGINE, RuleEngine, load_rules
+from .spacy_engine import SpacyEngine, load_spacy_engine
+from ..io.shards import NormalizedCatalog, NormalizedRef, load_normalized
+from ..normalize.offsets import OffsetIndex
+
+
+Engine = Union[RuleEngine, SpacyEngine]
 
 
 def _resolve(p: str) -> str:
@@ -21,106 +31,412 @@ def _resolve(p: str) -> str:
     return os.path.abspath(os.path.realpath(p))
 
 
-def _load_normalized_map(norm_dir: str) -> Dict[str, Dict[str, Any]]:
-    """Loads a map of normalized data from a directory of JSON files.
+def _chunk_map(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Builds the chunk lookup for a single normalized document.
 
     This function maps chunk IDs to a dictionary containing the doc ID, text,
-    source SHA1, and base filename.
+    source SHA1, the length of the prefix repeated from the previous chunk,
+    and the document's sentence offset lookup.
 
     Args:
-        norm_dir: The directory containing the normalized JSON files.
+        data: A normalized document.
 
     Returns:
         A dictionary mapping chunk IDs to metadata.
     """
     out: Dict[str, Dict[str, Any]] = {}
-    for name in os.listdir(norm_dir):
-        if not name.endswith('.json'):
-            continue
-        path = os.path.join(norm_dir, name)
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            doc_id = data.get('doc', {}).get('doc_id')
-            for ch in data.get('chunks', []):
-                text = ch.get('text', '')
-                sha1 = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
-                out[ch.get('chunk_id')] = {
-                    'doc_id': doc_id,
-                    'text': text,
-                    'source_sha1': sha1,
-                    'base': os.path.splitext(name)[0],
-                }
-        except Exception:
+    doc_id = data.get('doc', {}).get('doc_id')
+    locator = OffsetIndex.from_normalized(data)
+    for ch in data.get('chunks', []):
+        text = ch.get('text', '')
+        sha1 = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+        out[ch.get('chunk_id')] = {
+            'doc_id': doc_id,
+            'text': text,
+            'source_sha1': sha1,
+            'overlap_chars': ch.get('overlap_chars') or 0,
+            'locator': locator,
+        }
+    return out
+
+
+def _read_embedded_ids(path: str) -> List[Dict[str, Any]]:
+    """Reads the doc/chunk IDs of an embedded JSONL file, dropping vectors.
+
+    Args:
+        path: The path to the `*.embedded.jsonl` file.
+
+    Returns:
+        A list of dictionaries with `doc_id` and `chunk_id`.
+    """
+    out: List[Dict[str, Any]] = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            out.append({'doc_id': row.get('doc_id'), 'chunk_id': row.get('chunk_id')})
+    return out
+
+
+def _first_doc_id(path: str) -> Optional[str]:
+    """Reads the first doc_id of an embedded JSONL file.
+
+    Args:
+        path: The path to the `*.embedded.jsonl` file.
+
+    Returns:
+        The first doc_id found, or None.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            doc_id = json.loads(line).get('doc_id')
+            if doc_id:
+                return doc_id
+    return None
+
+
+def _find_source(catalog: NormalizedCatalog, emb_base: str, emb_path: str) -> Optional[NormalizedRef]:
+    """Pairs an embedded file with its normalized source document.
+
+    The embed stage names its outputs `{normalized base}.embedded.jsonl`, so
+    the base name is tried first; the first doc_id of the file is the fallback.
+
+    Args:
+        catalog: The normalized document catalog.
+        emb_base: The embedded file name without `.jsonl`.
+        emb_path: The path to the embedded file.
+
+    Returns:
+        The normalized document reference, or None.
+    """
+    norm_base = emb_base[:-len('.embedded')] if emb_base.endswith('.embedded') else emb_base
+    ref = catalog.by_base(norm_base)
+    if ref is not None:
+        return ref
+    doc_id = _first_doc_id(emb_path)
+    return catalog.by_doc_id(doc_id) if doc_id else None
+
+
+def _write_rows(path: str, rows: List[Dict[str, Any]]) -> None:
+    """Writes rows to a JSONL file (nothing is written for no rows).
+
+    Args:
+        path: The path to the output file.
+        rows: The rows to write.
+    """
+    if not rows:
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for obj in rows:
+            f.write(json.dumps(obj, ensure_ascii=False, sort_keys=True))
+            f.write('\n')
+
+
+def _stamp_sentences(ents: List[Entity], chunk_id: str, locator: Optional[OffsetIndex]) -> None:
+    """Stamps each entity with the sentence containing its start offset.
+
+    Args:
+        ents: The entities of one chunk.
+        chunk_id: The chunk ID.
+        locator: The document's sentence offset lookup.
+    """
+    if locator is None:
+        return
+    for e in ents:
+        hit = locator.locate_in_chunk(chunk_id, e.start)
+        if hit is None:
             continue
+        e.sent_index, e.sent_id, e.page = hit
+
+
+def _drop_overlap(ents: List[Entity], rels: List[Relation], overlap_chars: int) -> Tuple[List[Entity], List[Relation]]:
+    """Drops mentions starting in the prefix a chunk repeats from the previous one.
+
+    Those mentions were already extracted from the previous chunk, so
+    keeping them would emit every overlap mention twice.
+
+    Args:
+        ents: The entities of one chunk.
+        rels: The relations of the chunk.
+        overlap_chars: The length of the repeated prefix.
+
+    Returns:
+        The remaining entities and the relations between them.
+    """
+    kept = [e for e in ents if e.start >= overlap_chars]
+    ids = {e.id for e in kept}
+    return kept, [r for r in rels if r.head_ent_id in ids and r.tail_ent_id in ids]
+
+
+def _entity_row(e: Entity) -> Dict[str, Any]:
+    """Serializes an entity, omitting sentence fields that are unknown.
+
+    Args:
+        e: The entity.
+
+    Returns:
+        The entity as a dictionary.
+    """
+    row = {
+        'id': e.id, 'chunk_id': e.chunk_id, 'doc_id': e.doc_id, 'type': e.type, 'text': e.text,
+        'start': e.start, 'end': e.end, 'conf': e.conf, 'source_sha1': e.source_sha1
+    }
+    for k in ('sent_id', 'sent_index', 'page', 'canonical_id'):
+        v = getattr(e, k)
+        if v is not None:
+            row[k] = v
+    return row
+
+
+def _extract_chunks(chunks: List[Tuple[str, Dict[str, Any]]], engine: Engine, gazetteer: Optional[Gazetteer]) -> List[Tuple[List[Entity], List[Relation]]]:
+    """Runs NER (plus the gazetteer) and relation extraction on chunks.
+
+    Args:
+        chunks: (chunk_id, chunk metadata) pairs.
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+
+    Returns:
+        The entities and relations of each chunk, in input order.
+    """
+    out: List[Tuple[List[Entity], List[Relation]]] = []
+    batch = engine.extract_batch([(m['text'], m['doc_id'], cid, m['source_sha1']) for cid, m in chunks])
+    for (chunk_id, meta), es in zip(chunks, batch):
+        doc_id, text, src_sha1 = meta['doc_id'], meta['text'], meta['source_sha1']
+        if gazetteer is not None:
+            es = merge_mentions(gazetteer.extract(text, doc_id, chunk_id, src_sha1), es)
+        out.append((es, simple_link(es, doc_id, chunk_id, src_sha1)))
     return out
 
 
-def process_embedded(emb_dir: str, norm_dir: str, out_dir: str) -> Dict[str, int]:
+def _extract_chunks_cached(chunks: List[Tuple[str, Dict[str, Any]]], engine: Engine, gazetteer: Optional[Gazetteer], cache: ERCache) -> Tuple[List[Tuple[List[Entity], List[Relation]]], int, int]:
+    """Like `_extract_chunks`, serving repeated chunk texts from the cache.
+
+    Each distinct chunk text missing from the cache is extracted once; all
+    other chunks are rebuilt from their chunk-relative payload with fresh IDs.
+
+    Args:
+        chunks: (chunk_id, chunk metadata) pairs.
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+        cache: The ER result cache.
+
+    Returns:
+        A tuple of the per-chunk results, the hit count and the miss count.
+    """
+    payloads = cache.get_many(m['source_sha1'] for _, m in chunks)
+    todo: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for cid, m in chunks:
+        if m['source_sha1'] not in payloads:
+            todo.setdefault(m['source_sha1'], (cid, m))
+    fresh = {sha1: encode_result(es, rs) for sha1, (es, rs) in zip(todo, _extract_chunks(list(todo.values()), engine, gazetteer))}
+    cache.put_many(fresh)
+    payloads.update(fresh)
+    out = [decode_result(payloads[m['source_sha1']], m['text'], m['doc_id'], cid, m['source_sha1']) for cid, m in chunks]
+    return out, len(chunks) - len(todo), len(todo)
+
+
+def _process_file(task: Tuple[Optional[str], Optional[NormalizedRef], str, str], engine: Engine, gazetteer: Optional[Gazetteer], cache: Optional[ERCache] = None) -> Tuple[int, int, int, int]:
+    """Extracts entities and relations for one document.
+
+    Args:
+        task: A tuple of the embedded file path (None to process every chunk
+            of the normalized document in order), the normalized source
+            reference (or None), and the entity and relation output paths.
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+        cache: The optional ER result cache.
+
+    Returns:
+        A tuple of the entity and relation counts written and the cache hit
+        and miss counts.
+    """
+    in_path, ref, ents_path, rels_path = task
+    ents_out: List[Dict[str, Any]] = []
+    rels_out: List[Dict[str, Any]] = []
+    try:
+        mapping = _chunk_map(load_normalized(ref)) if ref is not None else {}
+    except Exception:
+        mapping = {}
+    chunk_ids = [r.get('chunk_id') for r in _read_embedded_ids(in_path)] if in_path else list(mapping)
+    chunks = [(cid, mapping[cid]) for cid in chunk_ids if cid in mapping]
+    hits = misses = 0
+    if cache is not None:
+        results, hits, misses = _extract_chunks_cached(chunks, engine, gazetteer, cache)
+    else:
+        results = _extract_chunks(chunks, engine, gazetteer)
+    for (chunk_id, meta), (es, rs) in zip(chunks, results):
+        if meta.get('overlap_chars'):
+            es, rs = _drop_overlap(es, rs, meta['overlap_chars'])
+        _stamp_sentences(es, chunk_id, meta.get('locator'))
+        for e in es:
+            ents_out.append(_entity_row(e))
+        for r in rs:
+            rels_out.append({
+                'id': r.id, 'head_ent_id': r.head_ent_id, 'tail_ent_id': r.tail_ent_id, 'type': r.type,
+                'conf': r.conf, 'chunk_id': r.chunk_id, 'doc_id': r.doc_id, 'source_sha1': r.source_sha1
+            })
+    _write_rows(ents_path, ents_out)
+    _write_rows(rels_path, rels_out)
+    return len(ents_out), len(rels_out), hits, misses
+
+
+_WORKER_ENGINE: Optional[Engine] = None
+_WORKER_GAZETTEER: Optional[Gazetteer] = None
+_WORKER_CACHE: Optional[ERCache] = None
+
+
+def _init_worker(engine: Engine, gazetteer: Optional[Gazetteer], cache_path: Optional[str] = None) -> None:
+    """Installs the extraction configuration in a pool worker (once per process).
+
+    Pool workers are daemonic and cannot start the child processes of
+    spaCy's `nlp.pipe(n_process > 1)`, so the worker's copy of a spaCy
+    engine is switched to `n_process=1`.
+
+    Args:
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+        cache_path: The optional ER cache path; each worker opens its own
+            connection.
+    """
+    global _WORKER_ENGINE, _WORKER_GAZETTEER, _WORKER_CACHE
+    if isinstance(engine, SpacyEngine) and engine.n_process > 1:
+        engine.n_process = 1
+    _WORKER_ENGINE = engine
+    _WORKER_GAZETTEER = gazetteer
+    _WORKER_CACHE = ERCache(cache_path, engine.name, cache_version(engine, gazetteer)) if cache_path else None
+
+
+def _process_file_worker(task: Tuple[Optional[str], Optional[NormalizedRef], str, str]) -> Tuple[int, int, int, int]:
+    """Process pool entry point for `_process_file`.
+
+    Args:
+        task: See `_process_file`.
+
+    Returns:
+        See `_process_file`.
+    """
+    return _process_file(task, _WORKER_ENGINE or DEFAULT_ENGINE, _WORKER_GAZETTEER, _WORKER_CACHE)
+
+
+def process_embedded(emb_dir: str, norm_dir: str, out_dir: str, engine: Optional[Engine] = None, gazetteer: Optional[Gazetteer] = None, workers: int = 1, cache_path: Optional[str] = None) -> Dict[str, int]:
     """Processes a directory of embedded files to extract entities and relations.
 
+    Each `*.embedded.jsonl` file is paired with its normalized source through
+    a catalog built once from file names (or the shard index), and the chunk
+    text of that single document is loaded only while the file is processed.
+    Peak memory is therefore bounded by the largest document (per worker).
+
+    With `workers > 1`, documents are dispatched to a process pool; each
+    worker writes its own output files, so the files are identical to a
+    serial run, and the counts are summed in file-name order.
+
     Args:
         emb_dir: The directory containing the embedded JSONL files.
         norm_dir: The directory containing the normalized JSON files.
         out_dir: The directory to write the output to.
+        engine: The NER engine (defaults to the built-in rules).
+        gazetteer: An optional registry gazetteer; its hits win over
+            overlapping rule hits and carry their `canonical_id`.
+        workers: The number of worker processes.
+        cache_path: An optional ER result cache (SQLite) keyed on chunk
+            text SHA1 and engine name/version.
 
     Returns:
-        A dictionary of counts for entities, relations, and files.
+        A dictionary of counts for entities, relations, and files (plus
+        cache hits and misses when a cache is used).
     """
     emb_dir = _resolve(emb_dir)
     norm_dir = _resolve(norm_dir)
     out_dir = _resolve(out_dir)
     os.makedirs(out_dir, exist_ok=True)
-    mapping = _load_normalized_map(norm_dir)
-    counts = {'entities': 0, 'relations': 0, 'files': 0}
-    for name in os.listdir(emb_dir):
+    engine = engine or DEFAULT_ENGINE
+    catalog = NormalizedCatalog(norm_dir)
+    tasks: List[Tuple[Optional[str], Optional[NormalizedRef], str, str]] = []
+    for name in sorted(os.listdir(emb_dir)):
         if not name.endswith('.embedded.jsonl'):
             continue
         in_path = os.path.join(emb_dir, name)
         base = os.path.splitext(name)[0]
-        ents_path = os.path.join(out_dir, f"{base}.entities.jsonl")
-        rels_path = os.path.join(out_dir, f"{base}.rels.jsonl")
-        ents_out: List[Dict[str, Any]] = []
-        rels_out: List[Dict[str, Any]] = []
-        with open(in_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                row = json.loads(line)
-                chunk_id = row.get('chunk_id')
-                meta = mapping.get(chunk_id)
-                if not meta:
-                    continue
-                doc_id = meta['doc_id']
-                text = meta['text']
-                src_sha1 = meta['source_sha1']
-                es = simple_ner(text, doc_id, chunk_id, src_sha1)
-                rs = simple_link(es, doc_id, chunk_id, src_sha1)
-                for e in es:
-                    ents_out.append({
-                        'id': e.id, 'chunk_id': e.chunk_id, 'doc_id': e.doc_id, 'type': e.type, 'text': e.text,
-                        'start': e.start, 'end': e.end, 'conf': e.conf, 'source_sha1': e.source_sha1
-                    })
-                for r in rs:
-                    rels_out.append({
-                        'id': r.id, 'head_ent_id': r.head_ent_id, 'tail_ent_id': r.tail_ent_id, 'type': r.type,
-                        'conf': r.conf, 'chunk_id': r.chunk_id, 'doc_id': r.doc_id, 'source_sha1': r.source_sha1
-                    })
-        if ents_out:
-            with open(ents_path, 'w', encoding='utf-8', newline='') as ef:
-                for obj in ents_out:
-                    ef.write(json.dumps(obj, ensure_ascii=False, sort_keys=True))
-                    ef.write('\n')
-        if rels_out:
-            with open(rels_path, 'w', encoding='utf-8', newline='') as rf:
-                for obj in rels_out:
-                    rf.write(json.dumps(obj, ensure_ascii=False, sort_keys=True))
-                    rf.write('\n')
-        counts['entities'] += len(ents_out)
-        counts['relations'] += len(rels_out)
-        counts['files'] += 1
+        tasks.append((
+            in_path,
+            _find_source(catalog, base, in_path),
+            os.path.join(out_dir, f"{base}.entities.jsonl"),
+            os.path.join(out_dir, f"{base}.rels.jsonl"),
+        ))
+    return _run_tasks(tasks, out_dir, engine, gazetteer, workers, cache_path)
+
+
+def process_normalized(norm_dir: str, out_dir: str, engine: Optional[Engine] = None, gazetteer: Optional[Gazetteer] = None, workers: int = 1, cache_path: Optional[str] = None) -> Dict[str, int]:
+    """Extracts entities and relations directly from a normalized directory.
+
+    Every chunk of every normalized document (files or shards) is processed
+    in document order, so ER does not depend on the embed stage and can run
+    concurrently with it. Outputs are named `{normalized base}.entities.jsonl`
+    and `{normalized base}.rels.jsonl`.
+
+    Args:
+        norm_dir: The directory containing the normalized documents.
+        out_dir: The directory to write the output to.
+        engine: The NER engine (defaults to the built-in rules).
+        gazetteer: An optional registry gazetteer.
+        workers: The number of worker processes.
+        cache_path: An optional ER result cache (see `process_embedded`).
+
+    Returns:
+        A dictionary of counts for entities, relations, and files (plus
+        cache hits and misses when a cache is used).
+    """
+    norm_dir = _resolve(norm_dir)
+    out_dir = _resolve(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    refs = sorted(NormalizedCatalog(norm_dir).refs, key=lambda r: r.base)
+    tasks: List[Tuple[Optional[str], Optional[NormalizedRef], str, str]] = [
+        (None, ref, os.path.join(out_dir, f"{ref.base}.entities.jsonl"), os.path.join(out_dir, f"{ref.base}.rels.jsonl"))
+        for ref in refs
+    ]
+    return _run_tasks(tasks, out_dir, engine or DEFAULT_ENGINE, gazetteer, workers, cache_path)
+
+
+def _run_tasks(tasks: List[Tuple[Optional[str], Optional[NormalizedRef], str, str]], out_dir: str, engine: Engine, gazetteer: Optional[Gazetteer], workers: int, cache_path: Optional[str] = None) -> Dict[str, int]:
+    """Runs per-document ER tasks, serially or in a process pool, and writes the manifest.
+
+    Args:
+        tasks: The per-document tasks (see `_process_file`), in output order.
+        out_dir: The output directory.
+        engine: The NER engine.
+        gazetteer: The optional registry gazetteer.
+        workers: The number of worker processes.
+        cache_path: The optional ER result cache path.
+
+    Returns:
+        A dictionary of counts for entities, relations, and files (plus
+        cache hits and misses when a cache is used).
+    """
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine, gazetteer, cache_path)) as ex:
+            results = list(ex.map(_process_file_worker, tasks))
+    else:
+        cache = ERCache(cache_path, engine.name, cache_version(engine, gazetteer)) if cache_path else None
+        try:
+            results = [_process_file(t, engine, gazetteer, cache) for t in tasks]
+        finally:
+            if cache is not None:
+                cache.close()
+    counts = {
+        'entities': sum(r[0] for r in results),
+        'relations': sum(r[1] for r in results),
+        'files': len(results),
+    }
     # Manifest
-    manifest = {**counts}
+    manifest: Dict[str, Any] = {**counts, 'engine': {'name': engine.name, 'version': engine.version}}
+    if cache_path:
+        counts['cache_hits'] = sum(r[2] for r in results)
+        counts['cache_misses'] = sum(r[3] for r in results)
+        manifest['cache'] = {'hits': counts['cache_hits'], 'misses': counts['cache_misses']}
     with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as mf:
         json.dump(manifest, mf, ensure_ascii=False, sort_keys=True, indent=2)
     return counts
@@ -130,7 +446,8 @@ def main(argv: Optional[List[str]] = None) -> int:
     """The main entry point for the command-line interface.
 
     This function parses command-line arguments and calls `process_embedded`
-    to extract entities and relations.
+    (or `process_normalized` when no embedded directory is given) to extract
+    entities and relations.
 
     Args:
         argv: A list of command-line arguments.
@@ -139,13 +456,47 @@ def main(argv: Optional[List[str]] = None) -> int:
         An exit code.
     """
     ap = argparse.ArgumentParser(prog='combo er', description='Entity/Relation extraction (simple)')
-    ap.add_argument('embedded_dir', help='Directory of *.embedded.jsonl')
+    ap.add_argument('embedded_dir', nargs='?', default=None, help='Directory of *.embedded.jsonl (optional; without it every normalized chunk is processed)')
     ap.add_argument('--normalized-dir', required=True, help='Directory of normalized JSON to supply chunk text')
     ap.add_argument('--out', required=True, help='Output directory for ER JSONLs')
+    ap.add_argument('--rules', help='NER rules file (JSON or YAML list of {type, pattern, conf})')
+    ap.add_argument('--gazetteer', help='Gazetteer file to load (or to write when --registry is given)')
+    ap.add_argument('--registry', help='Link registry to build the gazetteer from')
+    ap.add_argument('--workers', type=int, default=1, help='Process documents in N worker processes')
+    ap.add_argument('--engine', choices=['rules', 'spacy'], default='rules', help='NER backend')
+    ap.add_argument('--spacy-model', default='en_core_web_sm', help='spaCy model for --engine spacy')
+    ap.add_argument('--batch-size', type=int, default=64, help='nlp.pipe batch size for --engine spacy')
+    ap.add_argument('--n-process', type=int, default=1, help='nlp.pipe processes for --engine spacy (not with --workers > 1)')
+    ap.add_argument('--cache', default=None, help='SQLite ER result cache keyed on chunk text SHA1 and engine version')
     args = ap.parse_args(argv)
+    if args.engine == 'spacy' and args.rules:
+        print("--rules only applies to --engine rules")
+        return 2
+    if args.workers > 1 and args.n_process > 1:
+        print("--n-process cannot be combined with --workers > 1 (pool workers cannot start spaCy processes); use one or the other")
+        return 2
+    engine: Optional[Engine] = None
+    try:
+        if args.engine == 'spacy':
+            engine = load_spacy_engine(args.spacy_model, batch_size=args.batch_size, n_process=args.n_process)
+        elif args.rules:
+            engine = RuleEngine(load_rules(args.rules))
+    except Exception as e:
+        print(f"Invalid NER engine configuration: {e}")
+        return 2
+    try:
+        gazetteer = load_gazetteer(args.gazetteer, args.registry)
+    except Exception as e:
+        print(f"Invalid gazetteer: {e}")
+        return 2
     try:
-        counts = process_embedded(args.embedded_dir, args.normalized_dir, args.out)
+        if args.embedded_dir:
+            counts = process_embedded(args.embedded_dir, args.normalized_dir, args.out, engine=engine, gazetteer=gazetteer, workers=args.workers, cache_path=args.cache)
+        else:
+            counts = process_normalized(args.normalized_dir, args.out, engine=engine, gazetteer=gazetteer, workers=args.workers, cache_path=args.cache)
         print(f"Wrote ER: files={counts['files']} entities={counts['entities']} rels={counts['relations']}")
+        if args.cache:
+            print(f"ER cache: hits={counts['cache_hits']} misses={counts['cache_misses']}")
         return 0
     except Exception as e:
         print(f"Unexpected error: {e}")
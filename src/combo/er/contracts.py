@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Entity:
+    """Represents a single entity.
+
+    Attributes:
+        id: The unique ID of the entity.
+        chunk_id: The ID of the chunk the entity is in.
+        doc_id: The ID of the document the entity is in.
+        type: The type of the entity.
+        text: The text of the entity.
+        start: The start character offset of the entity.
+        end: The end character offset of the entity.
+        conf: The confidence score of the entity.
+        source_sha1: The SHA1 hash of the source document.
+        sent_id: The ID of the sentence containing the entity start, if known.
+        sent_index: The document ordinal of that sentence, if known.
+        page: The page of that sentence, if known.
+        canonical_id: The registry canonical ID, if the mention was matched
+            against the link registry (e.g. by the gazetteer).
+    """
+    id: str
+    chunk_id: str
+    doc_id: str
+    type: str
+    text: str
+    start: int
+    end: int
+    conf: float
+    source_sha1: str
+    sent_id: Optional[str] = None
+    sent_index: Optional[int] = None
+    page: Optional[int] = None
+    canonical_id: Optional[str] = None
+
+
+@dataclass
+class Relation:
+    """Represents a single relation between two entities.
+
+    Attributes:
+        id: The unique ID of the relation.
+        head_ent_id: The ID of the head entity.
+        tail_ent_id: The ID of the tail entity.
+        type: The type of the relation.
+        conf: The confidence score of the relation.
+        chunk_id: The ID of the chunk the relation is in.
+        doc_id: The ID of the document the relation is in.
+        source_sha1: The SHA1 hash of the source document.
+    """
+    id: str
+    head_ent_id: str
+    tail_ent_id: str
+    type: str
+    conf: float
+    chunk_id: str
+    doc_id: str
+    source_sha1: str
+
+
+def _sha16(s: str) -> str:
+    """Computes the first 16 characters of the SHA1 hash of a string.
+
+    Args:
+        s: The string to hash.
+
+    Returns:
+        The first 16 characters of the SHA1 hash.
+    """
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
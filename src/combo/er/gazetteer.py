@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .contracts import Entity, _sha16
+from ..link.registry import normalize_label
+
+
+FORMAT_VERSION = 2
+
+# Keys up to this length only match their registry spelling ("US" vs "us")
+SHORT_KEY_LEN = 5
+
+
+def _is_word(ch: str) -> bool:
+    """Tells whether a character is part of a word for boundary checks.
+
+    Args:
+        ch: A single character.
+
+    Returns:
+        True for letters, digits and underscores.
+    """
+    return ch.isalnum() or ch == "_"
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercases a text without changing its length (so offsets still match).
+
+    Args:
+        text: The text to lowercase.
+
+    Returns:
+        The lowercased text.
+    """
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class Gazetteer:
+    """Tags registry aliases in text with an Aho–Corasick automaton.
+
+    Keys are normalized with `normalize_label`, so matching is
+    case-insensitive, except for short keys (at most `SHORT_KEY_LEN`
+    characters) and keys with an all-caps registry spelling: those only
+    match one of their registry spellings exactly, so "US", "IT" or "Apple"
+    do not tag the ordinary words "us", "it" or "apple". A chunk is scanned
+    once, in time linear in its length plus the number of raw hits,
+    whatever the dictionary size. Hits must sit on word boundaries; among
+    overlapping hits the leftmost-longest wins.
+
+    The automaton is stored as flat parallel arrays: node `i` has goto edges
+    `edge_chr[k] -> edge_dst[k]` for `k` in `edge_off[i]:edge_off[i + 1]`
+    (sorted by character), a failure link `fail[i]`, a dictionary (output)
+    link `dict_link[i]` to the nearest proper suffix node that ends a key,
+    and `term[i]`, the index of the key ending at the node (or -1).
+
+    Attributes:
+        keys: The normalized keys.
+        canonical_ids: The canonical ID per key.
+        types: The entity type per key.
+        cased: The exact spellings a key must match, per key (empty if the
+            key matches case-insensitively).
+    """
+
+    def __init__(self, entries: Dict[str, Tuple[str, str]], spellings: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        self.keys: List[str] = sorted(entries)
+        self.canonical_ids: List[str] = [entries[k][0] for k in self.keys]
+        self.types: List[str] = [entries[k][1] for k in self.keys]
+        self.cased: List[List[str]] = []
+        for k in self.keys:
+            forms = sorted({f.strip() for f in (spellings or {}).get(k, ())})
+            self.cased.append(forms if forms and (len(k) <= SHORT_KEY_LEN or any(f.isupper() for f in forms)) else [])
+        self._build()
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        term: List[int] = [-1]
+        for idx, key in enumerate(self.keys):
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    term.append(-1)
+                node = nxt
+            term[node] = idx
+        fail = [0] * len(goto)
+        dict_link = [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                dict_link[child] = fail[child] if term[fail[child]] >= 0 else dict_link[fail[child]]
+                queue.append(child)
+        edge_off: List[int] = [0]
+        edge_chr: List[str] = []
+        edge_dst: List[int] = []
+        for edges in goto:
+            for ch in sorted(edges):
+                edge_chr.append(ch)
+                edge_dst.append(edges[ch])
+            edge_off.append(len(edge_dst))
+        self._edge_off = edge_off
+        self._edge_chr = "".join(edge_chr)
+        self._edge_dst = edge_dst
+        self._fail = fail
+        self._dict = dict_link
+        self._term = term
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def version(self) -> str:
+        """A short hash of the dictionary (keys, canonical IDs, types and spellings)."""
+        spec = json.dumps([self.keys, self.canonical_ids, self.types, self.cased], ensure_ascii=False)
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_registry(cls, conn: sqlite3.Connection, min_len: int = 2) -> "Gazetteer":
+        """Builds a gazetteer from the labels and aliases of a link registry.
+
+        Entity labels take precedence over aliases; a key shared by several
+        entities goes to the smallest canonical ID. The primary names and
+        aliases of that entity are the key's registry spellings. Only reads
+        are issued, so `conn` may be read-only (see `load_gazetteer`).
+
+        Args:
+            conn: The connection to the registry.
+            min_len: The minimum normalized key length.
+
+        Returns:
+            The gazetteer.
+        """
+        entries: Dict[str, Tuple[str, str]] = {}
+        spellings: Dict[str, List[str]] = {}
+        rows = conn.execute(
+            "SELECT normalized_label, canonical_id, type, COALESCE(primary_name, normalized_label) FROM entities ORDER BY canonical_id"
+        ).fetchall()
+        rows += conn.execute(
+            "SELECT a.alias, a.canonical_id, e.type, a.alias FROM aliases a JOIN entities e ON e.canonical_id = a.canonical_id "
+            "ORDER BY a.canonical_id, a.alias"
+        ).fetchall()
+        for label, cid, etype, surface in rows:
+            key = normalize_label(label)
+            if len(key) < min_len:
+                continue
+            if entries.setdefault(key, (cid, etype))[0] == cid and normalize_label(surface) == key:
+                spellings.setdefault(key, []).append(surface)
+        return cls(entries, spellings)
+
+    def save(self, path: str) -> None:
+        """Writes the automaton to a compact JSON file.
+
+        Args:
+            path: The path to the output file.
+        """
+        obj = {
+            "format": FORMAT_VERSION,
+            "keys": self.keys,
+            "canonical_ids": self.canonical_ids,
+            "types": self.types,
+            "cased": self.cased,
+            "edge_off": self._edge_off,
+            "edge_chr": self._edge_chr,
+            "edge_dst": self._edge_dst,
+            "fail": self._fail,
+            "dict_link": self._dict,
+            "term": self._term,
+        }
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            json.dump(obj, f, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "Gazetteer":
+        """Loads an automaton written by `save` without rebuilding it.
+
+        The flat arrays are used as stored; no per-node structures are built.
+
+        Args:
+            path: The path to the gazetteer file.
+
+        Returns:
+            The gazetteer.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+        if obj.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported gazetteer format: {obj.get('format')!r}")
+        g = cls.__new__(cls)
+        g.keys = obj["keys"]
+        g.canonical_ids = obj["canonical_ids"]
+        g.types = obj["types"]
+        g.cased = obj["cased"]
+        g._edge_off = obj["edge_off"]
+        g._edge_chr = obj["edge_chr"]
+        g._edge_dst = obj["edge_dst"]
+        g._fail = obj["fail"]
+        g._dict = obj["dict_link"]
+        g._term = obj["term"]
+        return g
+
+    def spans(self, text: str) -> List[Tuple[int, int, int]]:
+        """Finds non-overlapping key occurrences on word boundaries.
+
+        Args:
+            text: The text to scan.
+
+        Returns:
+            A list of (start, end, key index) tuples in text order.
+        """
+        low = _lower_same_length(text)
+        off, chars, dst = self._edge_off, self._edge_chr, self._edge_dst
+        fail, dict_link, term, keys, cased = self._fail, self._dict, self._term, self.keys, self.cased
+        n = len(low)
+        # best[start] = (end, key) of the longest boundary-respecting hit starting there
+        best: Dict[int, Tuple[int, int]] = {}
+        node = 0
+        for i, ch in enumerate(low):
+            while True:
+                lo, hi = off[node], off[node + 1]
+                k = bisect_left(chars, ch, lo, hi)
+                if k < hi and chars[k] == ch:
+                    node = dst[k]
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            out = node if term[node] >= 0 else dict_link[node]
+            while out > 0:
+                idx = term[out]
+                end = i + 1
+                start = end - len(keys[idx])
+                if ((start == 0 or not (_is_word(low[start - 1]) and _is_word(low[start])))
+                        and (end == n or not (_is_word(low[end]) and _is_word(low[end - 1])))
+                        and (not cased[idx] or text[start:end] in cased[idx])):
+                    prev = best.get(start)
+                    if prev is None or end > prev[0]:
+                        best[start] = (end, idx)
+                out = dict_link[out]
+        hits: List[Tuple[int, int, int]] = []
+        last_end = 0
+        for start in sorted(best):
+            if start < last_end:
+                continue
+            end, idx = best[start]
+            hits.append((start, end, idx))
+            last_end = end
+        return hits
+
+    def extract(self, text: str, doc_id: str, chunk_id: str, source_sha1: str, conf: float = 0.9) -> List[Entity]:
+        """Tags alias occurrences in a chunk of text.
+
+        Args:
+            text: The text to process.
+            doc_id: The ID of the document.
+            chunk_id: The ID of the chunk.
+            source_sha1: The SHA1 hash of the source text.
+            conf: The confidence assigned to gazetteer hits.
+
+        Returns:
+            A list of entities carrying their registry `canonical_id`.
+        """
+        ents: List[Entity] = []
+        for a, b, idx in self.spans(text):
+            t = text[a:b]
+            ents.append(Entity(
+                id=_sha16(f"{doc_id}|{chunk_id}|{a}|{b}|{t}"), chunk_id=chunk_id, doc_id=doc_id, type=self.types[idx],
+                text=t, start=a, end=b, conf=conf, source_sha1=source_sha1, canonical_id=self.canonical_ids[idx],
+            ))
+        return ents
+
+
+def merge_mentions(primary: List[Entity], secondary: List[Entity]) -> List[Entity]:
+    """Merges two sorted mention lists, dropping secondary mentions that overlap.
+
+    Args:
+        primary: The preferred mentions (e.g. gazetteer hits).
+        secondary: The other mentions (e.g. rule hits).
+
+    Returns:
+        The merged mentions sorted by offset.
+    """
+    if not primary:
+        return list(secondary)
+    out = list(primary)
+    starts = [e.start for e in primary]
+    ends = [e.end for e in primary]
+    for e in secondary:
+        k = bisect_right(starts, e.start) - 1
+        if k >= 0 and ends[k] > e.start:
+            continue
+        if k + 1 < len(starts) and starts[k + 1] < e.end:
+            continue
+        out.append(e)
+    out.sort(key=lambda e: (e.start, e.end))
+    return out
+
+
+def load_gazetteer(gazetteer_path: Optional[str] = None, registry_path: Optional[str] = None) -> Optional[Gazetteer]:
+    """Loads or builds a gazetteer.
+
+    With a registry, the automaton is built from it over a read-only
+    connection (and written to `gazetteer_path` when given); otherwise
+    `gazetteer_path` is loaded.
+
+    Args:
+        gazetteer_path: The path to a saved gazetteer.
+        registry_path: The path to a link registry.
+
+    Returns:
+        The gazetteer, or None if neither path is given.
+    """
+    if registry_path:
+        if not os.path.isfile(registry_path):
+            raise FileNotFoundError(f"registry not found: {registry_path}")
+        conn = sqlite3.connect(pathlib.Path(registry_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            g = Gazetteer.from_registry(conn)
+        finally:
+            conn.close()
+        if gazetteer_path:
+            g.save(gazetteer_path)
+        return g
+    if gazetteer_path:
+        return Gazetteer.load(gazetteer_path)
+    return None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .contracts import Entity
+
+
+def _sorted_by(ents: Iterable[Entity], types: Optional[Iterable[str]], key: str) -> List[Entity]:
+    """Selects entities of the given types, sorted by an offset attribute.
+
+    Args:
+        ents: The entities.
+        types: The entity types to keep (case-insensitive), or None for all.
+        key: The attribute to sort by ("start" or "end"); ties are broken by
+            start and end.
+
+    Returns:
+        The selected entities in sorted order.
+    """
+    wanted = {t.upper() for t in types} if types is not None else None
+    picked = [e for e in ents if wanted is None or (e.type or "").upper() in wanted]
+    picked.sort(key=lambda e: (getattr(e, key), e.start, e.end))
+    return picked
+
+
+def candidate_pairs(
+    entities: Iterable[Entity],
+    head_types: Optional[Iterable[str]] = None,
+    tail_types: Optional[Iterable[str]] = None,
+    *,
+    direction: str = "after",
+    max_chars: Optional[int] = None,
+    max_sents: Optional[int] = None,
+    nearest: bool = False,
+) -> Iterator[Tuple[Entity, Entity]]:
+    """Generates (head, tail) relation candidates within a window.
+
+    Heads and tails are sorted by offset once. For each head, the first
+    tail past it is found with a bisect and tails are walked outwards until
+    the window closes, so the cost is O((h + t) log t + pairs) rather than
+    O(h * t).
+
+    Args:
+        entities: The entities of one chunk (or document, if offsets share a
+            frame).
+        head_types: The head entity types (None for any type).
+        tail_types: The tail entity types (None for any type).
+        direction: "after" pairs each head with tails starting after its end;
+            "before" with tails ending before its start.
+        max_chars: The maximum gap in characters between head and tail.
+        max_sents: The maximum distance in sentences, using `sent_index`
+            (ignored for pairs where it is unknown).
+        nearest: Whether to yield only the closest tail per head.
+
+    Yields:
+        (head, tail) pairs, grouped by head in offset order and ordered by
+        distance within a head.
+    """
+    if direction not in ("after", "before"):
+        raise ValueError(f"unknown direction: {direction!r}")
+    entities = list(entities)
+    heads = _sorted_by(entities, head_types, "start")
+    key = "start" if direction == "after" else "end"
+    tails = _sorted_by(entities, tail_types, key)
+    marks = [getattr(t, key) for t in tails]
+
+    def _outside(h: Entity, t: Entity) -> bool:
+        gap = t.start - h.end if direction == "after" else h.start - t.end
+        if max_chars is not None and gap > max_chars:
+            return True
+        if max_sents is not None and h.sent_index is not None and t.sent_index is not None:
+            return abs(t.sent_index - h.sent_index) > max_sents
+        return False
+
+    for h in heads:
+        if direction == "after":
+            k, step, stop = bisect_right(marks, h.end), 1, len(tails)
+        else:
+            k, step, stop = bisect_left(marks, h.start) - 1, -1, -1
+        while k != stop:
+            t = tails[k]
+            if _outside(h, t):
+                break
+            yield h, t
+            if nearest:
+                break
+            k += step
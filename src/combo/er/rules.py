@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .contracts import Entity, _sha16
+
+
+@dataclass
+class NerRule:
+    """A single regex-based NER rule.
+
+    Attributes:
+        type: The entity type emitted for a match.
+        pattern: The regular expression. Numbered backreferences are not
+            supported because rules are combined into one pattern.
+        conf: The confidence assigned to matches.
+    """
+    type: str
+    pattern: str
+    conf: float = 0.8
+
+
+# Patterns: emails, urls, ALLCAPS words (ORG-ish), Capitalized words (PERSON-ish).
+# Order matters: when several rules match at the same position the first wins.
+DEFAULT_RULES: List[NerRule] = [
+    NerRule("EMAIL", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"),
+    NerRule("URL", r"https?://\S+|www\.\S+"),
+    NerRule("ORG", r"\b[A-Z]{2,}\b"),
+    NerRule("PERSON", r"\b[A-Z][a-z]+\b"),
+]
+
+
+class RuleEngine:
+    """Compiles NER rules into a single alternation scanned once per text.
+
+    Each rule becomes a named group `r<i>` of one combined pattern. The regex
+    engine scans left to right and, at each position, takes the first rule
+    that matches, so the returned spans never overlap and come out sorted.
+
+    Attributes:
+        name: The engine name.
+        rules: The compiled rules, in priority order.
+        version: A short hash of the rule set, for caches and manifests.
+    """
+
+    name = "rules"
+
+    def __init__(self, rules: Optional[Sequence[NerRule]] = None) -> None:
+        self.rules: List[NerRule] = list(rules if rules is not None else DEFAULT_RULES)
+        if not self.rules:
+            raise ValueError("rule set is empty")
+        for r in self.rules:
+            if re.compile(r.pattern).match(""):
+                raise ValueError(f"rule {r.type} matches the empty string")
+        self._groups: Dict[str, NerRule] = {f"r{i}": r for i, r in enumerate(self.rules)}
+        self._pattern = re.compile("|".join(f"(?P<r{i}>{r.pattern})" for i, r in enumerate(self.rules)))
+        spec = json.dumps([asdict(r) for r in self.rules], sort_keys=True)
+        self.version = hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+
+    def spans(self, text: str) -> List[Tuple[int, int, str, float]]:
+        """Finds non-overlapping rule matches in a text.
+
+        Args:
+            text: The text to scan.
+
+        Returns:
+            A list of (start, end, type, conf) tuples in text order.
+        """
+        out: List[Tuple[int, int, str, float]] = []
+        for m in self._pattern.finditer(text):
+            rule = self._groups[m.lastgroup]  # type: ignore[index]
+            out.append((m.start(), m.end(), rule.type, rule.conf))
+        return out
+
+    def extract(self, text: str, doc_id: str, chunk_id: str, source_sha1: str) -> List[Entity]:
+        """Extracts entities from a chunk of text.
+
+        Args:
+            text: The text to process.
+            doc_id: The ID of the document.
+            chunk_id: The ID of the chunk.
+            source_sha1: The SHA1 hash of the source text.
+
+        Returns:
+            A list of entities sorted by offset.
+        """
+        ents: List[Entity] = []
+        for a, b, etype, conf in self.spans(text):
+            t = text[a:b]
+            ents.append(Entity(
+                id=_sha16(f"{doc_id}|{chunk_id}|{a}|{b}|{t}"), chunk_id=chunk_id, doc_id=doc_id, type=etype,
+                text=t, start=a, end=b, conf=conf, source_sha1=source_sha1,
+            ))
+        return ents
+
+    def extract_batch(self, items: Sequence[Tuple[str, str, str, str]]) -> List[List[Entity]]:
+        """Extracts entities from several chunks.
+
+        Args:
+            items: (text, doc_id, chunk_id, source_sha1) tuples.
+
+        Returns:
+            The entities of each chunk, in input order.
+        """
+        return [self.extract(*item) for item in items]
+
+
+def load_rules(path: str) -> List[NerRule]:
+    """Loads NER rules from a JSON or YAML file.
+
+    The file holds a list of objects with `type`, `pattern` and an optional
+    `conf`, or an object with such a list under `rules`.
+
+    Args:
+        path: The path to the rules file.
+
+    Returns:
+        The rules, in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    data: Any
+    # Try YAML first if available (JSON is a subset of YAML)
+    try:
+        import yaml  # type: ignore
+        data = yaml.safe_load(text)
+    except Exception:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("rules") or []
+    return [NerRule(type=str(r["type"]), pattern=str(r["pattern"]), conf=float(r.get("conf", 0.8))) for r in data]
+
+
+# Compiled once at import time and shared by `simple_ner`.
+DEFAULT_ENGINE = RuleEngine()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .contracts import Entity, _sha16
+
+
+# spaCy labels that differ from the names used downstream (coref/link/fourw)
+LABEL_MAP: Dict[str, str] = {
+    "LOC": "LOCATION",
+    "FAC": "FACILITY",
+}
+
+# Components NER does not need; only those present in the pipeline are disabled
+UNUSED_PIPES = ("parser", "lemmatizer", "tagger", "morphologizer", "attribute_ruler", "senter")
+
+
+def map_label(label: str) -> str:
+    """Maps a spaCy entity label to the label used by the ER contract.
+
+    Args:
+        label: The spaCy label (e.g. "LOC").
+
+    Returns:
+        The ER entity type (e.g. "LOCATION").
+    """
+    return LABEL_MAP.get(label, label)
+
+
+class SpacyEngine:
+    """An ER engine backed by a spaCy NER pipeline.
+
+    Chunk texts are streamed through `nlp.pipe` in batches, with the parser,
+    lemmatizer and other components NER does not need disabled. The pipeline
+    is loaded lazily and is not pickled: each process pool worker loads its
+    own copy once. `n_process > 1` spawns spaCy's own processes per call,
+    which pays off for large documents; for many small documents prefer
+    `combo er --workers`.
+
+    Attributes:
+        name: The engine name.
+        model: The spaCy model (package name or path).
+        batch_size: The `nlp.pipe` batch size.
+        n_process: The `nlp.pipe` process count.
+        conf: The confidence assigned to spaCy entities (spaCy gives no scores).
+    """
+
+    name = "spacy"
+
+    def __init__(self, model: str = "en_core_web_sm", batch_size: int = 64, n_process: int = 1, conf: float = 0.85, nlp: Any = None) -> None:
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.n_process = max(1, int(n_process))
+        self.conf = conf
+        self._nlp = nlp
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_nlp"] = None
+        return state
+
+    @property
+    def nlp(self) -> Any:
+        """The loaded spaCy pipeline, restricted to what NER needs."""
+        if self._nlp is None:
+            try:
+                import spacy  # type: ignore
+            except ImportError as e:
+                raise RuntimeError("spaCy is required for --engine spacy. Install dependencies with Poetry first.") from e
+            self._nlp = spacy.load(self.model)
+        unused = [p for p in UNUSED_PIPES if p in self._nlp.pipe_names]
+        if unused:
+            self._nlp.select_pipes(disable=unused)
+        return self._nlp
+
+    @property
+    def version(self) -> str:
+        """A short hash of the spaCy and model versions and the engine settings."""
+        try:
+            import spacy  # type: ignore
+            spacy_version = spacy.__version__
+            model_version = spacy.util.get_package_version(self.model) or ""
+        except Exception:
+            spacy_version = model_version = ""
+        spec = f"{spacy_version}|{self.model}|{model_version}|{self.conf}"
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+
+    def _entities(self, doc: Any, doc_id: str, chunk_id: str, source_sha1: str) -> List[Entity]:
+        ents: List[Entity] = []
+        text = doc.text
+        for span in doc.ents:
+            a, b = span.start_char, span.end_char
+            t = text[a:b]
+            ents.append(Entity(
+                id=_sha16(f"{doc_id}|{chunk_id}|{a}|{b}|{t}"), chunk_id=chunk_id, doc_id=doc_id, type=map_label(span.label_),
+                text=t, start=a, end=b, conf=self.conf, source_sha1=source_sha1,
+            ))
+        return ents
+
+    def extract(self, text: str, doc_id: str, chunk_id: str, source_sha1: str) -> List[Entity]:
+        """Extracts entities from a chunk of text.
+
+        Args:
+            text: The text to process.
+            doc_id: The ID of the document.
+            chunk_id: The ID of the chunk.
+            source_sha1: The SHA1 hash of the source text.
+
+        Returns:
+            A list of entities sorted by offset.
+        """
+        return self.extract_batch([(text, doc_id, chunk_id, source_sha1)])[0]
+
+    def extract_batch(self, items: Sequence[Tuple[str, str, str, str]]) -> List[List[Entity]]:
+        """Extracts entities from several chunks with one `nlp.pipe` stream.
+
+        Args:
+            items: (text, doc_id, chunk_id, source_sha1) tuples.
+
+        Returns:
+            The entities of each chunk, in input order.
+        """
+        if not items:
+            return []
+        stream = ((text or "", (doc_id, chunk_id, sha1)) for text, doc_id, chunk_id, sha1 in items)
+        n_process = self.n_process if len(items) > self.batch_size else 1
+        out: List[List[Entity]] = []
+        for doc, (doc_id, chunk_id, sha1) in self.nlp.pipe(stream, as_tuples=True, batch_size=self.batch_size, n_process=n_process):
+            out.append(self._entities(doc, doc_id, chunk_id, sha1))
+        return out
+
+
+def load_spacy_engine(model: str = "en_core_web_sm", batch_size: int = 64, n_process: int = 1) -> SpacyEngine:
+    """Creates a spaCy engine and loads its pipeline eagerly (to fail fast).
+
+    Args:
+        model: The spaCy model.
+        batch_size: The `nlp.pipe` batch size.
+        n_process: The `nlp.pipe` process count.
+
+    Returns:
+        The engine.
+    """
+    engine = SpacyEngine(model=model, batch_size=batch_size, n_process=n_process)
+    engine.nlp  # noqa: B018 - load now so a missing model is reported up front
+    return engine
+
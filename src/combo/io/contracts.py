@@ -52,6 +52,8 @@ class Chunk:
         sentence_ids: A list of sentence IDs in the chunk.
         page_start: The starting page number of the chunk.
         page_end: The ending page number of the chunk.
+        overlap_chars: The length of the text prefix repeated from the
+            previous chunk (see `--overlap-sentences`); 0 without overlap.
     """
     doc_id: str
     chunk_id: str        # sha1(doc_id|first_sent_id|last_sent_id)[:16]
@@ -59,4 +61,5 @@ class Chunk:
     sentence_ids: List[str]
     page_start: Optional[int]
     page_end: Optional[int]
+    overlap_chars: int = 0
 
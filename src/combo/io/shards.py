@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+SHARD_DIR = "_shards"
+INDEX_NAME = "index.jsonl"
+
+
+@dataclass
+class NormalizedRef:
+    """Points at one normalized document, either a file or a shard record.
+
+    Attributes:
+        base: The document base name (e.g. "report.normalized"), used by
+            downstream stages to name their outputs.
+        path: The path to the normalized JSON file or to the shard file.
+        doc_id: The document ID, if known without loading the document.
+        offset: The byte offset of the record inside the shard file.
+        length: The byte length of the record inside the shard file.
+    """
+    base: str
+    path: str
+    doc_id: Optional[str] = None
+    offset: Optional[int] = None
+    length: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        """A short, human-readable name for reports."""
+        if self.offset is None:
+            return os.path.basename(self.path)
+        return f"{os.path.basename(self.path)}:{self.base}"
+
+
+def remove_shards(out_dir: str) -> None:
+    """Removes the shard files and the offset index of a normalized directory.
+
+    Args:
+        out_dir: The normalized directory.
+    """
+    shard_dir = os.path.join(out_dir, SHARD_DIR)
+    if not os.path.isdir(shard_dir):
+        return
+    for name in os.listdir(shard_dir):
+        if name.endswith(".jsonl"):
+            os.remove(os.path.join(shard_dir, name))
+
+
+class ShardWriter:
+    """Writes normalized documents into shard files with an offset index.
+
+    Each shard holds up to `docs_per_shard` documents, one compact JSON
+    object per line. `index.jsonl` maps every doc_id to its shard, byte
+    offset and length so single documents can be read without scanning.
+    Opening a writer removes the previous shards and any per-document
+    `*.normalized.json` files, so a directory never mixes both layouts.
+
+    Attributes:
+        shard_dir: The directory holding the shards and the index.
+        docs_per_shard: The maximum number of documents per shard.
+        refs: The references of all documents written so far.
+    """
+
+    def __init__(self, out_dir: str, docs_per_shard: int = 1000) -> None:
+        self.shard_dir = os.path.join(out_dir, SHARD_DIR)
+        self.docs_per_shard = max(1, int(docs_per_shard))
+        self.refs: List[NormalizedRef] = []
+        os.makedirs(self.shard_dir, exist_ok=True)
+        remove_shards(out_dir)
+        # Per-document files of an earlier unsharded run would be listed twice
+        for name in os.listdir(out_dir):
+            if name.endswith(".normalized.json"):
+                os.remove(os.path.join(out_dir, name))
+        self._fh = None
+        self._path = ""
+        self._in_shard = 0
+        self._n_shards = 0
+
+    def _roll(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self._path = os.path.join(self.shard_dir, f"normalized-{self._n_shards:05d}.jsonl")
+        self._n_shards += 1
+        self._fh = open(self._path, "wb")
+        self._in_shard = 0
+
+    def write(self, base: str, norm: Dict[str, Any]) -> NormalizedRef:
+        """Appends a normalized document to the current shard.
+
+        Args:
+            base: The document base name.
+            norm: The normalized document.
+
+        Returns:
+            A reference to the written record.
+        """
+        if self._fh is None or self._in_shard >= self.docs_per_shard:
+            self._roll()
+        data = (json.dumps(norm, ensure_ascii=False, sort_keys=True) + "\n").encode("utf-8")
+        offset = self._fh.tell()
+        self._fh.write(data)
+        self._in_shard += 1
+        ref = NormalizedRef(
+            base=base,
+            path=self._path,
+            doc_id=(norm.get("doc") or {}).get("doc_id"),
+            offset=offset,
+            length=len(data),
+        )
+        self.refs.append(ref)
+        return ref
+
+    def close(self) -> List[str]:
+        """Closes the current shard and writes the offset index.
+
+        Returns:
+            The paths of the shard files written.
+        """
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        with open(os.path.join(self.shard_dir, INDEX_NAME), "w", encoding="utf-8", newline="") as f:
+            for r in self.refs:
+                f.write(json.dumps({
+                    "base": r.base,
+                    "doc_id": r.doc_id,
+                    "shard": os.path.basename(r.path),
+                    "offset": r.offset,
+                    "length": r.length,
+                }, ensure_ascii=False, sort_keys=True))
+                f.write("\n")
+        return sorted({r.path for r in self.refs})
+
+
+def _read_index(norm_dir: str) -> List[NormalizedRef]:
+    """Reads the shard offset index of a normalized directory.
+
+    Args:
+        norm_dir: The normalized directory.
+
+    Returns:
+        A list of shard references in index order (empty if unsharded).
+    """
+    shard_dir = os.path.join(norm_dir, SHARD_DIR)
+    index_path = os.path.join(shard_dir, INDEX_NAME)
+    if not os.path.isfile(index_path):
+        return []
+    refs: List[NormalizedRef] = []
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            refs.append(NormalizedRef(
+                base=row["base"],
+                path=os.path.join(shard_dir, row["shard"]),
+                doc_id=row.get("doc_id"),
+                offset=int(row["offset"]),
+                length=int(row["length"]),
+            ))
+    return refs
+
+
+def list_normalized(norm_dir: str) -> List[NormalizedRef]:
+    """Lists the normalized documents of a directory without loading them.
+
+    Per-document `*.json` files come first (in directory order), followed by
+    any documents stored in `_shards/`.
+
+    Args:
+        norm_dir: The normalized directory.
+
+    Returns:
+        A list of document references.
+    """
+    refs: List[NormalizedRef] = []
+    for name in os.listdir(norm_dir):
+        if not name.lower().endswith('.json'):
+            continue
+        refs.append(NormalizedRef(base=os.path.splitext(name)[0], path=os.path.join(norm_dir, name)))
+    refs.extend(_read_index(norm_dir))
+    return refs
+
+
+def load_normalized(ref: NormalizedRef) -> Dict[str, Any]:
+    """Loads the normalized document a reference points at.
+
+    Args:
+        ref: The document reference.
+
+    Returns:
+        The normalized document.
+    """
+    if ref.offset is None:
+        with open(ref.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with open(ref.path, 'rb') as f:
+        f.seek(ref.offset)
+        return json.loads(f.read(ref.length).decode('utf-8'))
+
+
+def iter_normalized(norm_dir: str) -> Iterator[Tuple[NormalizedRef, Dict[str, Any]]]:
+    """Iterates over the readable normalized documents of a directory.
+
+    Shard records are read sequentially with one open handle per shard.
+    Unreadable documents are skipped.
+
+    Args:
+        norm_dir: The normalized directory.
+
+    Yields:
+        A tuple of the document reference and the loaded document.
+    """
+    fh = None
+    fh_path = None
+    try:
+        for ref in list_normalized(norm_dir):
+            try:
+                if ref.offset is None:
+                    data = load_normalized(ref)
+                else:
+                    if fh_path != ref.path:
+                        if fh is not None:
+                            fh.close()
+                        fh = open(ref.path, 'rb')
+                        fh_path = ref.path
+                    fh.seek(ref.offset)
+                    data = json.loads(fh.read(ref.length).decode('utf-8'))
+            except Exception:
+                continue
+            yield ref, data
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+# Index path -> ((mtime_ns, size), doc_id -> ref), reloaded when the index changes
+_INDEX_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, NormalizedRef]]] = {}
+
+
+def _index_by_doc(norm_dir: str) -> Dict[str, NormalizedRef]:
+    """Maps the doc_ids of a shard offset index to their references.
+
+    The mapping is built once per index file and reused until the file
+    changes, so lookups do not rescan the index.
+
+    Args:
+        norm_dir: The normalized directory.
+
+    Returns:
+        A dictionary mapping doc_ids to shard references (empty if unsharded).
+    """
+    index_path = os.path.abspath(os.path.join(norm_dir, SHARD_DIR, INDEX_NAME))
+    try:
+        st = os.stat(index_path)
+    except OSError:
+        _INDEX_CACHE.pop(index_path, None)
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _INDEX_CACHE.get(index_path)
+    if cached is None or cached[0] != stamp:
+        by_doc: Dict[str, NormalizedRef] = {}
+        for ref in _read_index(norm_dir):
+            if ref.doc_id:
+                by_doc.setdefault(ref.doc_id, ref)
+        cached = _INDEX_CACHE[index_path] = (stamp, by_doc)
+    return cached[1]
+
+
+def read_normalized_doc(norm_dir: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    """Reads a single sharded document by doc_id using the offset index.
+
+    Args:
+        norm_dir: The normalized directory.
+        doc_id: The document ID.
+
+    Returns:
+        The normalized document, or None if it is not in the shard index.
+    """
+    ref = _index_by_doc(norm_dir).get(doc_id)
+    return load_normalized(ref) if ref is not None else None
+
+
+class NormalizedCatalog:
+    """Finds normalized documents by base name or doc_id without loading them all.
+
+    The catalog is built once from file names and the shard index. Documents
+    stored as individual files do not expose their doc_id without being read,
+    so a doc_id lookup that misses triggers a single pass that records the
+    doc_id of every such file (each document is loaded and released in turn).
+    """
+
+    def __init__(self, norm_dir: str) -> None:
+        self._refs = list_normalized(norm_dir)
+        self._by_base: Dict[str, NormalizedRef] = {r.base: r for r in self._refs}
+        self._by_doc: Dict[str, NormalizedRef] = {r.doc_id: r for r in self._refs if r.doc_id}
+        self._scanned = False
+
+    @property
+    def refs(self) -> List[NormalizedRef]:
+        """All document references, in listing order."""
+        return list(self._refs)
+
+    def by_base(self, base: str) -> Optional[NormalizedRef]:
+        """Looks up a document by its base name.
+
+        Args:
+            base: The document base name (e.g. "report.normalized").
+
+        Returns:
+            The document reference, or None.
+        """
+        return self._by_base.get(base)
+
+    def by_doc_id(self, doc_id: str) -> Optional[NormalizedRef]:
+        """Looks up a document by doc_id.
+
+        Args:
+            doc_id: The document ID.
+
+        Returns:
+            The document reference, or None.
+        """
+        ref = self._by_doc.get(doc_id)
+        if ref is None and not self._scanned:
+            self._scanned = True
+            for r in self._refs:
+                if r.doc_id is not None:
+                    continue
+                try:
+                    r.doc_id = (load_normalized(r).get('doc') or {}).get('doc_id')
+                except Exception:
+                    continue
+                if r.doc_id:
+                    self._by_doc.setdefault(r.doc_id, r)
+            ref = self._by_doc.get(doc_id)
+        return ref
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import contextlib
+import glob
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+SENTENCE_COLUMNS = ["doc_id", "sent_id", "sent_index", "page", "char_start", "char_end", "n_tokens", "text"]
+CHUNK_COLUMNS = ["doc_base", "doc_id", "chunk_id", "chunk_index", "sentence_ids", "page_start", "page_end", "n_tokens", "text"]
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _shard_dirs(tables_dir: str, name: str) -> List[str]:
+    """Lists the shard directories of a table in shard order.
+
+    Args:
+        tables_dir: The directory containing the table shards.
+        name: The table name (e.g. "sentences" or "chunks").
+
+    Returns:
+        A sorted list of shard directories.
+    """
+    return sorted(p for p in glob.glob(os.path.join(glob.escape(tables_dir), f"{name}-*")) if os.path.isdir(p))
+
+
+class TableWriter:
+    """Writes rows of a corpus-level table to columnar shards.
+
+    Rows are flat dictionaries restricted to a fixed column list. A new shard
+    directory (`{name}-00000/`, `{name}-00001/`, ...) is started every
+    `shard_rows` rows; inside it every column is its own file
+    (`{column}.jsonl`, one JSON value per row), so readers open only the
+    columns they need. Existing shards of the table are replaced.
+
+    Attributes:
+        tables_dir: The directory the shards are written to.
+        name: The table name.
+        columns: The columns written for each row.
+        shard_rows: The maximum number of rows per shard.
+        rows: The number of rows written by this writer.
+        shards: The shard directory names written by this writer.
+    """
+
+    def __init__(self, tables_dir: str, name: str, columns: Sequence[str], shard_rows: int = 100000) -> None:
+        self.tables_dir = tables_dir
+        self.name = name
+        self.columns = list(columns)
+        self.shard_rows = max(1, int(shard_rows))
+        self.rows = 0
+        self.shards: List[str] = []
+        os.makedirs(tables_dir, exist_ok=True)
+        for p in _shard_dirs(tables_dir, name):
+            shutil.rmtree(p)
+        self._fhs: Dict[str, Any] = {}
+        self._in_shard = 0
+
+    def _close_shard(self) -> None:
+        for fh in self._fhs.values():
+            fh.close()
+        self._fhs = {}
+
+    def _roll(self) -> None:
+        self._close_shard()
+        shard_name = f"{self.name}-{len(self.shards):05d}"
+        shard_dir = os.path.join(self.tables_dir, shard_name)
+        os.makedirs(shard_dir)
+        self._fhs = {c: open(os.path.join(shard_dir, f"{c}.jsonl"), "w", encoding="utf-8", newline="") for c in self.columns}
+        self._in_shard = 0
+        self.shards.append(shard_name)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """Writes a single row, projected onto the writer's columns.
+
+        Args:
+            row: The row to write.
+        """
+        if not self._fhs or self._in_shard >= self.shard_rows:
+            self._roll()
+        for c, fh in self._fhs.items():
+            fh.write(json.dumps(row.get(c), ensure_ascii=False, sort_keys=True))
+            fh.write("\n")
+        self._in_shard += 1
+        self.rows += 1
+
+    def close(self) -> None:
+        """Closes the current shard."""
+        self._close_shard()
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def sentence_rows(norm: Dict[str, Any], token_counter: Callable[[str], int]) -> Iterator[Dict[str, Any]]:
+    """Yields sentence table rows for a normalized document.
+
+    Args:
+        norm: A normalized document as produced by `normalize_item`.
+        token_counter: The token counter the chunks were packed with, so
+            `n_tokens` matches the chunk budget.
+
+    Yields:
+        One flat row per sentence.
+    """
+    for i, s in enumerate(norm.get("sentences", [])):
+        yield {
+            **s,
+            "sent_index": i,
+            "n_tokens": token_counter(s.get("text") or ""),
+        }
+
+
+def chunk_rows(norm: Dict[str, Any], token_counter: Callable[[str], int], doc_base: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yields chunk table rows for a normalized document.
+
+    Args:
+        norm: A normalized document as produced by `normalize_item`.
+        token_counter: The token counter the chunks were packed with, so
+            `n_tokens` matches the chunk budget.
+        doc_base: The base name of the normalized document (e.g.
+            "report.normalized"), which downstream stages name outputs by.
+
+    Yields:
+        One flat row per chunk.
+    """
+    for i, ch in enumerate(norm.get("chunks", [])):
+        yield {
+            **ch,
+            "doc_base": doc_base,
+            "chunk_index": i,
+            "n_tokens": token_counter(ch.get("text") or ""),
+        }
+
+
+def write_manifest(tables_dir: str, writers: Iterable[TableWriter], docs: Optional[List[str]] = None) -> str:
+    """Writes a manifest describing the tables in a directory.
+
+    Args:
+        tables_dir: The tables directory.
+        writers: The (closed) writers whose tables should be described.
+        docs: The base names of the documents covered, in row order.
+
+    Returns:
+        The path to the manifest file.
+    """
+    tables: Dict[str, Any] = {}
+    for w in writers:
+        tables[w.name] = {
+            "columns": list(w.columns),
+            "shards": [os.path.basename(p) for p in _shard_dirs(tables_dir, w.name)],
+            "rows_written": w.rows,
+        }
+    path = os.path.join(tables_dir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": "jsonl-columns", "tables": tables, "docs": list(docs or [])}, f, ensure_ascii=False, sort_keys=True, indent=2)
+    return path
+
+
+def read_manifest(tables_dir: str) -> Optional[Dict[str, Any]]:
+    """Reads the manifest of a tables directory.
+
+    Args:
+        tables_dir: The tables directory.
+
+    Returns:
+        The manifest, or None if it is missing, unreadable or of another
+        format.
+    """
+    try:
+        with open(os.path.join(tables_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and manifest.get("format") == "jsonl-columns" else None
+
+
+def iter_table(tables_dir: str, name: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Iterates over the rows of a table across all of its shards.
+
+    Only the files of the requested columns are opened and parsed.
+
+    Args:
+        tables_dir: The directory containing the table shards.
+        name: The table name (e.g. "sentences" or "chunks").
+        columns: Optional columns to read; all columns are returned if None.
+
+    Yields:
+        One dictionary per row, in shard and row order.
+    """
+    for shard_dir in _shard_dirs(tables_dir, name):
+        if columns:
+            cols = list(columns)
+        else:
+            cols = sorted(os.path.splitext(n)[0] for n in os.listdir(shard_dir) if n.endswith(".jsonl"))
+        with contextlib.ExitStack() as stack:
+            files = [stack.enter_context(open(os.path.join(shard_dir, f"{c}.jsonl"), "r", encoding="utf-8")) for c in cols]
+            for values in zip(*files):
+                yield {c: json.loads(v) for c, v in zip(cols, values)}
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Legal-form suffixes dropped from blocking keys ("Lockheed Martin Corp." ~ "Lockheed-Martin")
+CORP_SUFFIXES = frozenset({
+    "co", "company", "corp", "corporation", "inc", "incorporated", "llc", "llp", "lp",
+    "ltd", "limited", "plc", "gmbh", "ag", "sa", "nv", "bv", "pty",
+})
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+_SOUNDEX = {c: d for d, letters in (("1", "bfpv"), ("2", "cgjkqsxz"), ("3", "dt"), ("4", "l"), ("5", "mn"), ("6", "r")) for c in letters}
+
+# Candidates scored per lookup (those sharing the most blocking keys)
+MAX_CANDIDATES = 20
+
+# Longest posting list read per key; more frequent keys are skipped like stop words
+MAX_POSTINGS = 200
+
+
+def blocking_tokens(label: str) -> List[str]:
+    """Splits a label into lowercase tokens without punctuation or legal-form suffixes.
+
+    Args:
+        label: The label.
+
+    Returns:
+        The tokens, in order.
+    """
+    tokens = _NON_WORD.sub(" ", (label or "").lower()).split()
+    kept = [t for t in tokens if t not in CORP_SUFFIXES]
+    return kept or tokens
+
+
+def token_key(label: str) -> str:
+    """Computes the sorted-token key of a label.
+
+    Args:
+        label: The label.
+
+    Returns:
+        The tokens sorted and joined with spaces.
+    """
+    return " ".join(sorted(blocking_tokens(label)))
+
+
+def qgrams(key: str, q: int = 3) -> Set[str]:
+    """Computes the padded character q-grams of a key.
+
+    Args:
+        key: A sorted-token key.
+        q: The gram length.
+
+    Returns:
+        The set of q-grams.
+    """
+    s = f"#{key.replace(' ', '#')}#"
+    if len(s) <= q:
+        return {s}
+    return {s[i:i + q] for i in range(len(s) - q + 1)}
+
+
+def soundex(token: str) -> str:
+    """Computes the American Soundex code of a token.
+
+    Args:
+        token: A lowercase token.
+
+    Returns:
+        The four-character code, or the token itself if it has no letters.
+    """
+    letters = [c for c in token if "a" <= c <= "z"]
+    if not letters:
+        return token
+    code = letters[0].upper()
+    prev = _SOUNDEX.get(letters[0], "")
+    for c in letters[1:]:
+        d = _SOUNDEX.get(c, "")
+        if d and d != prev:
+            code += d
+            if len(code) == 4:
+                break
+        if c not in "hw":
+            prev = d
+    return code.ljust(4, "0")
+
+
+def phonetic_key(label: str) -> str:
+    """Computes the phonetic key of a label (sorted Soundex codes of its tokens).
+
+    Args:
+        label: The label.
+
+    Returns:
+        The phonetic key.
+    """
+    return " ".join(sorted(soundex(t) for t in blocking_tokens(label)))
+
+
+def similarity(a: str, b: str) -> float:
+    """Scores two sorted-token keys by the Jaccard similarity of their 3-grams.
+
+    Args:
+        a: A sorted-token key.
+        b: Another sorted-token key.
+
+    Returns:
+        The similarity in [0, 1].
+    """
+    if a == b:
+        return 1.0
+    ga, gb = qgrams(a), qgrams(b)
+    return len(ga & gb) / len(ga | gb)
+
+
+def init_blocking(conn: sqlite3.Connection) -> None:
+    """Creates the blocking tables and indexes the canonicals not yet blocked.
+
+    The highest `entities` rowid already indexed is kept in `registry_meta`
+    (`blocked_rowid`), so startup only reads the canonicals created since the
+    previous blocking run instead of counting the whole registry.
+
+    Args:
+        conn: The connection to the registry.
+    """
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS blocking_keys (
+            type TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            canonical_id TEXT NOT NULL,
+            UNIQUE(type, kind, key, canonical_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS blocking_names (
+            canonical_id TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            UNIQUE(canonical_id, name_key)
+        );
+        """
+    )
+    row = conn.execute("SELECT value FROM registry_meta WHERE key='blocked_rowid'").fetchone()
+    blocked = int(row[0]) if row else 0
+    max_rowid = conn.execute("SELECT MAX(rowid) FROM entities").fetchone()[0] or 0
+    if blocked > max_rowid:
+        # Rowids were renumbered (e.g. by VACUUM); re-index everything (idempotent)
+        blocked = 0
+    if blocked < max_rowid:
+        index = BlockingIndex(conn)
+        rows = conn.execute(
+            "SELECT canonical_id, type, COALESCE(primary_name, normalized_label) FROM entities "
+            "WHERE rowid > ? AND rowid <= ? ORDER BY rowid",
+            (blocked, max_rowid),
+        ).fetchall()
+        for can_id, ent_type, name in rows:
+            index.add(can_id, ent_type, name)
+        _set_blocked_rowid(conn, max_rowid)
+    conn.commit()
+
+
+def _set_blocked_rowid(conn: sqlite3.Connection, rowid: int) -> None:
+    """Records the highest `entities` rowid whose canonical is indexed.
+
+    Args:
+        conn: The connection to the registry.
+        rowid: The new watermark.
+    """
+    conn.execute(
+        "INSERT INTO registry_meta(key, value) VALUES ('blocked_rowid', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (rowid,),
+    )
+
+
+class BlockingIndex:
+    """Fuzzy candidate generation over the materialized blocking tables.
+
+    Every indexed name contributes its sorted-token key, its phonetic key and
+    its character 3-grams to `blocking_keys`. A lookup fetches the canonicals
+    of the same type sharing the most keys through the index, skipping keys
+    too frequent to discriminate, then scores only those with `similarity`,
+    so the cost of a lookup is bounded regardless of the registry size.
+    Writes go through the registry connection and are committed with the
+    registry writes; `checkpoint` records the canonicals indexed during a
+    run so the next `init_blocking` does not index them again.
+
+    Attributes:
+        conn: The connection to the registry.
+        threshold: The minimum similarity to link (`link_conf`).
+        lookups: The number of fuzzy lookups.
+        matched: The number of lookups that linked to an existing canonical.
+        scored: The number of candidates scored.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, threshold: float = 0.75) -> None:
+        self.conn = conn
+        self.threshold = threshold
+        self.lookups = 0
+        self.matched = 0
+        self.scored = 0
+
+    @staticmethod
+    def _keys(name: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """Computes the blocking keys of a name.
+
+        Args:
+            name: The name.
+
+        Returns:
+            A tuple of the sorted-token key and the (kind, key) pairs to
+            index: the token key, the phonetic key and the 3-grams.
+        """
+        tkey = token_key(name)
+        keys = [("tok", tkey), ("sdx", phonetic_key(name))]
+        keys.extend(("q3", g) for g in sorted(qgrams(tkey)))
+        return tkey, keys
+
+    def add(self, canonical_id: str, ent_type: str, name: str) -> None:
+        """Indexes a name of a canonical entity.
+
+        A name already indexed for the canonical costs one statement; its
+        blocking keys are only written the first time.
+
+        Args:
+            canonical_id: The canonical ID.
+            ent_type: The entity type.
+            name: The name (primary name or alias).
+        """
+        tkey, keys = self._keys(name)
+        if not tkey:
+            return
+        ent_type_u = (ent_type or "").upper()
+        cur = self.conn.execute("INSERT OR IGNORE INTO blocking_names(canonical_id, name_key) VALUES (?,?)", (canonical_id, tkey))
+        if cur.rowcount == 0:
+            return
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO blocking_keys(type, kind, key, canonical_id) VALUES (?,?,?,?)",
+            [(ent_type_u, kind, key, canonical_id) for kind, key in keys],
+        )
+
+    def match(self, ent_type: str, name: str) -> Optional[str]:
+        """Finds the best existing canonical for a name.
+
+        Args:
+            ent_type: The entity type.
+            name: The surface name.
+
+        Returns:
+            The canonical ID scoring at least `threshold` (ties broken by ID),
+            or None. A canonical with the same token key scores 1.0; among
+            several, the first indexed wins.
+        """
+        tkey, keys = self._keys(name)
+        if not tkey:
+            return None
+        self.lookups += 1
+        ent_type_u = (ent_type or "").upper()
+        exact = self.conn.execute(
+            "SELECT canonical_id FROM blocking_keys WHERE type=? AND kind='tok' AND key=? ORDER BY rowid LIMIT 1",
+            (ent_type_u, tkey),
+        ).fetchone()
+        if exact is not None and 1.0 >= self.threshold:
+            self.matched += 1
+            return exact[0]
+        # Keys shared by more than MAX_POSTINGS canonicals do not discriminate; skip them
+        shared: Counter = Counter()
+        for kind, key in keys:
+            posting = [row[0] for row in self.conn.execute(
+                "SELECT canonical_id FROM blocking_keys WHERE type=? AND kind=? AND key=? LIMIT ?",
+                (ent_type_u, kind, key, MAX_POSTINGS + 1),
+            )]
+            if len(posting) <= MAX_POSTINGS:
+                shared.update(posting)
+        cands = sorted(shared, key=lambda c: (-shared[c], c))[:MAX_CANDIDATES]
+        if not cands:
+            return None
+        name_keys: Dict[str, List[str]] = {}
+        for can_id, nk in self.conn.execute(
+            f"SELECT canonical_id, name_key FROM blocking_names WHERE canonical_id IN ({','.join('?' * len(cands))})",
+            cands,
+        ):
+            name_keys.setdefault(can_id, []).append(nk)
+        best: Optional[Tuple[float, str]] = None
+        for can_id in cands:
+            self.scored += 1
+            score = max((similarity(tkey, nk) for nk in name_keys.get(can_id, ())), default=0.0)
+            if score >= self.threshold and (best is None or (-score, can_id) < (-best[0], best[1])):
+                best = (score, can_id)
+        if best is None:
+            return None
+        self.matched += 1
+        return best[1]
+
+    def checkpoint(self) -> None:
+        """Marks every canonical in the registry as indexed.
+
+        Call after the run's registry writes are flushed: every canonical
+        created since `init_blocking` went through `add`, so the next
+        `init_blocking` only needs to index canonicals created without the
+        blocking index. The watermark is committed with the registry writes.
+        """
+        max_rowid = self.conn.execute("SELECT MAX(rowid) FROM entities").fetchone()[0] or 0
+        _set_blocked_rowid(self.conn, max_rowid)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarizes fuzzy linking for run reports.
+
+        Returns:
+            A dictionary of counters.
+        """
+        return {'lookups': self.lookups, 'matched': self.matched, 'scored': self.scored}
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import pathlib
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+
+FORMAT = 1
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings.
+
+    Bit positions come from double hashing one BLAKE2b digest, so the filter
+    is stable across processes and Python versions.
+
+    Attributes:
+        m: The number of bits.
+        k: The number of hash functions.
+    """
+
+    def __init__(self, m: int, k: int, bits: Optional[bytes] = None) -> None:
+        self.m = max(8, int(m))
+        self.k = max(1, int(k))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.m + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, n: int, fp_rate: float = 0.01) -> "BloomFilter":
+        """Sizes a filter for `n` keys at a target false-positive rate.
+
+        Args:
+            n: The expected number of keys.
+            fp_rate: The target false-positive rate.
+
+        Returns:
+            An empty filter.
+        """
+        n = max(1, n)
+        m = math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2))
+        return cls(m, round(m / n * math.log(2)))
+
+    def _positions(self, key: str) -> Iterable[int]:
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key: str) -> None:
+        """Adds a key.
+
+        Args:
+            key: The key.
+        """
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+def is_compiled(path: Optional[str]) -> bool:
+    """Checks whether a cache file is a compiled cache (rather than JSON).
+
+    Args:
+        path: The path to the cache file.
+
+    Returns:
+        True if the file is a compiled cache.
+    """
+    if not path or not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+
+
+def compile_cache(items: Dict[str, str], out_path: str, source: str, fp_rate: float = 0.01) -> int:
+    """Writes a compiled external ID cache.
+
+    The lookup table is a clustered (WITHOUT ROWID) B-tree keyed on the
+    normalized name, and the Bloom filter is stored alongside it so misses
+    (the common case) never touch the table.
+
+    Args:
+        items: A dictionary mapping normalized names to IDs (as returned by
+            the source's `load_cache`).
+        out_path: The path of the compiled cache (replaced if it exists).
+        source: The source name (e.g. "wikidata").
+        fp_rate: The Bloom filter false-positive rate.
+
+    Returns:
+        The number of keys written.
+    """
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    bloom = BloomFilter.for_capacity(len(items), fp_rate)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF;")
+        conn.execute("PRAGMA synchronous=OFF;")
+        conn.execute("CREATE TABLE lookup (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value) WITHOUT ROWID")
+        rows: List[Tuple[str, str]] = sorted(items.items())
+        for key, _ in rows:
+            bloom.add(key)
+        with conn:
+            # Sorted keys append to the B-tree in order (dense pages, no splits)
+            conn.executemany("INSERT INTO lookup(key, value) VALUES (?,?)", rows)
+            conn.executemany("INSERT INTO meta(name, value) VALUES (?,?)", [
+                ("format", FORMAT), ("source", source), ("count", len(rows)),
+                ("bloom_m", bloom.m), ("bloom_k", bloom.k), ("bloom_bits", bytes(bloom.bits)),
+            ])
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+    return len(rows)
+
+
+class CompiledCache:
+    """A read-only, memory-mapped view of a compiled external ID cache.
+
+    Opening reads only the metadata and the Bloom filter; lookups that pass
+    the filter are single B-tree probes. It supports the subset of the dict
+    interface the adapters use (`get`, `in`, `len`, truthiness), so it can be
+    passed wherever a loaded JSON cache is. The connection is not pickled:
+    each process reopens the file on first use. Opening with `source` set
+    fails with ValueError unless the cache was compiled for that source.
+
+    Attributes:
+        path: The path of the compiled cache.
+        source: The source name recorded at compile time.
+    """
+
+    def __init__(self, path: str, source: Optional[str] = None) -> None:
+        self.path = os.path.abspath(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        meta = dict(self._connect().execute("SELECT name, value FROM meta").fetchall())
+        if meta.get("format") != FORMAT:
+            self.close()
+            raise ValueError(f"unsupported compiled cache format in {path}: {meta.get('format')!r}")
+        self.source = str(meta.get("source") or "")
+        if source is not None and self.source != source:
+            # e.g. a UEI cache passed as the Wikidata cache would attach wrong IDs
+            self.close()
+            raise ValueError(f"compiled cache {path} is for {self.source!r}, not {source!r}")
+        self._count = int(meta.get("count") or 0)
+        self._bloom = BloomFilter(meta["bloom_m"], meta["bloom_k"], meta["bloom_bits"])
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            uri = pathlib.Path(self.path).as_uri() + "?mode=ro&immutable=1"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._conn.execute("PRAGMA mmap_size=1073741824;")
+        return self._conn
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_conn"] = None
+        return state
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Looks up the ID of a normalized name.
+
+        Args:
+            key: The normalized name.
+            default: The value returned for missing keys.
+
+        Returns:
+            The ID, or `default`.
+        """
+        if key not in self._bloom:
+            return default
+        row = self._connect().execute("SELECT value FROM lookup WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def close(self) -> None:
+        """Closes the underlying connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
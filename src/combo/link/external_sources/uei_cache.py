@@ -2,20 +2,28 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
+from .compiled import CompiledCache, is_compiled
 
-def load_cache(path: Optional[str] = None) -> Dict[str, str]:
-    """Loads a UEI cache from a JSON file.
+
+def load_cache(path: Optional[str] = None) -> Union[Dict[str, str], CompiledCache]:
+    """Loads a UEI cache from a JSON file or a compiled cache.
 
     Args:
-        path: The path to the JSON file.
+        path: The path to the JSON file, or to a cache compiled with
+            `combo link compile-cache` (opened without loading it).
+            A compiled cache must have been compiled for UEI
+            (ValueError otherwise).
 
     Returns:
-        A dictionary mapping normalized names to UEI IDs.
+        A dictionary (or dict-like `CompiledCache`) mapping normalized names
+        to UEI IDs.
     """
     if not path or not os.path.isfile(path):
         return {}
+    if is_compiled(path):
+        return CompiledCache(path, source="uei")
     with open(path, 'r', encoding='utf-8') as f:
         data = json.load(f)
     out: Dict[str, str] = {}
@@ -34,7 +42,7 @@ def load_cache(path: Optional[str] = None) -> Dict[str, str]:
     return out
 
 
-def lookup(normalized_name: str, cache: Dict[str, str]) -> Optional[str]:
+def lookup(normalized_name: str, cache: Union[Dict[str, str], CompiledCache]) -> Optional[str]:
     """Looks up a UEI ID for a normalized name.
 
     Args:
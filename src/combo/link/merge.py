@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List
+
+from .registry import drop_fts_triggers, rebuild_fts
+
+# Conflicts listed per kind in the report (all are counted)
+MAX_LISTED_CONFLICTS = 1000
+
+
+def _is_registry(conn: sqlite3.Connection, schema: str) -> bool:
+    """Tells whether an attached database has the registry tables.
+
+    Args:
+        conn: The connection to the target registry.
+        schema: The schema name the database is attached under.
+
+    Returns:
+        True if it has the entities, aliases and external_ids tables.
+    """
+    names = {r[0] for r in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table'")}
+    return {"entities", "aliases", "external_ids"} <= names
+
+
+def _conflicts(conn: sqlite3.Connection, sql: str, keys: List[str], source: str, out: Dict[str, Any], kind: str) -> None:
+    """Records the conflicts a query finds for one source.
+
+    Every conflict is counted; only the first `MAX_LISTED_CONFLICTS` of a
+    kind, across sources, are listed.
+
+    Args:
+        conn: The connection to the target registry.
+        sql: The query returning one row per conflict.
+        keys: The names of the query's columns.
+        source: The path of the source registry.
+        out: The merge report, updated in place.
+        kind: The conflict kind (`entities` or `external_ids`).
+    """
+    rows = conn.execute(sql).fetchall()
+    out['counts'][kind] += len(rows)
+    room = MAX_LISTED_CONFLICTS - len(out[kind])
+    out[kind].extend({'source': source, **dict(zip(keys, r))} for r in rows[:max(0, room)])
+
+
+def merge_registries(conn: sqlite3.Connection, sources: List[str]) -> Dict[str, Any]:
+    """Merges registry files into an open registry.
+
+    Each source is attached and copied with one `INSERT OR IGNORE ... SELECT`
+    per table, in source order, so the first registry to define a canonical,
+    alias or external ID wins, exactly as if the link runs had shared one
+    registry. A source canonical whose (type, normalized_label) already exists
+    under another ID is mapped onto the existing ID, so its aliases and
+    external IDs are kept. Conflicts are reported, not resolved:
+
+    - `entities`: a (type, normalized_label) stored under different IDs;
+    - `external_ids`: an external ID attached to different canonicals.
+
+    All sources are checked to be registries before anything is copied
+    (ValueError otherwise, with the target unchanged). FTS triggers are
+    suspended during the copy and the FTS indexes are rebuilt once at the
+    end; planner statistics are refreshed with `ANALYZE`.
+
+    Args:
+        conn: The connection to the target registry (from `open_registry`).
+        sources: The paths of the registries to merge in.
+
+    Returns:
+        A dictionary of rows added per table and the conflicts found.
+    """
+    # Every source is checked before the first insert, so a bad one leaves the target untouched
+    for path in sources:
+        conn.execute("ATTACH DATABASE ? AS src", (path,))
+        try:
+            if not _is_registry(conn, "src"):
+                raise ValueError(f"not a registry: {path}")
+        finally:
+            conn.execute("DETACH DATABASE src")
+    fts = drop_fts_triggers(conn)
+    added = {'entities': 0, 'aliases': 0, 'external_ids': 0}
+    report: Dict[str, Any] = {'entities': [], 'external_ids': [], 'counts': {'entities': 0, 'external_ids': 0}}
+    try:
+        for path in sources:
+            conn.execute("ATTACH DATABASE ? AS src", (path,))
+            try:
+                with conn:
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS merge_map (src_id TEXT PRIMARY KEY, dst_id TEXT NOT NULL) WITHOUT ROWID")
+                    conn.execute("DELETE FROM merge_map")
+                    conn.execute(
+                        "INSERT INTO merge_map(src_id, dst_id) SELECT s.canonical_id, m.canonical_id "
+                        "FROM src.entities s JOIN main.entities m ON m.type = s.type AND m.normalized_label = s.normalized_label "
+                        "WHERE m.canonical_id <> s.canonical_id"
+                    )
+                    _conflicts(
+                        conn,
+                        "SELECT m.type, m.normalized_label, d.dst_id, d.src_id FROM merge_map d "
+                        "JOIN main.entities m ON m.canonical_id = d.dst_id ORDER BY m.type, m.normalized_label",
+                        ['type', 'normalized_label', 'canonical_id', 'other_canonical_id'], path, report, 'entities',
+                    )
+                    _conflicts(
+                        conn,
+                        "SELECT s.source, s.external_id, m.canonical_id, COALESCE(d.dst_id, s.canonical_id) AS other "
+                        "FROM src.external_ids s JOIN main.external_ids m ON m.source = s.source AND m.external_id = s.external_id "
+                        "LEFT JOIN merge_map d ON d.src_id = s.canonical_id "
+                        "WHERE m.canonical_id <> COALESCE(d.dst_id, s.canonical_id) ORDER BY s.source, s.external_id",
+                        ['source', 'external_id', 'canonical_id', 'other_canonical_id'], path, report, 'external_ids',
+                    )
+                    added['entities'] += conn.execute(
+                        "INSERT OR IGNORE INTO main.entities(canonical_id, type, normalized_label, primary_name) "
+                        "SELECT canonical_id, type, normalized_label, primary_name FROM src.entities ORDER BY rowid"
+                    ).rowcount
+                    added['aliases'] += conn.execute(
+                        "INSERT OR IGNORE INTO main.aliases(canonical_id, alias) "
+                        "SELECT COALESCE(d.dst_id, a.canonical_id), a.alias FROM src.aliases a "
+                        "LEFT JOIN merge_map d ON d.src_id = a.canonical_id ORDER BY a.rowid"
+                    ).rowcount
+                    added['external_ids'] += conn.execute(
+                        "INSERT OR IGNORE INTO main.external_ids(canonical_id, source, external_id) "
+                        "SELECT COALESCE(d.dst_id, x.canonical_id), x.source, x.external_id FROM src.external_ids x "
+                        "LEFT JOIN merge_map d ON d.src_id = x.canonical_id ORDER BY x.rowid"
+                    ).rowcount
+            finally:
+                conn.execute("DETACH DATABASE src")
+    finally:
+        if fts:
+            rebuild_fts(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return {'sources': len(sources), 'added': added, 'conflicts': report}
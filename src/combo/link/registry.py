@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import sqlite3
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 
 def normalize_label(label: str) -> str:
@@ -31,6 +32,7 @@ def open_registry(path: str, enable_fts: bool = False) -> sqlite3.Connection:
     conn = sqlite3.connect(path)
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.create_function("combo_uuid5", 2, deterministic_id, deterministic=True)
     init_schema(conn, enable_fts=enable_fts)
     return conn
 
@@ -64,15 +66,139 @@ def init_schema(conn: sqlite3.Connection, enable_fts: bool = False) -> None:
             external_id TEXT NOT NULL,
             UNIQUE(source, external_id)
         );
+
+        CREATE TABLE IF NOT EXISTS registry_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
         """
     )
-    if enable_fts:
-        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(primary_name, content='entities', content_rowid='rowid')")
-        # Populate if empty
-        conn.execute("INSERT INTO entities_fts(rowid, primary_name) SELECT rowid, COALESCE(primary_name,'') FROM entities WHERE rowid NOT IN (SELECT rowid FROM entities_fts)")
+    if enable_fts and not _has_fts(conn):
+        # First use (or a registry from before the triggers): create and index once
+        conn.executescript(_FTS_SCHEMA)
+        rebuild_fts(conn)
     conn.commit()
 
 
+# External-content FTS5 tables kept in sync with entities/aliases by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(primary_name, content='entities', content_rowid='rowid');
+CREATE VIRTUAL TABLE IF NOT EXISTS aliases_fts USING fts5(alias, content='aliases', content_rowid='rowid');
+
+CREATE TRIGGER IF NOT EXISTS entities_fts_ai AFTER INSERT ON entities BEGIN
+    INSERT INTO entities_fts(rowid, primary_name) VALUES (new.rowid, new.primary_name);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_fts_ad AFTER DELETE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, primary_name) VALUES ('delete', old.rowid, old.primary_name);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_fts_au AFTER UPDATE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, primary_name) VALUES ('delete', old.rowid, old.primary_name);
+    INSERT INTO entities_fts(rowid, primary_name) VALUES (new.rowid, new.primary_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS aliases_fts_ai AFTER INSERT ON aliases BEGIN
+    INSERT INTO aliases_fts(rowid, alias) VALUES (new.rowid, new.alias);
+END;
+CREATE TRIGGER IF NOT EXISTS aliases_fts_ad AFTER DELETE ON aliases BEGIN
+    INSERT INTO aliases_fts(aliases_fts, rowid, alias) VALUES ('delete', old.rowid, old.alias);
+END;
+CREATE TRIGGER IF NOT EXISTS aliases_fts_au AFTER UPDATE ON aliases BEGIN
+    INSERT INTO aliases_fts(aliases_fts, rowid, alias) VALUES ('delete', old.rowid, old.alias);
+    INSERT INTO aliases_fts(rowid, alias) VALUES (new.rowid, new.alias);
+END;
+"""
+
+_FTS_TRIGGERS = ("entities_fts_ai", "entities_fts_ad", "entities_fts_au", "aliases_fts_ai", "aliases_fts_ad", "aliases_fts_au")
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    """Tells whether the FTS index is maintained by its triggers.
+
+    Args:
+        conn: The connection to the registry.
+
+    Returns:
+        True if all of `_FTS_TRIGGERS` exist, i.e. the FTS tables are set up
+        and not suspended by `drop_fts_triggers`.
+    """
+    marks = ",".join("?" * len(_FTS_TRIGGERS))
+    n = conn.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({marks})", _FTS_TRIGGERS).fetchone()[0]
+    return n == len(_FTS_TRIGGERS)
+
+
+def drop_fts_triggers(conn: sqlite3.Connection) -> bool:
+    """Suspends FTS maintenance before a bulk load (`rebuild_fts` restores it).
+
+    Args:
+        conn: The connection to the registry.
+
+    Returns:
+        Whether the registry had FTS enabled.
+    """
+    enabled = _has_fts(conn)
+    if enabled:
+        for name in _FTS_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.commit()
+    return enabled
+
+
+def rebuild_fts(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """Rebuilds the registry FTS indexes from the entities and aliases tables.
+
+    Triggers keep the indexes current, so this is only needed once when FTS
+    is enabled on an existing registry, or after operations that renumber
+    rowids (e.g. `VACUUM`).
+
+    Args:
+        conn: The connection to the registry.
+
+    Returns:
+        A tuple of the number of entities and aliases indexed.
+    """
+    conn.executescript(_FTS_SCHEMA)
+    with conn:
+        conn.execute("INSERT INTO entities_fts(entities_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO aliases_fts(aliases_fts) VALUES ('rebuild')")
+    n_ents = conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+    n_aliases = conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+    return n_ents, n_aliases
+
+
+def search_registry(conn: sqlite3.Connection, text: str, limit: int = 10) -> List[Tuple[str, str, Optional[str]]]:
+    """Searches canonical names and aliases with the registry FTS indexes.
+
+    Every token of `text` must match (tokens are quoted, so FTS syntax in the
+    input is taken literally).
+
+    Args:
+        conn: The connection to a registry opened with `enable_fts`.
+        text: The text to search for.
+        limit: The maximum number of results.
+
+    Returns:
+        (canonical_id, type, primary_name) tuples, best match (bm25) first.
+    """
+    query = " ".join('"' + tok.replace('"', '""') + '"' for tok in (text or "").split())
+    if not query:
+        return []
+    rows = conn.execute(
+        """
+        SELECT e.canonical_id, e.type, e.primary_name, MIN(m.score) AS best
+        FROM (
+            SELECT x.canonical_id AS cid, bm25(entities_fts) AS score
+            FROM entities_fts JOIN entities x ON x.rowid = entities_fts.rowid WHERE entities_fts MATCH ?
+            UNION ALL
+            SELECT a.canonical_id AS cid, bm25(aliases_fts) AS score
+            FROM aliases_fts JOIN aliases a ON a.rowid = aliases_fts.rowid WHERE aliases_fts MATCH ?
+        ) m JOIN entities e ON e.canonical_id = m.cid
+        GROUP BY e.canonical_id ORDER BY best, e.canonical_id LIMIT ?
+        """,
+        (query, query, int(limit)),
+    ).fetchall()
+    return [(cid, typ, name) for cid, typ, name, _ in rows]
+
+
 def deterministic_id(ent_type: str, normalized_label: str) -> str:
     """Generates a deterministic UUIDv5 for an entity.
 
@@ -153,3 +279,386 @@ def add_external_id(conn: sqlite3.Connection, canonical_id: str, source: str, ex
     )
     conn.commit()
 
+
+def resolve_canonicals(conn: sqlite3.Connection, groups: Sequence[Tuple[str, str, Optional[str]]]) -> List[str]:
+    """Gets or creates the canonical entities of a batch with set-based SQL.
+
+    The distinct keys of the batch (with the primary name of their first
+    group) are bulk-inserted into a temporary staging table. Missing
+    canonicals and the aliases of their primary names are created with one
+    `INSERT OR IGNORE ... SELECT` each, and the IDs are resolved with a single
+    join back to `entities`. The result is the same as calling
+    `get_or_create_canonical` for each group in order. The writes join the
+    caller's open transaction and are not committed here, so they commit
+    together with the rest of the batch (e.g. in `BulkRegistryWriter.flush`).
+    The connection must come from `open_registry`, which registers the
+    `combo_uuid5` SQL function.
+
+    Args:
+        conn: The connection to the registry.
+        groups: (type, normalized label, primary name) tuples.
+
+    Returns:
+        The canonical ID of each group, in input order.
+    """
+    if not groups:
+        return []
+    keys: Dict[Tuple[str, str], int] = {}
+    staged: List[Tuple[int, str, str, Optional[str]]] = []
+    order: List[int] = []
+    for ent_type, label, name in groups:
+        key = ((ent_type or "").upper(), normalize_label(label))
+        ordinal = keys.get(key)
+        if ordinal is None:
+            ordinal = keys[key] = len(staged)
+            staged.append((ordinal, key[0], key[1], name))
+        order.append(ordinal)
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS link_stage ("
+        "ord INTEGER PRIMARY KEY, type TEXT NOT NULL, normalized_label TEXT NOT NULL, primary_name TEXT, new INTEGER)"
+    )
+    conn.execute("DELETE FROM link_stage")
+    conn.executemany("INSERT INTO link_stage(ord, type, normalized_label, primary_name) VALUES (?,?,?,?)", staged)
+    conn.execute(
+        "UPDATE link_stage SET new = NOT EXISTS (SELECT 1 FROM entities e "
+        "WHERE e.type = link_stage.type AND e.normalized_label = link_stage.normalized_label)"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO entities(canonical_id, type, normalized_label, primary_name) "
+        "SELECT combo_uuid5(type, normalized_label), type, normalized_label, primary_name "
+        "FROM link_stage WHERE new ORDER BY ord"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO aliases(canonical_id, alias) "
+        "SELECT e.canonical_id, s.primary_name FROM link_stage s JOIN entities e "
+        "ON e.type = s.type AND e.normalized_label = s.normalized_label "
+        "WHERE s.new AND s.primary_name IS NOT NULL AND s.primary_name <> '' ORDER BY s.ord"
+    )
+    ids = [row[0] for row in conn.execute(
+        "SELECT e.canonical_id FROM link_stage s JOIN entities e "
+        "ON e.type = s.type AND e.normalized_label = s.normalized_label ORDER BY s.ord"
+    )]
+    conn.execute("DELETE FROM link_stage")
+    return [ids[o] for o in order]
+
+
+class RegistryCache:
+    """An in-process cache in front of registry lookups and writes.
+
+    Holds a bounded LRU of (type, normalized_label) -> canonical_id and the
+    (canonical_id, alias) and (source, external_id) pairs already written or
+    staged in this run, so repeated entities cost neither a SELECT nor a
+    redundant INSERT. The seen-sets are cleared when they outgrow `maxsize`.
+
+    Attributes:
+        maxsize: The maximum number of cached canonical keys.
+        hits: Canonical lookups served from the cache.
+        misses: Canonical lookups that went to SQLite.
+        aliases_skipped: Alias writes skipped as already seen.
+        external_ids_skipped: External ID writes skipped as already seen.
+        warmed: The number of keys preloaded by `warm`.
+    """
+
+    def __init__(self, maxsize: int = 100000) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._canon: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._aliases: Set[Tuple[str, str]] = set()
+        self._external_ids: Set[Tuple[str, str]] = set()
+        self.hits = 0
+        self.misses = 0
+        self.aliases_skipped = 0
+        self.external_ids_skipped = 0
+        self.warmed = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        """Looks up a canonical ID, counting the hit or miss.
+
+        Args:
+            key: The (uppercased type, normalized label) key.
+
+        Returns:
+            The canonical ID, or None.
+        """
+        can_id = self._canon.get(key)
+        if can_id is None:
+            self.misses += 1
+            return None
+        self._canon.move_to_end(key)
+        self.hits += 1
+        return can_id
+
+    def put(self, key: Tuple[str, str], canonical_id: str) -> None:
+        """Caches a canonical ID, evicting the least recently used key if full.
+
+        Args:
+            key: The (uppercased type, normalized label) key.
+            canonical_id: The canonical ID.
+        """
+        self._canon[key] = canonical_id
+        self._canon.move_to_end(key)
+        if len(self._canon) > self.maxsize:
+            self._canon.popitem(last=False)
+
+    def see_alias(self, canonical_id: str, alias: str) -> bool:
+        """Records an alias write.
+
+        Args:
+            canonical_id: The canonical ID.
+            alias: The alias.
+
+        Returns:
+            True if the alias was already seen (the write can be skipped).
+        """
+        key = (canonical_id, alias)
+        if key in self._aliases:
+            self.aliases_skipped += 1
+            return True
+        if len(self._aliases) >= self.maxsize:
+            self._aliases.clear()
+        self._aliases.add(key)
+        return False
+
+    def see_external_id(self, source: str, external_id: str) -> bool:
+        """Records an external ID write.
+
+        Args:
+            source: The source of the external ID.
+            external_id: The external ID.
+
+        Returns:
+            True if the external ID was already seen (the write can be skipped;
+            the first writer keeps it either way).
+        """
+        key = (source, external_id)
+        if key in self._external_ids:
+            self.external_ids_skipped += 1
+            return True
+        if len(self._external_ids) >= self.maxsize:
+            self._external_ids.clear()
+        self._external_ids.add(key)
+        return False
+
+    def warm(self, conn: sqlite3.Connection, limit: int) -> int:
+        """Preloads the hottest canonical keys (by alias count) from the registry.
+
+        Args:
+            conn: The connection to the registry.
+            limit: The maximum number of keys to preload.
+
+        Returns:
+            The number of keys preloaded.
+        """
+        rows = conn.execute(
+            "SELECT e.type, e.normalized_label, e.canonical_id FROM entities e "
+            "LEFT JOIN aliases a ON a.canonical_id = e.canonical_id "
+            "GROUP BY e.canonical_id ORDER BY COUNT(a.alias) DESC, e.canonical_id LIMIT ?",
+            (min(int(limit), self.maxsize),),
+        ).fetchall()
+        # Insert coldest first so the hottest keys are the most recently used
+        for ent_type, norm, can_id in reversed(rows):
+            self.put((ent_type, norm), can_id)
+        self.warmed = len(rows)
+        return self.warmed
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarizes cache effectiveness for run reports.
+
+        Returns:
+            A dictionary of counters, the hit rate and the SQLite round-trips
+            avoided.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'aliases_skipped': self.aliases_skipped,
+            'external_ids_skipped': self.external_ids_skipped,
+            'round_trips_avoided': self.hits + self.aliases_skipped + self.external_ids_skipped,
+            'warmed': self.warmed,
+            'size': len(self._canon),
+        }
+
+
+# Parameters per `IN (...)` lookup (below SQLite's default variable limit)
+_IN_BATCH = 500
+
+
+class BulkRegistryWriter:
+    """Stages registry writes and flushes them in a single transaction.
+
+    This mirrors `get_or_create_canonical`, `add_alias` and `add_external_id`
+    without a commit per call: new canonicals, aliases and external IDs are
+    staged in memory and written with `executemany` by `flush`. Canonical IDs
+    stay deterministic (`deterministic_id`) and `INSERT OR IGNORE` in staging
+    order keeps the first-writer-wins semantics of the per-call functions.
+
+    An optional `RegistryCache` serves repeated canonical lookups and skips
+    alias and external ID writes already seen in the run.
+
+    Attributes:
+        conn: The connection to the registry.
+        cache: The optional lookup cache.
+        flushes: The number of transactions committed so far.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, cache: Optional[RegistryCache] = None) -> None:
+        self.conn = conn
+        self.cache = cache
+        self.flushes = 0
+        self._staged: Dict[Tuple[str, str], str] = {}
+        self._entities: List[Tuple[str, str, str, Optional[str]]] = []
+        self._aliases: List[Tuple[str, str]] = []
+        self._external_ids: List[Tuple[str, str, str]] = []
+
+    @property
+    def pending(self) -> int:
+        """The number of staged rows not yet written."""
+        return len(self._entities) + len(self._aliases) + len(self._external_ids)
+
+    def _lookup(self, ent_type_u: str, norm: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT canonical_id FROM entities WHERE type=? AND normalized_label=?",
+            (ent_type_u, norm),
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_canonical(self, ent_type: str, normalized_label: str) -> Optional[str]:
+        """Gets an existing (or staged) canonical entity without creating it.
+
+        Args:
+            ent_type: The entity type.
+            normalized_label: The normalized label.
+
+        Returns:
+            The canonical ID, or None.
+        """
+        key = ((ent_type or "").upper(), normalize_label(normalized_label))
+        can_id = self._staged.get(key)
+        if can_id is None and self.cache is not None:
+            can_id = self.cache.get(key)
+        if can_id is None:
+            can_id = self._lookup(*key)
+            if can_id is not None and self.cache is not None:
+                self.cache.put(key, can_id)
+        return can_id
+
+    def existing_canonicals(self, canonical_ids: Iterable[str]) -> Set[str]:
+        """Checks which canonical IDs exist in the registry (or are staged).
+
+        IDs are looked up in batches of `IN (...)` queries, so checking the
+        canonical IDs carried by a batch of documents costs a few statements.
+
+        Args:
+            canonical_ids: The canonical IDs to check.
+
+        Returns:
+            The subset of the IDs that exist.
+        """
+        wanted = {c for c in canonical_ids if c}
+        found = wanted.intersection(self._staged.values())
+        todo = sorted(wanted - found)
+        for i in range(0, len(todo), _IN_BATCH):
+            part = todo[i:i + _IN_BATCH]
+            found.update(row[0] for row in self.conn.execute(
+                f"SELECT canonical_id FROM entities WHERE canonical_id IN ({','.join('?' * len(part))})", part,
+            ))
+        return found
+
+    def get_or_create_canonical(self, ent_type: str, normalized_label: str, primary_name: Optional[str] = None) -> str:
+        """Gets a canonical entity, staging its creation if it does not exist.
+
+        Args:
+            ent_type: The entity type.
+            normalized_label: The normalized label.
+            primary_name: The primary name of the entity.
+
+        Returns:
+            The canonical ID of the entity.
+        """
+        ent_type_u = (ent_type or "").upper()
+        norm = normalize_label(normalized_label)
+        key = (ent_type_u, norm)
+        can_id = self._staged.get(key)
+        if can_id is not None:
+            return can_id
+        if self.cache is not None:
+            can_id = self.cache.get(key)
+            if can_id is not None:
+                return can_id
+        can_id = self._lookup(ent_type_u, norm)
+        if can_id is None:
+            can_id = deterministic_id(ent_type_u, norm)
+            self._staged[key] = can_id
+            self._entities.append((can_id, ent_type_u, norm, primary_name))
+            if primary_name:
+                self._add_alias(can_id, primary_name)
+        if self.cache is not None:
+            self.cache.put(key, can_id)
+        return can_id
+
+    def _add_alias(self, canonical_id: str, alias: str) -> None:
+        if self.cache is not None and self.cache.see_alias(canonical_id, alias):
+            return
+        self._aliases.append((canonical_id, alias))
+
+    def add_alias(self, canonical_id: str, alias: str) -> None:
+        """Stages an alias for a canonical entity.
+
+        Args:
+            canonical_id: The canonical ID of the entity.
+            alias: The alias to add.
+        """
+        if not alias:
+            return
+        self._add_alias(canonical_id, alias)
+
+    def add_external_id(self, canonical_id: str, source: str, external_id: str) -> None:
+        """Stages an external ID for a canonical entity.
+
+        Args:
+            canonical_id: The canonical ID of the entity.
+            source: The source of the external ID.
+            external_id: The external ID.
+        """
+        if not external_id:
+            return
+        if self.cache is not None and self.cache.see_external_id(source, external_id):
+            return
+        self._external_ids.append((canonical_id, source, external_id))
+
+    def flush(self) -> int:
+        """Writes all staged rows in one transaction.
+
+        Writes already made on the connection in the open transaction (e.g.
+        by `resolve_canonicals`) are committed with them.
+
+        Returns:
+            The number of staged rows submitted.
+        """
+        n = self.pending
+        if n or self.conn.in_transaction:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO entities(canonical_id, type, normalized_label, primary_name) VALUES (?,?,?,?)",
+                    self._entities,
+                )
+                self.conn.executemany("INSERT OR IGNORE INTO aliases(canonical_id, alias) VALUES (?,?)", self._aliases)
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO external_ids(canonical_id, source, external_id) VALUES (?,?,?)",
+                    self._external_ids,
+                )
+            self.flushes += 1
+        self._staged.clear()
+        self._entities.clear()
+        self._aliases.clear()
+        self._external_ids.clear()
+        return n
+
+    def __enter__(self) -> "BulkRegistryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .registry import normalize_label
+
+MAGIC = b"CMBSNAP1"
+FORMAT = 1
+
+_HEADER = struct.Struct("<8sIQI")  # magic, format, generation, section count
+_SECTION = struct.Struct("<16sQQQ")  # name, record count, index offset, data offset
+_INDEX = struct.Struct("<QI")  # record offset (relative to data), key length
+
+# Separator of composite keys ((type, label), (source, external ID))
+SEP = "\x1f"
+
+SECTIONS = ("entities", "aliases", "external_ids", "canonicals")
+
+
+# Query per section: (key, value) rows ordered by their UTF-8 bytes, the order the reader bisects in
+_SECTION_SQL = {
+    "entities": "SELECT type || char(31) || normalized_label AS k, canonical_id AS v FROM entities",
+    "aliases": "SELECT alias AS k, canonical_id AS v FROM aliases",
+    "external_ids": "SELECT source || char(31) || external_id AS k, canonical_id AS v FROM external_ids",
+    "canonicals": (
+        "SELECT canonical_id AS k, type || char(31) || normalized_label || char(31) || COALESCE(primary_name, '') AS v "
+        "FROM entities"
+    ),
+}
+
+
+def _section_rows(conn: sqlite3.Connection, name: str) -> Iterator[Tuple[bytes, bytes]]:
+    """Streams the records of a snapshot section in key order.
+
+    SQLite sorts the rows (spilling to temporary files if needed), comparing
+    keys then values as UTF-8 bytes, so nothing is collected in memory.
+
+    Args:
+        conn: The connection to the registry.
+        name: The section name (one of `SECTIONS`).
+
+    Yields:
+        The (key, value) records, UTF-8 encoded.
+    """
+    for k, v in conn.execute(f"{_SECTION_SQL[name]} ORDER BY CAST(k AS BLOB), CAST(v AS BLOB)"):
+        yield k.encode("utf-8"), v.encode("utf-8")
+
+
+def _previous_generation(path: str) -> int:
+    """Reads the generation of an existing snapshot file.
+
+    Args:
+        path: The path of the snapshot file.
+
+    Returns:
+        Its generation, or 0 if the file is missing or not a snapshot.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, fmt, generation, _ = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == MAGIC and fmt == FORMAT else 0
+
+
+def write_snapshot(conn: sqlite3.Connection, out_path: str) -> Dict[str, Any]:
+    """Exports the registry to an immutable snapshot file.
+
+    Each section is streamed from SQLite in key order and written
+    incrementally, so memory use does not grow with the registry. All
+    sections are read in one read transaction, so the file is a
+    consistent view even while a link run keeps writing: nothing is written
+    to the registry, and WAL readers neither block nor wait for the writer.
+    The generation is that of the snapshot being replaced plus one. The file
+    is written next to `out_path`, synced to disk and renamed over it, so
+    readers holding the previous snapshot keep a valid mapping and a crash
+    never leaves a truncated snapshot in place.
+
+    Args:
+        conn: The connection to the registry.
+        out_path: The path of the snapshot file.
+
+    Returns:
+        A dictionary with the generation and the record count per section.
+    """
+    generation = _previous_generation(out_path) + 1
+    counts: Dict[str, int] = {}
+    table: List[bytes] = []
+    tmp_path = out_path + ".tmp"
+    conn.execute("BEGIN")
+    try:
+        with open(tmp_path, "wb") as f:
+            # The section table is written once the offsets are known
+            f.write(_HEADER.pack(MAGIC, FORMAT, generation, len(SECTIONS)))
+            f.write(b"\0" * (_SECTION.size * len(SECTIONS)))
+            for name in SECTIONS:
+                index_off = f.tell()
+                count = pos = 0
+                # Index entries go straight to the file, records to a spool copied after them
+                with tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(out_path))) as data:
+                    for k, v in _section_rows(conn, name):
+                        f.write(_INDEX.pack(pos, len(k)))
+                        data.write(k)
+                        data.write(v)
+                        pos += len(k) + len(v)
+                        count += 1
+                    f.write(_INDEX.pack(pos, 0))
+                    data_off = f.tell()
+                    data.seek(0)
+                    shutil.copyfileobj(data, f)
+                counts[name] = count
+                table.append(_SECTION.pack(name.encode("ascii"), count, index_off, data_off))
+            f.seek(_HEADER.size)
+            f.write(b"".join(table))
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        conn.execute("COMMIT")
+    os.replace(tmp_path, out_path)
+    return {"generation": generation, **counts}
+
+
+class _Section:
+    """A section of a mapped snapshot: sorted records located through an index.
+
+    Entry `i` of the index holds the offset of record `i` (relative to the
+    data start) and its key length; a final entry holds the end offset, so
+    a record's value runs up to the next entry's offset.
+
+    Attributes:
+        mm: The snapshot mapping.
+        count: The number of records.
+        index_off: The file offset of the index.
+        data_off: The file offset of the records.
+    """
+
+    def __init__(self, mm: mmap.mmap, count: int, index_off: int, data_off: int) -> None:
+        self.mm = mm
+        self.count = count
+        self.index_off = index_off
+        self.data_off = data_off
+
+    def _entry(self, i: int) -> Tuple[int, int]:
+        return _INDEX.unpack_from(self.mm, self.index_off + i * _INDEX.size)
+
+    def key(self, i: int) -> bytes:
+        off, klen = self._entry(i)
+        start = self.data_off + off
+        return self.mm[start:start + klen]
+
+    def value(self, i: int) -> str:
+        off, klen = self._entry(i)
+        end, _ = self._entry(i + 1)
+        return self.mm[self.data_off + off + klen:self.data_off + end].decode("utf-8")
+
+    def lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get_all(self, key: str) -> List[str]:
+        k = key.encode("utf-8")
+        out: List[str] = []
+        i = self.lower_bound(k)
+        while i < self.count and self.key(i) == k:
+            out.append(self.value(i))
+            i += 1
+        return out
+
+    def get(self, key: str) -> Optional[str]:
+        k = key.encode("utf-8")
+        i = self.lower_bound(k)
+        return self.value(i) if i < self.count and self.key(i) == k else None
+
+
+class RegistrySnapshot:
+    """A read-only, memory-mapped registry snapshot.
+
+    Opening maps the file and reads the section table only; lookups bisect
+    the sorted records in place (O(log n) page touches), so many processes
+    can share one snapshot through the page cache without touching SQLite.
+    The mapping is not pickled: unpickled copies reopen the file.
+
+    Attributes:
+        path: The path of the snapshot file.
+        generation: The registry generation the snapshot was taken at.
+        counts: The number of records per section.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, generation, n_sections = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            self._mm.close()
+            raise ValueError(f"not a registry snapshot (format {FORMAT}): {self.path}")
+        self.generation = generation
+        self._sections: Dict[str, _Section] = {}
+        for i in range(n_sections):
+            name, count, index_off, data_off = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            self._sections[name.rstrip(b"\0").decode("ascii")] = _Section(self._mm, count, index_off, data_off)
+        self.counts = {name: sec.count for name, sec in self._sections.items()}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.path = state["path"]
+        self._open()
+
+    def canonical_id(self, ent_type: str, label: str) -> Optional[str]:
+        """Looks up a canonical ID the way `get_or_create_canonical` keys it.
+
+        Args:
+            ent_type: The entity type.
+            label: The label (normalized here).
+
+        Returns:
+            The canonical ID, or None.
+        """
+        return self._sections["entities"].get(f"{(ent_type or '').upper()}{SEP}{normalize_label(label)}")
+
+    def alias_ids(self, alias: str) -> List[str]:
+        """Looks up the canonicals an exact alias belongs to.
+
+        Args:
+            alias: The alias.
+
+        Returns:
+            The canonical IDs, sorted.
+        """
+        return self._sections["aliases"].get_all(alias)
+
+    def external(self, source: str, external_id: str) -> Optional[str]:
+        """Looks up the canonical an external ID is attached to.
+
+        Args:
+            source: The source of the external ID.
+            external_id: The external ID.
+
+        Returns:
+            The canonical ID, or None.
+        """
+        return self._sections["external_ids"].get(f"{source}{SEP}{external_id}")
+
+    def canonical(self, canonical_id: str) -> Optional[Tuple[str, str, str]]:
+        """Looks up a canonical entity.
+
+        Args:
+            canonical_id: The canonical ID.
+
+        Returns:
+            A tuple of the type, normalized label and primary name, or None.
+        """
+        value = self._sections["canonicals"].get(canonical_id)
+        if value is None:
+            return None
+        ent_type, norm, name = value.split(SEP, 2)
+        return ent_type, norm, name
+
+    def close(self) -> None:
+        """Unmaps the snapshot."""
+        self._mm.close()
+
+    def __enter__(self) -> "RegistrySnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
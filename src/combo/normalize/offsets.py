@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def build_offset_index(sentences: List[Dict[str, Any]], chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Builds a compact sentence offset index for a normalized document.
+
+    The index holds, per page, the sorted page-relative start offsets of its
+    sentences and the document ordinal of its first sentence, and, per chunk,
+    the chunk-relative start offset of each of its sentences plus the
+    ordinal of its first sentence. Chunk text is the sentences joined by
+    single spaces and then stripped, so starts are measured in that joined
+    text (an empty or blank leading sentence shifts nothing). Offsets can
+    then be mapped to sentences with a bisect.
+
+    Args:
+        sentences: The document sentences, in document order.
+        chunks: The document chunks.
+
+    Returns:
+        The offset index.
+    """
+    pages: List[int] = []
+    page_first_sent: List[int] = []
+    page_starts: List[List[int]] = []
+    ordinal: Dict[str, int] = {}
+    for i, s in enumerate(sentences):
+        ordinal[s["sent_id"]] = i
+        page = s.get("page")
+        if page is None:
+            continue
+        if not pages or pages[-1] != page:
+            pages.append(page)
+            page_first_sent.append(i)
+            page_starts.append([])
+        page_starts[-1].append(int(s["char_start"]))
+
+    texts = [s.get("text") or "" for s in sentences]
+    chunk_map: Dict[str, Dict[str, Any]] = {}
+    for ch in chunks:
+        sids = ch.get("sentence_ids") or []
+        if not sids or sids[0] not in ordinal:
+            continue
+        first = ordinal[sids[0]]
+        group = texts[first:first + len(sids)]
+        joined = " ".join(group)
+        lead = len(joined) - len(joined.lstrip())
+        starts: List[int] = []
+        pos = 0
+        for t in group:
+            starts.append(max(0, pos - lead))
+            pos += len(t) + 1
+        chunk_map[ch["chunk_id"]] = {"first_sent": first, "starts": starts}
+
+    return {
+        "pages": pages,
+        "page_first_sent": page_first_sent,
+        "page_starts": page_starts,
+        "chunks": chunk_map,
+    }
+
+
+class OffsetIndex:
+    """Looks up sentences by character offset using a built offset index.
+
+    Attributes:
+        sent_ids: The sentence IDs in document order.
+    """
+
+    def __init__(self, index: Dict[str, Any], sent_ids: List[str]) -> None:
+        self._pages: List[int] = list(index.get("pages") or [])
+        self._page_first: List[int] = list(index.get("page_first_sent") or [])
+        self._page_starts: List[List[int]] = list(index.get("page_starts") or [])
+        self._page_pos = {p: i for i, p in enumerate(self._pages)}
+        self._chunks: Dict[str, Dict[str, Any]] = dict(index.get("chunks") or {})
+        self.sent_ids = sent_ids
+
+    @classmethod
+    def from_normalized(cls, obj: Dict[str, Any]) -> "OffsetIndex":
+        """Creates a lookup from a normalized document.
+
+        The stored `offsets` index is used when present; otherwise it is built
+        from the document's sentences and chunks.
+
+        Args:
+            obj: A normalized document.
+
+        Returns:
+            The offset lookup.
+        """
+        sentences = obj.get("sentences") or []
+        index = obj.get("offsets") or build_offset_index(sentences, obj.get("chunks") or [])
+        return cls(index, [s.get("sent_id") for s in sentences])
+
+    def page_of(self, sent_index: int) -> Optional[int]:
+        """Returns the page of a sentence given its document ordinal.
+
+        Args:
+            sent_index: The sentence ordinal.
+
+        Returns:
+            The 1-based page number, or None if unknown.
+        """
+        pos = bisect_right(self._page_first, sent_index) - 1
+        return self._pages[pos] if pos >= 0 else None
+
+    def locate_on_page(self, page: int, char_offset: int) -> Optional[int]:
+        """Maps a page-relative character offset to a sentence ordinal.
+
+        Args:
+            page: The 1-based page number.
+            char_offset: The character offset within the page text.
+
+        Returns:
+            The ordinal of the sentence starting at or before the offset, or
+            None if the page is unknown or the offset precedes its first
+            sentence.
+        """
+        pos = self._page_pos.get(page)
+        if pos is None:
+            return None
+        k = bisect_right(self._page_starts[pos], char_offset) - 1
+        return self._page_first[pos] + k if k >= 0 else None
+
+    def locate_in_chunk(self, chunk_id: str, char_offset: int) -> Optional[Tuple[int, str, Optional[int]]]:
+        """Maps a chunk-relative character offset to its sentence.
+
+        Args:
+            chunk_id: The chunk ID.
+            char_offset: The character offset within the chunk text.
+
+        Returns:
+            A tuple of the sentence ordinal, sentence ID and page, or None if
+            the chunk is unknown.
+        """
+        entry = self._chunks.get(chunk_id)
+        if entry is None:
+            return None
+        k = max(0, bisect_right(entry["starts"], char_offset) - 1)
+        idx = int(entry["first_sent"]) + k
+        if idx >= len(self.sent_ids):
+            return None
+        return idx, self.sent_ids[idx], self.page_of(idx)
@@ -4,11 +4,16 @@ import argparse
 import hashlib
 import json
 import os
+import shutil
 import uuid
+from collections import OrderedDict
 from dataclasses import asdict
-from typing import Iterable, List, Optional, Tuple, Dict, Any
+from typing import Callable, Iterable, List, Optional, Tuple, Dict, Any
 
 from ..io.contracts import ExtractedDoc, Sentence, Chunk
+from ..io.shards import ShardWriter, remove_shards
+from ..io.tables import CHUNK_COLUMNS, SENTENCE_COLUMNS, TableWriter, chunk_rows, sentence_rows, write_manifest
+from .offsets import build_offset_index
 
 
 NORMALIZER_NAME = "combo.segment"
@@ -122,54 +127,156 @@ def sentences_for_page(doc_id: str, page_index_1based: Optional[int], page_text:
     return sents
 
 
-def chunk_sentences(doc_id: str, sentences: List[Sentence], max_tokens: int = 512) -> List[Chunk]:
+def _whitespace_tokens(text: str) -> int:
+    """Counts whitespace-separated tokens in a string.
+
+    Args:
+        text: The text to count tokens for.
+
+    Returns:
+        The number of tokens.
+    """
+    return len((text or "").split())
+
+
+class CachedTokenCounter:
+    """Wraps a token counting function with a bounded cache keyed by text hash.
+
+    The wrapped function is typically an embedding model's `token_count`.
+    Counts are cached by the SHA1 of the text in an LRU of at most `maxsize`
+    entries, so repeated boilerplate sentences are only tokenized once while
+    memory stays flat on large corpora (joined chunk candidates are counted
+    through the same cache). If the wrapped function returns None,
+    whitespace tokens are used instead.
+
+    Attributes:
+        name: A name for the counter, recorded in the normalized meta.
+        maxsize: The maximum number of cached counts.
+        hits: The number of cache hits.
+        misses: The number of cache misses.
+    """
+
+    def __init__(self, fn: Callable[[str], Optional[int]], name: str = "custom", maxsize: int = 100000) -> None:
+        self._fn = fn
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text: str) -> int:
+        key = hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+        n = self._cache.get(key)
+        if n is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return n
+        self.misses += 1
+        n = self._fn(text)
+        if n is None:
+            n = _whitespace_tokens(text)
+        self._cache[key] = int(n)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return int(n)
+
+
+def _join(sentences: List[Sentence]) -> str:
+    """Joins sentences into chunk text.
+
+    Args:
+        sentences: The sentences of the chunk.
+
+    Returns:
+        The chunk text.
+    """
+    return " ".join(s.text for s in sentences).strip()
+
+
+def _overlap_chars(sentences: List[Sentence], shared: int) -> int:
+    """Measures the chunk text prefix made of sentences repeated from the previous chunk.
+
+    Args:
+        sentences: The sentences of the chunk.
+        shared: How many leading sentences the previous chunk also holds.
+
+    Returns:
+        The length of that prefix in the joined chunk text (see `_join`).
+    """
+    if shared <= 0:
+        return 0
+    full = " ".join(s.text for s in sentences)
+    lead = len(full) - len(full.lstrip())
+    prefix = len(" ".join(s.text for s in sentences[:shared])) - lead
+    return max(0, min(prefix, len(full.strip())))
+
+
+def chunk_sentences(
+    doc_id: str,
+    sentences: List[Sentence],
+    max_tokens: int = 512,
+    token_counter: Optional[Callable[[str], int]] = None,
+    overlap_sentences: int = 0,
+) -> List[Chunk]:
     """Chunks a list of sentences into larger text blocks.
 
+    Sentences are packed greedily until the next one would exceed
+    `max_tokens`. A sentence that alone exceeds the budget becomes its own
+    chunk. Tokenization of the joined text can differ from the sum of the
+    sentence counts (merges across the joins), so a chunk whose sum comes
+    within one token per join of the budget is re-counted as joined and
+    shrunk until it fits. With `overlap_sentences`, each chunk after the
+    first starts with the last sentences of the previous chunk (always
+    advancing by at least one sentence) and records the length of that
+    repeated prefix as `overlap_chars`, so consumers can skip it.
+
     Args:
         doc_id: The ID of the document.
         sentences: A list of sentences.
         max_tokens: The maximum number of tokens per chunk.
+        token_counter: A function returning the token count of a sentence,
+            e.g. a `CachedTokenCounter` over the embedding model tokenizer.
+            Defaults to whitespace tokens.
+        overlap_sentences: The number of sentences repeated at the start of
+            the next chunk.
 
     Returns:
         A list of chunks.
     """
+    count = token_counter or _whitespace_tokens
+    overlap = max(0, int(overlap_sentences))
+    toks = [count(s.text) for s in sentences]
     chunks: List[Chunk] = []
-    cur_ids: List[str] = []
-    cur_texts: List[str] = []
-    cur_pages: List[int] = []
-    cur_tokens = 0
-
-    def flush():
-        nonlocal cur_ids, cur_texts, cur_pages, cur_tokens
-        if not cur_ids:
-            return
-        first = cur_ids[0]
-        last = cur_ids[-1]
-        chunk_id = _sha16(f"{doc_id}|{first}|{last}")
-        page_start = min(cur_pages) if cur_pages else None
-        page_end = max(cur_pages) if cur_pages else None
+    n = len(sentences)
+    i = 0
+    prev_end = 0
+    while i < n:
+        j = i
+        cur_tokens = 0
+        while j < n and (j == i or cur_tokens + toks[j] <= max_tokens):
+            cur_tokens += toks[j]
+            j += 1
+        if token_counter is not None and cur_tokens + (j - i - 1) > max_tokens:
+            # The chunk as embedded is the joined text; drop sentences until it fits
+            while j - i > 1 and count(_join(sentences[i:j])) > max_tokens:
+                j -= 1
+        group = sentences[i:j]
+        pages = [s.page for s in group if s.page is not None]
         chunks.append(
             Chunk(
                 doc_id=doc_id,
-                chunk_id=chunk_id,
-                text=" ".join(cur_texts).strip(),
-                sentence_ids=list(cur_ids),
-                page_start=page_start,
-                page_end=page_end,
+                chunk_id=_sha16(f"{doc_id}|{group[0].sent_id}|{group[-1].sent_id}"),
+                text=_join(group),
+                sentence_ids=[s.sent_id for s in group],
+                page_start=min(pages) if pages else None,
+                page_end=max(pages) if pages else None,
+                overlap_chars=_overlap_chars(group, prev_end - i),
             )
         )
-        cur_ids, cur_texts, cur_pages, cur_tokens = [], [], [], 0
-
-    for s in sentences:
-        toks = len(s.text.split())
-        if cur_ids and cur_tokens + toks > max_tokens:
-            flush()
-        cur_ids.append(s.sent_id)
-        cur_texts.append(s.text)
-        if s.page is not None:
-            cur_pages.append(s.page)
-        cur_tokens += toks
-    flush()
+        if j >= n:
+            break
+        prev_end = j
+        i = max(j - overlap, i + 1)
     return chunks
 
 
@@ -226,13 +333,23 @@ def segment_to_sentences(item: Dict[str, Any]) -> List[Dict[str, Any]]:
     return out
 
 
-def build_chunks(sentences: List[Dict[str, Any]], doc_id: Optional[str] = None, max_tokens: int = 512) -> List[Dict[str, Any]]:
+def build_chunks(
+    sentences: List[Dict[str, Any]],
+    doc_id: Optional[str] = None,
+    max_tokens: int = 512,
+    token_counter: Optional[Callable[[str], int]] = None,
+    overlap_sentences: int = 0,
+) -> List[Dict[str, Any]]:
     """Builds chunks from a list of sentences.
 
     Args:
         sentences: A list of sentences.
         doc_id: The ID of the document.
         max_tokens: The maximum number of tokens per chunk.
+        token_counter: An optional function returning the token count of a
+            sentence.
+        overlap_sentences: The number of sentences shared between consecutive
+            chunks.
 
     Returns:
         A list of chunks, where each chunk is a dictionary.
@@ -250,11 +367,31 @@ def build_chunks(sentences: List[Dict[str, Any]], doc_id: Optional[str] = None,
         for s in sentences
     ]
     use_doc_id = doc_id or (s_objs[0].doc_id if s_objs else str(uuid.uuid4()))
-    chunks = chunk_sentences(use_doc_id, s_objs, max_tokens=max_tokens)
-    return [asdict(c) for c in chunks]
+    chunks = chunk_sentences(use_doc_id, s_objs, max_tokens=max_tokens, token_counter=token_counter, overlap_sentences=overlap_sentences)
+    return [_chunk_dict(c) for c in chunks]
+
 
+def _chunk_dict(chunk: Chunk) -> Dict[str, Any]:
+    """Serializes a chunk, omitting `overlap_chars` when there is no overlap.
+
+    Args:
+        chunk: The chunk.
 
-def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    Returns:
+        The chunk as a dictionary.
+    """
+    out = asdict(chunk)
+    if not out["overlap_chars"]:
+        del out["overlap_chars"]
+    return out
+
+
+def normalize_item(
+    item: Dict[str, Any],
+    max_tokens: int = 512,
+    token_counter: Optional[Callable[[str], int]] = None,
+    overlap_sentences: int = 0,
+) -> Dict[str, Any]:
     """Normalizes a single document.
 
     This function segments the document into sentences and chunks, and returns
@@ -262,6 +399,11 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
 
     Args:
         item: The document to normalize.
+        max_tokens: The maximum number of tokens per chunk.
+        token_counter: An optional function returning the token count of a
+            sentence (defaults to whitespace tokens).
+        overlap_sentences: The number of sentences shared between consecutive
+            chunks.
 
     Returns:
         A dictionary containing the normalized data.
@@ -274,7 +416,7 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
         page_num: Optional[int] = idx if len(doc.pages) > 1 else 1
         all_sents.extend(sentences_for_page(doc.doc_id, page_num, page_text or ""))
 
-    chunks = chunk_sentences(doc.doc_id, all_sents, max_tokens=512)
+    chunks = chunk_sentences(doc.doc_id, all_sents, max_tokens=max_tokens, token_counter=token_counter, overlap_sentences=overlap_sentences)
 
     doc_sha1 = hashlib.sha1("".join(doc.pages).encode("utf-8")).hexdigest()
 
@@ -284,6 +426,11 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
             "doc_sha1": doc_sha1,
             "n_sentences": len(all_sents),
             "n_chunks": len(chunks),
+            "chunking": {
+                "max_tokens": max_tokens,
+                "overlap_sentences": overlap_sentences,
+                "token_counter": getattr(token_counter, "name", "custom") if token_counter else "whitespace",
+            },
         },
         "doc": {
             "doc_id": doc.doc_id,
@@ -292,9 +439,10 @@ def normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
             "pages": list(doc.pages),
         },
         "sentences": [asdict(s) for s in all_sents],
-        "chunks": [asdict(c) for c in chunks],
+        "chunks": [_chunk_dict(c) for c in chunks],
         "images": doc.images or [],
     }
+    out["offsets"] = build_offset_index(out["sentences"], out["chunks"])
     return out
 
 
@@ -333,17 +481,54 @@ def _safe_basename_for_item(item: Dict[str, Any], fallback: str) -> str:
     return base
 
 
-def normalize_dir(in_dir: str, out_dir: str) -> List[str]:
+def normalize_dir(
+    in_dir: str,
+    out_dir: str,
+    tables: bool = False,
+    table_shard_rows: int = 100000,
+    max_tokens: int = 512,
+    token_counter: Optional[Callable[[str], int]] = None,
+    overlap_sentences: int = 0,
+    shard_size: int = 0,
+) -> List[str]:
     """Normalizes all extracted JSON files in a directory.
 
     Args:
         in_dir: The input directory.
         out_dir: The output directory.
+        tables: Whether to also write corpus-level sentence and chunk tables
+            (columnar JSONL shards, see `TableWriter`) to `out_dir/_tables`.
+            `combo embed` reads the chunk table instead of the documents
+            when it is present. Without it, stale tables are removed.
+        table_shard_rows: The maximum number of rows per table shard.
+        max_tokens: The maximum number of tokens per chunk.
+        token_counter: An optional function returning the token count of a
+            sentence (defaults to whitespace tokens).
+        overlap_sentences: The number of sentences shared between consecutive
+            chunks.
+        shard_size: If positive, write this many documents per shard file
+            under `out_dir/_shards` (with an offset index) instead of one
+            `*.normalized.json` per document.
 
     Returns:
         A list of the paths to the written files.
     """
     os.makedirs(out_dir, exist_ok=True)
+    shards = ShardWriter(out_dir, docs_per_shard=shard_size) if shard_size and shard_size > 0 else None
+    if shards is None:
+        # Shards of an earlier sharded run would be listed alongside the new files
+        remove_shards(out_dir)
+    tables_dir = os.path.join(out_dir, "_tables")
+    sent_w: Optional[TableWriter] = None
+    chunk_w: Optional[TableWriter] = None
+    table_docs: List[str] = []
+    count = token_counter or _whitespace_tokens
+    if not tables:
+        # Tables of an earlier run would no longer match the documents
+        shutil.rmtree(tables_dir, ignore_errors=True)
+    else:
+        sent_w = TableWriter(tables_dir, "sentences", SENTENCE_COLUMNS, shard_rows=table_shard_rows)
+        chunk_w = TableWriter(tables_dir, "chunks", CHUNK_COLUMNS, shard_rows=table_shard_rows)
     written: List[str] = []
     for name in os.listdir(in_dir):
         if not name.lower().endswith(".json"):
@@ -352,13 +537,29 @@ def normalize_dir(in_dir: str, out_dir: str) -> List[str]:
         idx = 0
         for item in _iter_items_from_json(path):
             idx += 1
-            norm = normalize_item(item)
+            norm = normalize_item(item, max_tokens=max_tokens, token_counter=token_counter, overlap_sentences=overlap_sentences)
             out_base = _safe_basename_for_item(item, os.path.splitext(name)[0])
             out_name = f"{out_base}.normalized.json" if idx == 1 else f"{out_base}.{idx}.normalized.json"
-            out_path = os.path.join(out_dir, out_name)
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(norm, f, ensure_ascii=False, sort_keys=True, indent=2)
-            written.append(out_path)
+            doc_base = os.path.splitext(out_name)[0]
+            if shards is not None:
+                shards.write(doc_base, norm)
+            else:
+                out_path = os.path.join(out_dir, out_name)
+                with open(out_path, "w", encoding="utf-8") as f:
+                    json.dump(norm, f, ensure_ascii=False, sort_keys=True, indent=2)
+                written.append(out_path)
+            if sent_w is not None and chunk_w is not None:
+                for row in sentence_rows(norm, count):
+                    sent_w.write(row)
+                for row in chunk_rows(norm, count, doc_base=doc_base):
+                    chunk_w.write(row)
+                table_docs.append(doc_base)
+    if sent_w is not None and chunk_w is not None:
+        sent_w.close()
+        chunk_w.close()
+        write_manifest(tables_dir, [sent_w, chunk_w], docs=table_docs)
+    if shards is not None:
+        written.extend(shards.close())
     return written
 
 
@@ -389,6 +590,12 @@ def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser(prog="combo normalize", description="Build sentences and chunks from extracted JSON")
     p.add_argument("extracted_json_dir", help="Directory containing extracted JSON files")
     p.add_argument("--out", required=True, help="Output directory for normalized JSONs")
+    p.add_argument("--tables", action="store_true", help="Also write sentence/chunk tables (columnar JSONL shards) to <out>/_tables")
+    p.add_argument("--table-shard-rows", type=int, default=100000, help="Maximum rows per table shard")
+    p.add_argument("--max-tokens", type=int, default=512, help="Token budget per chunk")
+    p.add_argument("--overlap-sentences", type=int, default=0, help="Sentences repeated at the start of the next chunk")
+    p.add_argument("--tokenizer-model", default=None, help="GGUF model whose tokenizer counts chunk tokens (default: whitespace)")
+    p.add_argument("--shard-size", type=int, default=0, help="Write N documents per shard file under <out>/_shards instead of one file per document")
     args = p.parse_args(argv)
     try:
         in_dir = _resolve(args.extracted_json_dir)
@@ -397,7 +604,20 @@ def main(argv: Optional[List[str]] = None) -> int:
         if out_dir == in_dir or out_dir.startswith(in_dir + os.sep):
             print("Error: --out must not be inside the input directory.")
             return 2
-        outs = normalize_dir(in_dir, out_dir)
+        token_counter = None
+        if args.tokenizer_model:
+            from ..embed.adapters.llama_cpp import load_token_counter
+            token_counter = CachedTokenCounter(load_token_counter(args.tokenizer_model), name=f"llama.cpp:{os.path.basename(args.tokenizer_model)}")
+        outs = normalize_dir(
+            in_dir,
+            out_dir,
+            tables=args.tables,
+            table_shard_rows=args.table_shard_rows,
+            max_tokens=args.max_tokens,
+            token_counter=token_counter,
+            overlap_sentences=args.overlap_sentences,
+            shard_size=args.shard_size,
+        )
         print(f"Wrote {len(outs)} files to {out_dir}")
         return 0
     except Exception as e:
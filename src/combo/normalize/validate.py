@@ -3,7 +3,11 @@ from __future__ import annotations
 import argparse
 import json
 import os
-from typing import Any, Dict, List, Optional
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..io.shards import NormalizedRef, list_normalized, load_normalized
 
 
 NormalizedSchema: Dict[str, Any] = {
@@ -68,6 +72,15 @@ NormalizedSchema: Dict[str, Any] = {
             },
         },
         "images": {"type": "array"},
+        "offsets": {
+            "type": "object",
+            "properties": {
+                "pages": {"type": "array", "items": {"type": "integer"}},
+                "page_first_sent": {"type": "array", "items": {"type": "integer"}},
+                "page_starts": {"type": "array", "items": {"type": "array"}},
+                "chunks": {"type": "object"},
+            },
+        },
     },
     "additionalProperties": False,
 }
@@ -114,15 +127,20 @@ def _tokens(s: str) -> int:
     return len((s or "").split())
 
 
-def validate_normalized_object(obj: Dict[str, Any], token_budget: int = 512) -> List[str]:
+def validate_normalized_object(obj: Dict[str, Any], token_budget: int = 512, sample: int = 0, rng: Optional[random.Random] = None) -> List[str]:
     """Validates a normalized object.
 
     This function checks the schema, token budget, sentence continuity, page
-    ranges, and slice equality.
+    ranges, and slice equality. The token budget is checked with whitespace
+    tokens, so it is skipped for documents chunked with another counter
+    (`meta.chunking.token_counter`), whose counts cannot be reproduced here.
 
     Args:
         obj: The object to validate.
         token_budget: The maximum number of tokens per chunk.
+        sample: If positive, only check slice equality for this many randomly
+            chosen sentences instead of all of them.
+        rng: The random generator used for sampling.
 
     Returns:
         A list of error messages.
@@ -141,9 +159,11 @@ def validate_normalized_object(obj: Dict[str, Any], token_budget: int = 512) ->
             idx[sid] = i
             pages[sid] = s.get("page")
 
+    chunking = (obj.get("meta") or {}).get("chunking") or {}
+    check_budget = chunking.get("token_counter", "whitespace") == "whitespace"
     for ch in obj.get("chunks", []):
         text = ch.get("text", "")
-        if _tokens(text) > token_budget:
+        if check_budget and _tokens(text) > token_budget:
             errs.append(f"chunk {ch.get('chunk_id')} exceeds token budget")
         sids = ch.get("sentence_ids", []) or []
         if not sids:
@@ -165,7 +185,10 @@ def validate_normalized_object(obj: Dict[str, Any], token_budget: int = 512) ->
                 errs.append(f"chunk {ch.get('chunk_id')} page range mismatch")
     # Slice-equality invariant using embedded doc.pages
     pages_arr = obj.get("doc", {}).get("pages", []) or []
-    for s in obj.get("sentences", []):
+    sents = obj.get("sentences", [])
+    if sample and sample < len(sents):
+        sents = (rng or random.Random(0)).sample(sents, sample)
+    for s in sents:
         try:
             page = s.get("page") or 1
             src = pages_arr[page - 1]
@@ -178,28 +201,181 @@ def validate_normalized_object(obj: Dict[str, Any], token_budget: int = 512) ->
     return errs
 
 
-def validate_dir(normalized_dir: str, token_budget: int = 512) -> Dict[str, List[str]]:
-    """Validates all normalized JSON files in a directory.
+def _stamp(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracts the meta stamp used by the validation manifest.
+
+    Args:
+        obj: A normalized object.
+
+    Returns:
+        The document checksum, normalizer version and chunking settings
+        (budget, overlap and token counter), so a re-chunked document is
+        not trusted from an earlier stamp.
+    """
+    meta = obj.get("meta", {}) if isinstance(obj, dict) else {}
+    return {
+        "doc_sha1": meta.get("doc_sha1"),
+        "normalizer_version": (meta.get("normalizer") or {}).get("version"),
+        "chunking": meta.get("chunking"),
+    }
+
+
+def _fingerprint(ref: NormalizedRef) -> Optional[Dict[str, Any]]:
+    """Computes a cheap fingerprint of a normalized document without reading it.
+
+    Args:
+        ref: The document reference.
+
+    Returns:
+        The size and modification time of the file (or shard) plus the
+        record's offset and length inside a shard, or None if the file
+        cannot be stat'ed.
+    """
+    try:
+        st = os.stat(ref.path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "offset": ref.offset, "length": ref.length}
+
+
+def _load_manifest(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Loads a validation manifest.
+
+    Args:
+        path: The path to the manifest, or None.
+
+    Returns:
+        A dictionary mapping document labels to their validated stamps.
+    """
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return (json.load(f) or {}).get("validated", {})
+
+
+def _validate_ref(task: Tuple[NormalizedRef, int, Optional[Dict[str, Any]], int, int]) -> Tuple[str, List[str], Optional[Dict[str, Any]], bool]:
+    """Validates one normalized document (process pool worker).
+
+    A document whose fingerprint (see `_fingerprint`) and token budget match
+    the manifest entry is trusted without being read. Otherwise it is
+    loaded, and it is still trusted if its meta stamp matches the entry
+    (e.g. the file was only touched).
+
+    Args:
+        task: A tuple of the document reference, token budget, the entry
+            previously recorded in the manifest (or None), the sentence sample
+            size, and the sampling seed.
+
+    Returns:
+        A tuple of the document label, its errors, its current manifest entry
+        (None if unreadable), and whether the manifest entry was trusted.
+    """
+    ref, token_budget, trusted_stamp, sample, seed = task
+    fingerprint = _fingerprint(ref)
+    if (
+        trusted_stamp is not None
+        and fingerprint is not None
+        and trusted_stamp.get("fingerprint") == fingerprint
+        and trusted_stamp.get("token_budget") == token_budget
+        and trusted_stamp.get("doc_sha1")
+    ):
+        return ref.label, [], trusted_stamp, True
+    try:
+        obj = load_normalized(ref)
+    except Exception as e:
+        return ref.label, [f"failed to read/parse: {e}"], None, False
+    stamp = {**_stamp(obj), "token_budget": token_budget}
+    entry = {**stamp, "fingerprint": fingerprint}
+    if trusted_stamp is not None and stamp["doc_sha1"] and {k: trusted_stamp.get(k) for k in stamp} == stamp:
+        return ref.label, [], entry, True
+    rng = random.Random(f"{seed}|{ref.label}")
+    try:
+        errs = validate_normalized_object(obj, token_budget=token_budget, sample=sample, rng=rng)
+    except Exception as e:
+        errs = [f"validation failed: {e}"]
+    return ref.label, errs, entry, False
+
+
+def validate_dir_with_stats(
+    normalized_dir: str,
+    token_budget: int = 512,
+    workers: int = 1,
+    manifest_path: Optional[str] = None,
+    sample: int = 0,
+    seed: int = 0,
+) -> Tuple[Dict[str, List[str]], Set[str]]:
+    """Validates all normalized documents in a directory (files or shards).
+
+    Documents are validated in a process pool when `workers > 1`. If a
+    manifest is given, documents whose file fingerprint and token budget
+    match the manifest are trusted without being read; documents whose
+    `meta.doc_sha1`, normalizer version, `meta.chunking` and token budget
+    match are trusted without re-validation. The manifest is rewritten with
+    every trusted document and every document that passed a full check.
 
     Args:
         normalized_dir: The directory to validate.
         token_budget: The maximum number of tokens per chunk.
+        workers: The number of worker processes.
+        manifest_path: An optional path to the validation manifest.
+        sample: If positive, deep-check only this many random sentences per
+            document (sampled results are not recorded in the manifest).
+        seed: The seed for sentence sampling.
 
     Returns:
-        A dictionary mapping filenames to a list of error messages.
+        A tuple of the results (label -> errors, as in `validate_dir`) and the
+        labels that were trusted from the manifest.
     """
+    manifest = _load_manifest(manifest_path)
+    tasks = [(ref, token_budget, manifest.get(ref.label), sample, seed) for ref in list_normalized(normalized_dir)]
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            outcomes = list(ex.map(_validate_ref, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        outcomes = [_validate_ref(t) for t in tasks]
+
     results: Dict[str, List[str]] = {}
-    for name in os.listdir(normalized_dir):
-        if not name.lower().endswith(".json"):
-            continue
-        path = os.path.join(normalized_dir, name)
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                obj = json.load(f)
-            errs = validate_normalized_object(obj, token_budget=token_budget)
-            results[name] = errs
-        except Exception as e:
-            results[name] = [f"failed to read/parse: {e}"]
+    trusted: Set[str] = set()
+    validated: Dict[str, Dict[str, Any]] = {}
+    for label, errs, stamp, was_trusted in outcomes:
+        results[label] = errs
+        if was_trusted:
+            trusted.add(label)
+            validated[label] = stamp
+        elif stamp is not None and not errs and not sample and stamp["doc_sha1"]:
+            validated[label] = stamp
+    if manifest_path:
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"validated": validated}, f, ensure_ascii=False, sort_keys=True, indent=2)
+    return results, trusted
+
+
+def validate_dir(normalized_dir: str, token_budget: int = 512, workers: int = 1, manifest_path: Optional[str] = None, sample: int = 0, seed: int = 0) -> Dict[str, List[str]]:
+    """Validates all normalized documents in a directory (files or shards).
+
+    Args:
+        normalized_dir: The directory to validate.
+        token_budget: The maximum number of tokens per chunk.
+        workers: The number of worker processes.
+        manifest_path: An optional path to the validation manifest used for
+            the stamp-based fast path.
+        sample: If positive, deep-check only this many random sentences per
+            document.
+        seed: The seed for sentence sampling.
+
+    Returns:
+        A dictionary mapping filenames (or `shard:base` labels for sharded
+        documents) to a list of error messages.
+    """
+    results, _ = validate_dir_with_stats(
+        normalized_dir,
+        token_budget=token_budget,
+        workers=workers,
+        manifest_path=manifest_path,
+        sample=sample,
+        seed=seed,
+    )
     return results
 
 
@@ -218,28 +394,40 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser(prog="combo validate", description="Validate normalized JSON files (dir or file)")
     ap.add_argument("target", help="Directory of normalized .json files or a single file")
     ap.add_argument("--token-budget", type=int, default=512)
+    ap.add_argument("--workers", type=int, default=1, help="Validate documents in N worker processes")
+    ap.add_argument("--manifest", default=None, help="Validation manifest (e.g. <dir>/_reports/validated.json); unchanged documents are trusted without re-validation")
+    ap.add_argument("--sample", type=int, default=0, help="Deep-check only N random sentences per document")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for --sample")
     args = ap.parse_args(argv)
     try:
+        trusted: Set[str] = set()
         if os.path.isdir(args.target):
-            results = validate_dir(args.target, token_budget=args.token_budget)
+            results, trusted = validate_dir_with_stats(
+                args.target,
+                token_budget=args.token_budget,
+                workers=args.workers,
+                manifest_path=args.manifest,
+                sample=args.sample,
+                seed=args.seed,
+            )
         else:
             # single file
             try:
                 with open(args.target, "r", encoding="utf-8") as f:
                     obj = json.load(f)
-                errs = validate_normalized_object(obj, token_budget=args.token_budget)
+                errs = validate_normalized_object(obj, token_budget=args.token_budget, sample=args.sample, rng=random.Random(args.seed))
                 results = {os.path.basename(args.target): errs}
             except Exception as e:
                 results = {os.path.basename(args.target): [f"failed to read/parse: {e}"]}
         total = len(results)
         failures = sum(1 for v in results.values() if v)
         for fname, errs in results.items():
-            status = "OK" if not errs else "FAIL"
+            status = ("OK (trusted)" if fname in trusted else "OK") if not errs else "FAIL"
             print(f"{fname}: {status}")
             if errs:
                 for e in errs:
                     print(f"  - {e}")
-        print(f"Validated {total} file(s); failures: {failures}")
+        print(f"Validated {total} file(s); failures: {failures}" + (f"; trusted: {len(trusted)}" if trusted else ""))
         # Exit codes: 0 success, 2 validation/schema failures
         return 0 if failures == 0 else 2
     except Exception as e:
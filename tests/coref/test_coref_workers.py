@@ -0,0 +1,36 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+from combo.coref.cli import process_er_dir
+
+
+def _write_doc(path: pathlib.Path, doc_id: str) -> None:
+    rows = [
+        {"doc_id": doc_id, "chunk_id": "c1", "text": "drone", "start": 0, "end": 5, "type": "PRODUCT", "sent_index": 0},
+        {"doc_id": doc_id, "chunk_id": "c1", "text": "ACME", "start": 6, "end": 10, "type": "ORG", "sent_index": 0},
+        {"doc_id": doc_id, "chunk_id": "c2", "text": "it", "start": 0, "end": 2, "type": "PERSON", "sent_index": 1},
+        {"doc_id": doc_id, "chunk_id": "c2", "text": "she", "start": 3, "end": 6, "type": "PERSON", "sent_index": 1},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def test_workers_do_not_change_outputs(tmp_path: pathlib.Path):
+    er = tmp_path / "er"; er.mkdir()
+    for i in range(4):
+        _write_doc(er / f"d{i}.entities.jsonl", f"D{i}")
+    serial = process_er_dir(str(er), str(tmp_path / "s"), 3, 30)
+    parallel = process_er_dir(str(er), str(tmp_path / "p"), 3, 30, workers=2)
+    assert serial == parallel
+    assert serial["docs"] == 4 and serial["pronouns_total"] == 8 and serial["resolved"] == 8
+    for f in sorted((tmp_path / "s").rglob("*.json*")):
+        assert f.read_bytes() == (tmp_path / "p" / f.relative_to(tmp_path / "s")).read_bytes()
+
+
+def test_coref_available_from_root_shim(tmp_path: pathlib.Path):
+    er = tmp_path / "er"; er.mkdir()
+    _write_doc(er / "d.entities.jsonl", "D")
+    res = subprocess.run([sys.executable, "-m", "combo", "coref", str(er), "--out", str(tmp_path / "out"), "--workers", "2"], capture_output=True, text=True)
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert (tmp_path / "out" / "_reports" / "run_report.json").exists()
@@ -45,3 +45,24 @@ def test_plural_agreement():
     they = out[1]
     assert they.get("antecedent_mention_id") == out[0].get("mention_id")
 
+
+
+def test_sentence_window_uses_sent_index_with_hashed_sent_ids():
+    ents = [
+        {**mk("d4", "c1", "drone", 0, 5, "PRODUCT"), "sent_id": "9f1c0a", "sent_index": 0},
+        {**mk("d4", "c2", "It", 0, 2, "PERSON"), "sent_id": "77ab02", "sent_index": 5},
+    ]
+    assert resolve_coref(ents, max_sent_back=3)[1].get("antecedent_mention_id") is None
+    assert resolve_coref(ents, max_sent_back=5)[1].get("antecedent_mention_id") == "d4:c1:0-5"
+
+
+def test_out_of_order_sentences_still_scan_past_window_misses():
+    # A mention from a far sentence sits between the pronoun and its antecedent
+    ents = [
+        mk("d5", "c1", "drone", 0, 5, "PRODUCT", 1),
+        mk("d5", "c9", "NASA", 0, 4, "ORG", 9),
+        mk("d5", "c2", "it", 0, 2, "PERSON", 2),
+    ]
+    out = resolve_coref(ents, max_sent_back=3)
+    assert out[2]["antecedent_mention_id"] == "d5:c1:0-5"
+    assert out[2]["coref_rule"] == "prefer_device_over_org"
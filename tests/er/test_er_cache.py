@@ -0,0 +1,37 @@
+import json
+import pathlib
+
+from combo.er.cli import process_normalized
+
+
+def _doc(doc_id, texts):
+    return {
+        "doc": {"doc_id": doc_id, "source_path": "x", "num_pages": 1, "pages": [" ".join(texts)]},
+        "chunks": [
+            {"doc_id": doc_id, "chunk_id": f"{doc_id}-c{i}", "text": t, "sentence_ids": [], "page_start": 1, "page_end": 1}
+            for i, t in enumerate(texts)
+        ],
+        "sentences": [],
+        "images": [],
+    }
+
+
+def test_cache_hits_reproduce_fresh_output(tmp_path: pathlib.Path):
+    norm = tmp_path / "norm"; norm.mkdir()
+    boiler = "ACME CONFIDENTIAL see https://acme.example/terms"
+    (norm / "a.normalized.json").write_text(json.dumps(_doc("DA", [boiler, "Alice met NASA", boiler])), encoding="utf-8")
+    (norm / "b.normalized.json").write_text(json.dumps(_doc("DB", [boiler, "Bob"])), encoding="utf-8")
+    cache = str(tmp_path / "er_cache.db")
+
+    plain = process_normalized(str(norm), str(tmp_path / "plain"))
+    first = process_normalized(str(norm), str(tmp_path / "first"), cache_path=cache)
+    second = process_normalized(str(norm), str(tmp_path / "second"), cache_path=cache, workers=2)
+
+    # 5 chunks, 3 distinct texts: duplicates hit even on the first run
+    assert (first["cache_hits"], first["cache_misses"]) == (2, 3)
+    assert (second["cache_hits"], second["cache_misses"]) == (5, 0)
+    assert plain["relations"] == first["relations"] == second["relations"] > 0
+    for f in (tmp_path / "plain").glob("*.jsonl"):
+        assert f.read_bytes() == (tmp_path / "first" / f.name).read_bytes() == (tmp_path / "second" / f.name).read_bytes()
+    manifest = json.loads((tmp_path / "second" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["cache"] == {"hits": 5, "misses": 0}
@@ -0,0 +1,61 @@
+import json
+import pathlib
+
+from combo.er import cli
+from combo.er.spacy_engine import SpacyEngine
+from combo.io.shards import list_normalized
+
+
+class _Doc:
+    def __init__(self, text):
+        self.text = text
+        self.ents = []
+
+
+class _StubNLP:
+    """Stands in for a spaCy pipeline and records the n_process of each call."""
+
+    pipe_names = []
+
+    def __init__(self):
+        self.n_process = []
+
+    def pipe(self, stream, as_tuples=False, batch_size=1, n_process=1):
+        self.n_process.append(n_process)
+        for text, ctx in stream:
+            yield _Doc(text), ctx
+
+
+def _norm_dir(tmp_path):
+    norm = tmp_path / "norm"; norm.mkdir()
+    chunks = [{"doc_id": "D", "chunk_id": f"C{i}", "text": f"chunk {i}", "sentence_ids": [], "page_start": 1, "page_end": 1} for i in range(3)]
+    (norm / "a.normalized.json").write_text(json.dumps({
+        "doc": {"doc_id": "D", "source_path": "x", "num_pages": 1, "pages": [""]},
+        "chunks": chunks, "sentences": [], "images": [],
+    }), encoding="utf-8")
+    return norm
+
+
+def test_pool_workers_run_spacy_in_process(tmp_path: pathlib.Path, monkeypatch):
+    norm = _norm_dir(tmp_path)
+    monkeypatch.setattr(cli, "_WORKER_ENGINE", None)
+    monkeypatch.setattr(cli, "_WORKER_GAZETTEER", None)
+    monkeypatch.setattr(cli, "_WORKER_CACHE", None)
+    nlp = _StubNLP()
+    cli._init_worker(SpacyEngine(nlp=nlp, batch_size=1, n_process=2), None)
+    ref = list_normalized(str(norm))[0]
+    cli._process_file_worker((None, ref, str(tmp_path / "e.jsonl"), str(tmp_path / "r.jsonl")))
+    assert nlp.n_process == [1]
+
+    # A serial run keeps the requested process count
+    serial = _StubNLP()
+    cli.process_normalized(str(norm), str(tmp_path / "er"), engine=SpacyEngine(nlp=serial, batch_size=1, n_process=2))
+    assert serial.n_process == [2]
+
+
+def test_cli_rejects_workers_with_n_process(tmp_path: pathlib.Path, capsys):
+    norm = _norm_dir(tmp_path)
+    rc = cli.main(["--normalized-dir", str(norm), "--out", str(tmp_path / "er"), "--engine", "spacy", "--workers", "2", "--n-process", "2"])
+    assert rc == 2
+    assert "--n-process cannot be combined with --workers" in capsys.readouterr().out
+    assert not (tmp_path / "er").exists()
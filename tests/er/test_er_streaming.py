@@ -0,0 +1,89 @@
+import json
+import pathlib
+
+from combo.er.cli import process_embedded, process_normalized
+
+
+def _norm(doc_id, chunk_id, text):
+    return {
+        "doc": {"doc_id": doc_id, "source_path": "x", "num_pages": 1, "pages": [text]},
+        "chunks": [{"doc_id": doc_id, "chunk_id": chunk_id, "text": text, "sentence_ids": [], "page_start": 1, "page_end": 1}],
+        "sentences": [],
+        "images": [],
+    }
+
+
+def test_embedded_files_paired_by_base_or_doc_id(tmp_path: pathlib.Path):
+    norm = tmp_path / "norm"; norm.mkdir()
+    emb = tmp_path / "emb"; emb.mkdir()
+    (norm / "a.normalized.json").write_text(json.dumps(_norm("DA", "CA", "ACME is here")), encoding="utf-8")
+    (norm / "b.normalized.json").write_text(json.dumps(_norm("DB", "CB", "NASA is there")), encoding="utf-8")
+    # Paired by base name
+    (emb / "a.normalized.embedded.jsonl").write_text(json.dumps({"doc_id": "DA", "chunk_id": "CA"}) + "\n", encoding="utf-8")
+    # Renamed file: paired through doc_id
+    (emb / "renamed.embedded.jsonl").write_text(json.dumps({"doc_id": "DB", "chunk_id": "CB"}) + "\n", encoding="utf-8")
+
+    out = tmp_path / "er"
+    counts = process_embedded(str(emb), str(norm), str(out))
+    assert counts["files"] == 2
+    a = (out / "a.normalized.embedded.entities.jsonl").read_text(encoding="utf-8")
+    b = (out / "renamed.embedded.entities.jsonl").read_text(encoding="utf-8")
+    assert '"ACME"' in a and "NASA" not in a
+    assert '"NASA"' in b and "ACME" not in b
+
+
+def test_workers_match_serial_output(tmp_path: pathlib.Path):
+    norm = tmp_path / "norm"; norm.mkdir()
+    emb = tmp_path / "emb"; emb.mkdir()
+    for i in range(5):
+        text = f"ACME site https://example.com/{i} and Alice met NASA"
+        (norm / f"d{i}.normalized.json").write_text(json.dumps(_norm(f"D{i}", f"C{i}", text)), encoding="utf-8")
+        (emb / f"d{i}.normalized.embedded.jsonl").write_text(json.dumps({"doc_id": f"D{i}", "chunk_id": f"C{i}"}) + "\n", encoding="utf-8")
+
+    serial = process_embedded(str(emb), str(norm), str(tmp_path / "s"))
+    parallel = process_embedded(str(emb), str(norm), str(tmp_path / "p"), workers=2)
+    assert serial == parallel
+    assert serial["files"] == 5 and serial["relations"] > 0
+    for f in sorted((tmp_path / "s").iterdir()):
+        assert f.read_bytes() == (tmp_path / "p" / f.name).read_bytes()
+
+
+def test_er_from_normalized_dir_without_embeddings(tmp_path: pathlib.Path):
+    norm = tmp_path / "norm"; norm.mkdir()
+    emb = tmp_path / "emb"; emb.mkdir()
+    obj = _norm("DA", "CA", "ACME is at https://acme.example")
+    obj["chunks"].append({"doc_id": "DA", "chunk_id": "CA2", "text": "NASA too", "sentence_ids": [], "page_start": 1, "page_end": 1})
+    (norm / "a.normalized.json").write_text(json.dumps(obj), encoding="utf-8")
+    rows = [{"doc_id": "DA", "chunk_id": "CA"}, {"doc_id": "DA", "chunk_id": "CA2"}]
+    (emb / "a.normalized.embedded.jsonl").write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    via_emb = process_embedded(str(emb), str(norm), str(tmp_path / "e"))
+    direct = process_normalized(str(norm), str(tmp_path / "n"))
+    assert via_emb == direct
+    assert (tmp_path / "n" / "a.normalized.entities.jsonl").read_bytes() == \
+        (tmp_path / "e" / "a.normalized.embedded.entities.jsonl").read_bytes()
+    assert (tmp_path / "n" / "a.normalized.rels.jsonl").exists()
+
+
+def test_overlap_mentions_are_extracted_once(tmp_path: pathlib.Path):
+    from combo.normalize.segment import normalize_item
+
+    norm = tmp_path / "norm"; norm.mkdir()
+    text = "ACME hired Alice. NASA hired Bob. IBM hired Carol."
+    item = {"doc_id": "D", "source_path": "x", "pages": [text], "images": []}
+    plain = normalize_item(item, max_tokens=6)
+    overlapped = normalize_item(item, max_tokens=6, overlap_sentences=1)
+    # NASA's sentence is in both chunks of the overlapped document
+    assert [len(c["sentence_ids"]) for c in overlapped["chunks"]] == [2, 2]
+    (norm / "plain.normalized.json").write_text(json.dumps(plain), encoding="utf-8")
+    (norm / "over.normalized.json").write_text(json.dumps(overlapped), encoding="utf-8")
+
+    out = tmp_path / "er"
+    process_normalized(str(norm), str(out))
+
+    def mentions(name):
+        rows = [json.loads(l) for l in (out / f"{name}.normalized.entities.jsonl").read_text(encoding="utf-8").splitlines()]
+        return sorted((r["sent_id"], r["text"]) for r in rows)
+
+    assert mentions("over") == mentions("plain")
+    assert len(mentions("plain")) >= 3
@@ -0,0 +1,86 @@
+import json
+import pathlib
+
+from combo.er.cli import process_embedded
+from combo.er.gazetteer import Gazetteer
+from combo.link.registry import add_alias, get_or_create_canonical, open_registry
+
+
+def _registry(path):
+    conn = open_registry(str(path))
+    ibm = get_or_create_canonical(conn, "ORG", "IBM", primary_name="IBM")
+    add_alias(conn, ibm, "International Business Machines")
+    nasa = get_or_create_canonical(conn, "ORG", "NASA", primary_name="NASA")
+    conn.close()
+    return ibm, nasa
+
+
+def test_gazetteer_matches_case_insensitive_on_word_boundaries(tmp_path):
+    ibm, nasa = _registry(tmp_path / "reg.db")
+    conn = open_registry(str(tmp_path / "reg.db"))
+    g = Gazetteer.from_registry(conn)
+    conn.close()
+    text = "international business machines and IBM, but not Ibm or IBMX; NASA."
+    ents = g.extract(text, "D", "C", "x")
+    assert [(e.text, e.canonical_id) for e in ents] == [
+        ("international business machines", ibm),
+        ("IBM", ibm),
+        ("NASA", nasa),
+    ]
+
+    # Compact persistence round-trips without rebuilding
+    path = tmp_path / "gaz.json"
+    g.save(str(path))
+    assert Gazetteer.load(str(path)).spans(text) == g.spans(text)
+
+
+def test_short_and_all_caps_keys_match_registry_spelling(tmp_path):
+    from combo.er.gazetteer import load_gazetteer
+
+    conn = open_registry(str(tmp_path / "reg.db"))
+    us = get_or_create_canonical(conn, "LOC", "US", primary_name="US")
+    it = get_or_create_canonical(conn, "ORG", "IT", primary_name="IT")
+    apple = get_or_create_canonical(conn, "ORG", "Apple", primary_name="Apple")
+    unicef = get_or_create_canonical(conn, "ORG", "UNICEF", primary_name="UNICEF")
+    conn.close()
+    g = load_gazetteer(registry_path=str(tmp_path / "reg.db"))
+    text = "Tell us about it: the apple from Apple reached the US and UNICEF, not Unicef."
+    assert [(e.text, e.canonical_id) for e in g.extract(text, "D", "C", "x")] == [
+        ("Apple", apple),
+        ("US", us),
+        ("UNICEF", unicef),
+    ]
+    assert it in g.canonical_ids
+
+    # Spellings survive a save/load round trip
+    path = tmp_path / "gaz.json"
+    g.save(str(path))
+    assert Gazetteer.load(str(path)).spans(text) == g.spans(text)
+
+
+def test_leftmost_longest_non_overlapping():
+    g = Gazetteer({"new york": ("c1", "LOC"), "york city": ("c2", "LOC"), "new york city": ("c3", "LOC")})
+    assert [(a, b, g.canonical_ids[i]) for a, b, i in g.spans("in New York City now")] == [(3, 16, "c3")]
+    assert [g.canonical_ids[i] for _, _, i in g.spans("New York and York City")] == ["c1", "c2"]
+
+
+def test_er_emits_canonical_id(tmp_path: pathlib.Path):
+    ibm, _ = _registry(tmp_path / "reg.db")
+    norm = tmp_path / "norm"; norm.mkdir()
+    emb = tmp_path / "emb"; emb.mkdir()
+    text = "International Business Machines hired Alice"
+    (norm / "a.normalized.json").write_text(json.dumps({
+        "doc": {"doc_id": "D", "source_path": "x", "num_pages": 1, "pages": [text]},
+        "chunks": [{"doc_id": "D", "chunk_id": "C", "text": text, "sentence_ids": [], "page_start": 1, "page_end": 1}],
+        "sentences": [], "images": [],
+    }), encoding="utf-8")
+    (emb / "a.normalized.embedded.jsonl").write_text(json.dumps({"doc_id": "D", "chunk_id": "C"}) + "\n", encoding="utf-8")
+    conn = open_registry(str(tmp_path / "reg.db"))
+    g = Gazetteer.from_registry(conn)
+    conn.close()
+    process_embedded(str(emb), str(norm), str(tmp_path / "er"), gazetteer=g)
+    rows = [json.loads(l) for l in (tmp_path / "er" / "a.normalized.embedded.entities.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(r["text"], r.get("canonical_id")) for r in rows] == [
+        ("International Business Machines", ibm),
+        ("Alice", None),
+    ]
@@ -0,0 +1,21 @@
+from combo.er.api import Entity, simple_link
+from combo.er.relations import candidate_pairs
+
+
+def _e(eid, etype, start, end, sent=None):
+    return Entity(id=eid, chunk_id="C", doc_id="D", type=etype, text="x" * (end - start), start=start, end=end, conf=0.8, source_sha1="s", sent_index=sent)
+
+
+def test_candidate_windows_and_directions():
+    ents = [_e("o1", "ORG", 0, 4, 0), _e("u1", "URL", 10, 20, 0), _e("o2", "ORG", 22, 26, 1), _e("u2", "URL", 60, 70, 3)]
+    pairs = lambda **kw: [(h.id, t.id) for h, t in candidate_pairs(ents, ["ORG"], ["URL"], **kw)]
+    assert pairs() == [("o1", "u1"), ("o1", "u2"), ("o2", "u2")]
+    assert pairs(nearest=True) == [("o1", "u1"), ("o2", "u2")]
+    assert pairs(max_chars=10) == [("o1", "u1")]
+    assert pairs(max_sents=1) == [("o1", "u1")]
+    assert pairs(direction="before") == [("o2", "u1")]
+
+
+def test_simple_link_links_nearest_following_url():
+    ents = [_e("u0", "URL", 0, 5), _e("o1", "ORG", 6, 10), _e("o2", "ORG", 12, 16), _e("u1", "URL", 20, 30), _e("u2", "URL", 31, 40)]
+    assert [(r.head_ent_id, r.tail_ent_id) for r in simple_link(ents, "D", "C", "s")] == [("o1", "u1"), ("o2", "u1")]
@@ -0,0 +1,30 @@
+import json
+
+from combo.er.api import simple_ner
+from combo.er.rules import RuleEngine, load_rules
+
+
+def test_default_rules_resolve_overlaps_in_one_scan():
+    text = "ACME visited https://Example.com/Docs and emailed JOHN@EXAMPLE.COM about Paris"
+    ents = simple_ner(text, "D1", "C1", "x")
+    got = [(e.type, e.text) for e in ents]
+    # Words inside the URL and the email are not reported separately
+    assert got == [
+        ("ORG", "ACME"),
+        ("URL", "https://Example.com/Docs"),
+        ("EMAIL", "JOHN@EXAMPLE.COM"),
+        ("PERSON", "Paris"),
+    ]
+    assert [e.start for e in ents] == sorted(e.start for e in ents)
+
+
+def test_rules_file_configures_engine(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [
+        {"type": "TICKER", "pattern": r"\$[A-Z]{1,5}\b", "conf": 0.9},
+        {"type": "ORG", "pattern": r"\b[A-Z]{2,}\b"},
+    ]}), encoding="utf-8")
+    engine = RuleEngine(load_rules(str(path)))
+    ents = engine.extract("IBM traded as $IBM today", "D", "C", "x")
+    assert [(e.type, e.text, e.conf) for e in ents] == [("ORG", "IBM", 0.8), ("TICKER", "$IBM", 0.9)]
+    assert engine.version != RuleEngine().version
@@ -0,0 +1,40 @@
+import pickle
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from combo.er.spacy_engine import SpacyEngine  # noqa: E402
+
+
+def _nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "ORG", "pattern": "Acme"},
+        {"label": "LOC", "pattern": "Lake Tahoe"},
+        {"label": "FAC", "pattern": "Hangar 9"},
+    ])
+    return nlp
+
+
+def test_batched_entities_follow_er_contract():
+    engine = SpacyEngine(nlp=_nlp(), batch_size=2)
+    items = [
+        ("Acme met at Lake Tahoe", "D", "C1", "s1"),
+        ("nothing here", "D", "C2", "s2"),
+        ("Hangar 9 belongs to Acme", "D", "C3", "s3"),
+    ]
+    out = engine.extract_batch(items)
+    assert [[(e.type, e.text, e.start, e.end) for e in ents] for ents in out] == [
+        [("ORG", "Acme", 0, 4), ("LOCATION", "Lake Tahoe", 12, 22)],
+        [],
+        [("FACILITY", "Hangar 9", 0, 8), ("ORG", "Acme", 20, 24)],
+    ]
+    assert out[0][0].chunk_id == "C1" and out[2][0].source_sha1 == "s3"
+
+
+def test_engine_pickles_without_pipeline():
+    engine = SpacyEngine(nlp=_nlp())
+    clone = pickle.loads(pickle.dumps(engine))
+    assert clone._nlp is None and clone.model == engine.model
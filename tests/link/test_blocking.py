@@ -0,0 +1,91 @@
+import json
+
+from combo.link.blocking import BlockingIndex, init_blocking, phonetic_key, similarity, soundex, token_key
+from combo.link.linker import link_entities
+from combo.link.registry import open_registry
+
+
+def test_blocking_keys_normalize_surface_variants():
+    assert token_key("Lockheed Martin Corp.") == token_key("Lockheed-Martin") == "lockheed martin"
+    assert token_key("Martin, Lockheed") == "lockheed martin"
+    assert [soundex(t) for t in ("robert", "rupert", "tymczak", "pfister", "ashcraft")] == ["R163", "R163", "T522", "P236", "A261"]
+    assert phonetic_key("Jon Smith") == phonetic_key("John Smyth")
+    assert similarity("lockheed martin", "lockheed martins") > 0.75 > similarity("lockheed martin", "boeing")
+
+
+def test_index_matches_by_type_and_threshold(tmp_path):
+    conn = open_registry(str(tmp_path / "r.sqlite"))
+    init_blocking(conn)
+    index = BlockingIndex(conn, threshold=0.75)
+    index.add("c1", "ORG", "Lockheed Martin Corporation")
+    index.add("c2", "ORG", "Northrop Grumman")
+    assert index.match("ORG", "LOCKHEED-MARTIN, Inc.") == "c1"
+    assert index.match("ORG", "Lockheed Martins") == "c1"
+    assert index.match("ORG", "Lockhead Martin") is None  # 0.67 < link_conf
+    assert index.match("PERSON", "Lockheed Martin") is None
+    assert index.match("ORG", "General Dynamics") is None
+    assert index.stats() == {"lookups": 5, "matched": 2, "scored": index.scored}
+
+
+def _run(tmp_path, name, blocking):
+    src = tmp_path / "in"
+    src.mkdir(exist_ok=True)
+    ents = [
+        {"doc_id": "d1", "type": "ORG", "text": "Lockheed Martin Corp.", "mention_id": "m1"},
+        {"doc_id": "d1", "type": "ORG", "text": "Lockheed-Martin", "mention_id": "m2"},
+        {"doc_id": "d1", "type": "ORG", "text": "Boeing", "mention_id": "m3"},
+    ]
+    (src / "a.entities.jsonl").write_text("\n".join(json.dumps(e) for e in ents) + "\n", encoding="utf-8")
+    db = tmp_path / f"{name}.sqlite"
+    out = tmp_path / name
+    link_entities(str(src), str(out), str(db), materialize_blocking=blocking)
+    rows = [json.loads(line) for line in (out / "linked.entities.jsonl").read_text(encoding="utf-8").splitlines()]
+    return rows, open_registry(str(db)), json.loads((out / "_reports" / "run_report.json").read_text(encoding="utf-8"))
+
+
+def test_materialize_blocking_links_variants(tmp_path):
+    rows, conn, _ = _run(tmp_path, "exact", False)
+    assert len({r["canonical_id"] for r in rows}) == 3
+
+    rows, conn, report = _run(tmp_path, "fuzzy", True)
+    ids = {r["name"]: r["canonical_id"] for r in rows}
+    assert ids["Lockheed Martin Corp."] == ids["Lockheed-Martin"] != ids["Boeing"]
+    assert conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM blocking_names").fetchone()[0] == 2
+    assert report["blocking"]["matched"] == 1
+
+
+def test_init_blocking_indexes_only_new_canonicals(tmp_path):
+    from combo.link.registry import get_or_create_canonical
+
+    conn = open_registry(str(tmp_path / "r.sqlite"))
+    get_or_create_canonical(conn, "ORG", "lockheed martin", primary_name="Lockheed Martin")
+    init_blocking(conn)
+    assert conn.execute("SELECT value FROM registry_meta WHERE key='blocked_rowid'").fetchone()[0] == 1
+
+    # Rows below the marker are not read again
+    conn.execute("DELETE FROM blocking_names")
+    get_or_create_canonical(conn, "ORG", "northrop grumman", primary_name="Northrop Grumman")
+    init_blocking(conn)
+    assert [r[0] for r in conn.execute("SELECT name_key FROM blocking_names")] == ["grumman northrop"]
+    assert conn.execute("SELECT value FROM registry_meta WHERE key='blocked_rowid'").fetchone()[0] == 2
+    assert BlockingIndex(conn).match("ORG", "Northrop-Grumman Corp.") is not None
+
+
+def test_exact_key_goes_to_first_indexed_canonical(tmp_path):
+    conn = open_registry(str(tmp_path / "r.sqlite"))
+    init_blocking(conn)
+    index = BlockingIndex(conn, threshold=0.75)
+    index.add("c2", "ORG", "Acme")
+    index.add("c1", "ORG", "ACME Inc.")
+    assert index.match("ORG", "Acme Corp") == "c2"
+    # Re-adding an indexed name writes nothing
+    before = conn.total_changes
+    index.add("c2", "ORG", "ACME")
+    assert conn.total_changes == before
+
+
+def test_link_run_advances_blocking_watermark(tmp_path):
+    _, conn, _ = _run(tmp_path, "fuzzy", True)
+    max_rowid = conn.execute("SELECT MAX(rowid) FROM entities").fetchone()[0]
+    assert conn.execute("SELECT value FROM registry_meta WHERE key='blocked_rowid'").fetchone()[0] == max_rowid
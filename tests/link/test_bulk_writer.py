@@ -0,0 +1,151 @@
+import pathlib
+
+from combo.link.linker import link_entities
+from combo.link.registry import (
+    BulkRegistryWriter,
+    RegistryCache,
+    add_alias,
+    add_external_id,
+    get_or_create_canonical,
+    open_registry,
+    resolve_canonicals,
+)
+
+
+OPS = [
+    ("ORG", "ACME", "Acme", [("wikidata", "Q1")]),
+    ("ORG", "acme ", "ACME", [("wikidata", "Q1"), ("uei", "U1")]),
+    ("PERSON", "Jane Doe", "Jane Doe", []),
+    ("ORG", "Globex", "Globex", [("wikidata", "Q1")]),  # Q1 already taken by ACME
+]
+
+
+def _dump(conn):
+    return {
+        t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall())
+        for t in ("entities", "aliases", "external_ids")
+    }
+
+
+def test_bulk_writer_matches_per_call_functions(tmp_path):
+    per_call = open_registry(str(tmp_path / "a.sqlite"))
+    ids_a = []
+    for typ, label, name, ext in OPS:
+        cid = get_or_create_canonical(per_call, typ, label, primary_name=name)
+        add_alias(per_call, cid, name)
+        for src, xid in ext:
+            add_external_id(per_call, cid, src, xid)
+        ids_a.append(cid)
+
+    bulk = open_registry(str(tmp_path / "b.sqlite"))
+    writer = BulkRegistryWriter(bulk)
+    ids_b = []
+    for typ, label, name, ext in OPS:
+        cid = writer.get_or_create_canonical(typ, label, primary_name=name)
+        writer.add_alias(cid, name)
+        for src, xid in ext:
+            writer.add_external_id(cid, src, xid)
+        ids_b.append(cid)
+    assert _dump(bulk)["entities"] == []  # nothing written before the flush
+    writer.flush()
+
+    assert ids_a == ids_b
+    assert writer.flushes == 1 and writer.pending == 0
+    assert _dump(per_call) == _dump(bulk)
+    # Existing canonicals are found after the flush
+    assert BulkRegistryWriter(bulk).get_or_create_canonical("ORG", "ACME") == ids_a[0]
+
+
+def test_cache_serves_repeats_and_keeps_registry_identical(tmp_path):
+    plain = open_registry(str(tmp_path / "plain.sqlite"))
+    cached = open_registry(str(tmp_path / "cached.sqlite"))
+    cache = RegistryCache(maxsize=2)
+    w_plain, w_cached = BulkRegistryWriter(plain), BulkRegistryWriter(cached, cache=cache)
+    for _ in range(3):
+        for w in (w_plain, w_cached):
+            for typ, label, name, ext in OPS:
+                cid = w.get_or_create_canonical(typ, label, primary_name=name)
+                w.add_alias(cid, name)
+                for src, xid in ext:
+                    w.add_external_id(cid, src, xid)
+            w.flush()
+    assert _dump(plain) == _dump(cached)
+    stats = cache.stats()
+    assert stats["hits"] > 0 and stats["size"] <= 2
+    assert stats["round_trips_avoided"] >= stats["hits"] + stats["aliases_skipped"]
+
+    warm = RegistryCache()
+    assert warm.warm(cached, 10) == len(_dump(cached)["entities"])
+    assert warm.get(("ORG", "acme")) is not None
+
+
+def test_resolve_canonicals_matches_per_call_functions(tmp_path):
+    per_call = open_registry(str(tmp_path / "a.sqlite"))
+    ids_a = [get_or_create_canonical(per_call, typ, label, primary_name=name) for typ, label, name, _ in OPS]
+
+    set_based = open_registry(str(tmp_path / "b.sqlite"))
+    ids_b = resolve_canonicals(set_based, [(typ, label, name) for typ, label, name, _ in OPS])
+    assert ids_a == ids_b
+    assert _dump(per_call) == _dump(set_based)
+    # A second batch resolves existing canonicals through the join
+    assert resolve_canonicals(set_based, [("org", "Acme", "Other")]) == [ids_a[0]]
+    assert _dump(per_call) == _dump(set_based)
+
+
+def test_resolve_canonicals_commits_with_the_writer(tmp_path):
+    conn = open_registry(str(tmp_path / "r.sqlite"))
+    resolve_canonicals(conn, [("ORG", "Acme", "Acme")])
+    assert conn.in_transaction
+    conn.rollback()
+    assert _dump(conn)["entities"] == []
+
+    writer = BulkRegistryWriter(conn)
+    can_id = resolve_canonicals(conn, [("ORG", "Acme", "Acme")])[0]
+    writer.add_alias(can_id, "ACME Corp")
+    writer.flush()
+    assert not conn.in_transaction
+    other = open_registry(str(tmp_path / "r.sqlite"))
+    assert [r[0] for r in other.execute("SELECT alias FROM aliases ORDER BY alias")] == ["ACME Corp", "Acme"]
+    other.close()
+    conn.close()
+
+
+def test_link_set_based_matches_row_mode(tmp_path):
+    fixtures = pathlib.Path(__file__).resolve().parents[1] / "fixtures"
+    kwargs = dict(
+        adapters=["wikidata", "uei"],
+        adapter_paths={"wikidata": str(fixtures / "wikidata_cache.json"), "uei": str(fixtures / "uei_cache.json")},
+    )
+    outs = []
+    for mode in (False, True):
+        out, db = tmp_path / f"out{mode}", tmp_path / f"reg{mode}.sqlite"
+        link_entities(str(fixtures / "coref"), str(out), str(db), set_based=mode, **kwargs)
+        outs.append(((out / "linked.entities.jsonl").read_bytes(), _dump(open_registry(str(db)))))
+    assert outs[0] == outs[1]
+
+
+def test_unknown_canonical_ids_fall_back_to_registry_key(tmp_path):
+    import json
+
+    src = tmp_path / "in"
+    src.mkdir()
+    ents = [
+        {"doc_id": "d1", "type": "ORG", "text": "Acme", "mention_id": "m1", "canonical_id": "cid-from-other-registry"},
+        {"doc_id": "d1", "type": "ORG", "text": "Globex", "mention_id": "m2"},
+    ]
+    (src / "a.entities.jsonl").write_text("\n".join(json.dumps(e) for e in ents) + "\n", encoding="utf-8")
+    for set_based in (False, True):
+        out, db = tmp_path / f"out{set_based}", tmp_path / f"reg{set_based}.sqlite"
+        link_entities(str(src), str(out), str(db), set_based=set_based)
+        conn = open_registry(str(db))
+        acme = get_or_create_canonical(conn, "ORG", "acme")
+        dump = _dump(conn)
+        assert ("cid-from-other-registry", "Acme") not in dump["aliases"]
+        assert (acme, "Acme") in dump["aliases"]
+        assert len(dump["entities"]) == 2
+        rows = [json.loads(line) for line in (out / "linked.entities.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert {r["canonical_id"] for r in rows if r["name"] == "Acme"} == {acme}
+        report = json.loads((out / "_reports" / "run_report.json").read_text(encoding="utf-8"))
+        assert report["unknown_canonical_ids"] == 1
+        # Known IDs are kept as they are
+        assert BulkRegistryWriter(conn).existing_canonicals([acme, "nope"]) == {acme}
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+from combo.link.external_sources import uei_cache, wikidata_cache
+from combo.link.external_sources.compiled import BloomFilter, CompiledCache, compile_cache
+from combo.link.linker import link_entities
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+def test_compiled_cache_matches_json_cache(tmp_path):
+    items = {f"name {i}": f"Q{i}" for i in range(2000)}
+    path = tmp_path / "wd cache#1.sqlite"  # needs URI quoting
+    assert compile_cache(items, str(path), "wikidata") == 2000
+
+    cache = wikidata_cache.load_cache(str(path))
+    assert isinstance(cache, CompiledCache)
+    assert len(cache) == 2000 and cache and cache.source == "wikidata"
+    assert all(wikidata_cache.lookup(k.upper(), cache) == v for k, v in items.items())
+    assert cache.get("name 2000") is None and "name 1" in cache
+
+    clone = pickle.loads(pickle.dumps(cache))
+    assert clone.get("name 7") == "Q7"
+
+    empty = tmp_path / "empty.sqlite"
+    compile_cache({}, str(empty), "uei")
+    assert not uei_cache.load_cache(str(empty))
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter.for_capacity(5000, 0.01)
+    for i in range(5000):
+        bloom.add(f"k{i}")
+    assert all(f"k{i}" in bloom for i in range(5000))
+    fps = sum(f"x{i}" in bloom for i in range(20000))
+    assert fps < 20000 * 0.02
+
+
+def test_compile_cache_command_keeps_golden_output(tmp_path):
+    compiled = {}
+    for source in ("wikidata", "uei"):
+        out = tmp_path / f"{source}.sqlite"
+        res = subprocess.run(
+            [sys.executable, "-m", "combo", "link", "compile-cache", "--source", source,
+             "--in", str(FIXTURES / f"{source}_cache.json"), "--out", str(out)],
+            capture_output=True, text=True,
+        )
+        assert res.returncode == 0, res.stdout + res.stderr
+        compiled[source] = str(out)
+
+    res = subprocess.run(
+        [sys.executable, "-m", "combo", "link", "compile-cache", "--source", "uei", "--in", compiled["uei"], "--out", str(tmp_path / "x")],
+        capture_output=True, text=True,
+    )
+    assert res.returncode == 2
+
+    link_entities(str(FIXTURES / "coref"), str(tmp_path / "out"), str(tmp_path / "r.sqlite"), adapters=["wikidata", "uei"], adapter_paths=compiled)
+    h = hashlib.sha256((tmp_path / "out" / "linked.entities.jsonl").read_bytes()).hexdigest()
+    golden = (FIXTURES.parent / "goldens" / "step_d_linked.entities.sha256").read_text(encoding="utf-8").strip()
+    assert h == golden
+    assert json.loads((tmp_path / "out" / "_reports" / "run_report.json").read_text(encoding="utf-8"))["errors"] == 0
+
+
+def test_compiled_cache_of_another_source_is_rejected(tmp_path):
+    import pytest
+
+    path = tmp_path / "uei.sqlite"
+    compile_cache({"acme": "U1"}, str(path), "uei")
+    assert uei_cache.load_cache(str(path)).get("acme") == "U1"
+    with pytest.raises(ValueError, match="uei"):
+        wikidata_cache.load_cache(str(path))
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+from combo.link.linker import link_entities
+
+
+def _write_doc(src: Path, d: int, names):
+    ents = [{"doc_id": f"d{d}", "type": "ORG", "text": n, "mention_id": f"d{d}m{i}"} for i, n in enumerate(names)]
+    (src / f"doc{d}.entities.jsonl").write_text("\n".join(json.dumps(e) for e in ents) + "\n", encoding="utf-8")
+
+
+def _report(out: Path):
+    return json.loads((out / "_reports" / "run_report.json").read_text(encoding="utf-8"))
+
+
+def test_shards_concatenate_in_document_order(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    for d in range(4):
+        _write_doc(src, d, ["Acme", f"Globex {d}", "Initech"])
+    out = tmp_path / "out"
+    link_entities(str(src), str(out), str(tmp_path / "r.sqlite"))
+
+    shards = sorted((out / "_shards").glob("*.linked.jsonl"))
+    assert [p.name for p in shards] == [f"doc{d}.linked.jsonl" for d in range(4)]
+    merged = (out / "linked.entities.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(merged) == 12  # every document, not just the last one
+    assert merged == [line for p in shards for line in p.read_text(encoding="utf-8").splitlines()]
+    # Each document's rows stay together (not interleaved by a global sort)
+    assert [json.loads(line)["doc_id"] for line in merged] == [f"d{d}" for d in range(4) for _ in range(3)]
+
+
+def test_incremental_relinks_only_changed_documents(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    for d in range(4):
+        _write_doc(src, d, ["Acme", f"Globex {d}"])
+    out = tmp_path / "out"
+    link_entities(str(src), str(out), str(tmp_path / "r.sqlite"), incremental=True)
+    assert _report(out)["docs_skipped"] == 0
+
+    _write_doc(src, 1, ["Acme", "Umbrella"])  # changed
+    (src / "doc2.entities.jsonl").unlink()  # removed
+    _write_doc(src, 7, ["Hooli"])  # added
+    totals = link_entities(str(src), str(out), str(tmp_path / "r.sqlite"), incremental=True)
+    assert totals["docs"] == 2
+    assert _report(out)["docs_skipped"] == 2
+    assert not (out / "_shards" / "doc2.linked.jsonl").exists()
+
+    full = tmp_path / "full"
+    link_entities(str(src), str(full), str(tmp_path / "fresh.sqlite"))
+    assert (out / "linked.entities.jsonl").read_bytes() == (full / "linked.entities.jsonl").read_bytes()
+
+    # Different settings invalidate every shard
+    assert link_entities(str(src), str(out), str(tmp_path / "r.sqlite"), incremental=True, link_conf=0.9)["docs"] == 4
+    # So does another registry: its canonicals must be created there too
+    other = tmp_path / "other.sqlite"
+    assert link_entities(str(src), str(out), str(other), incremental=True, link_conf=0.9)["docs"] == 4
+    link_entities(str(src), str(out), str(other), incremental=True, link_conf=0.9)
+    assert _report(out)["docs_skipped"] == 4
+
+
+def test_failed_run_rolls_back_and_closes_registry(tmp_path, monkeypatch):
+    import sqlite3
+
+    import pytest
+
+    import combo.link.linker as linker
+
+    src = tmp_path / "in"
+    src.mkdir()
+    for d in range(3):
+        _write_doc(src, d, [f"Org {d}"])
+    conns = []
+    real_open = linker.open_registry
+
+    def tracking_open(*args, **kwargs):
+        conns.append(real_open(*args, **kwargs))
+        return conns[-1]
+
+    def failing_write(path, lines):
+        if path.endswith("doc1.linked.jsonl"):
+            raise OSError("disk full")
+        return real_write(path, lines)
+
+    real_write = linker._write_lines
+    monkeypatch.setattr(linker, "open_registry", tracking_open)
+    monkeypatch.setattr(linker, "_write_lines", failing_write)
+    db = tmp_path / "r.sqlite"
+    with pytest.raises(OSError):
+        # Set-based resolution writes the batch's canonicals before the shards
+        link_entities(str(src), str(tmp_path / "out"), str(db), commit_every=2, set_based=True)
+    # The connection is closed and the failed batch (doc0, doc1) left nothing behind
+    with pytest.raises(sqlite3.ProgrammingError):
+        conns[0].execute("SELECT 1")
+    check = sqlite3.connect(str(db))
+    assert check.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 0
+    check.close()
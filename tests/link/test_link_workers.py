@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from combo.link.linker import link_entities
+from combo.link.registry import open_registry
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+def _corpus(root):
+    src = root / "in"
+    src.mkdir()
+    for d in range(6):
+        ents = [
+            {"doc_id": f"d{d}", "type": "ORG", "text": "IBM" if d % 2 else "International Business Machines", "mention_id": f"d{d}m1"},
+            {"doc_id": f"d{d}", "type": "PERSON", "text": f"Person {d % 3}", "mention_id": f"d{d}m2", "resolved_entity_id": f"E{d % 3}"},
+            {"doc_id": f"d{d}", "type": "ORG", "text": "Acme", "mention_id": f"d{d}m3"},
+        ]
+        (src / f"doc{d}.entities.jsonl").write_text("\n".join(json.dumps(e) for e in ents) + "\n", encoding="utf-8")
+    return src
+
+
+def _dump(path):
+    conn = open_registry(str(path))
+    return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall()) for t in ("entities", "aliases", "external_ids")}
+
+
+def test_link_workers_match_serial(tmp_path):
+    src = _corpus(tmp_path)
+    kwargs = dict(
+        adapters=["wikidata", "uei"],
+        adapter_paths={"wikidata": str(FIXTURES / "wikidata_cache.json"), "uei": str(FIXTURES / "uei_cache.json")},
+        commit_every=2,
+    )
+    results = []
+    for workers in (1, 3):
+        out, db = tmp_path / f"out{workers}", tmp_path / f"reg{workers}.sqlite"
+        totals = link_entities(str(src), str(out), str(db), workers=workers, **kwargs)
+        results.append((totals, (out / "linked.entities.jsonl").read_bytes(), _dump(db)))
+    assert results[0] == results[1]
+    assert results[0][0] == {"docs": 6, "entities": 18}
+    assert {src for _, src, _ in results[0][2]["external_ids"]} == {"wikidata", "uei"}
+
+
+def test_pool_window_bounds_documents_in_flight(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from combo.link.linker import _list_entity_files, _prepare_in_pool
+
+    files = _list_entity_files(str(_corpus(tmp_path)))
+
+    class CountingPool(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, fn, *args):
+            CountingPool.submitted += 1
+            return super().submit(fn, *args)
+
+    with CountingPool(max_workers=2) as pool:
+        prepared = _prepare_in_pool(pool, files, 2)
+        assert CountingPool.submitted == 2  # submitted up front, before any result is taken
+        first = next(prepared)
+        assert CountingPool.submitted == 3
+        rest = list(prepared)
+    assert CountingPool.submitted == len(files) == len(rest) + 1
+    assert [g["doc_id"] for g in first.values()] == ["d0"] * 3
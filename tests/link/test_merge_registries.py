@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+
+from combo.link.merge import merge_registries
+from combo.link.registry import BulkRegistryWriter, deterministic_id, open_registry, search_registry
+
+
+def _registry(path, ops):
+    conn = open_registry(str(path))
+    writer = BulkRegistryWriter(conn)
+    for typ, label, name, ext in ops:
+        cid = writer.get_or_create_canonical(typ, label, primary_name=name)
+        writer.add_alias(cid, name)
+        for src, xid in ext:
+            writer.add_external_id(cid, src, xid)
+    writer.flush()
+    conn.close()
+    return str(path)
+
+
+def _dump(conn):
+    return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall()) for t in ("entities", "aliases", "external_ids")}
+
+
+NODE_A = [("ORG", "acme", "Acme", [("wikidata", "Q1")]), ("PERSON", "jane doe", "Jane Doe", [])]
+NODE_B = [("ORG", "acme", "ACME Corp", [("uei", "U1")]), ("ORG", "globex", "Globex", [("wikidata", "Q1")])]
+
+
+def test_merge_equals_shared_registry(tmp_path):
+    a = _registry(tmp_path / "a.sqlite", NODE_A)
+    b = _registry(tmp_path / "b.sqlite", NODE_B)
+    shared = open_registry(_registry(tmp_path / "shared.sqlite", NODE_A + NODE_B))
+
+    merged = open_registry(str(tmp_path / "merged.sqlite"), enable_fts=True)
+    result = merge_registries(merged, [a, b])
+    assert _dump(merged) == _dump(shared)
+    assert result["added"] == {"entities": 3, "aliases": 4, "external_ids": 2}
+    # Q1 is on Acme in A and on Globex in B: reported, first registry wins
+    assert result["conflicts"]["counts"] == {"entities": 0, "external_ids": 1}
+    assert result["conflicts"]["external_ids"][0]["other_canonical_id"] == deterministic_id("ORG", "globex")
+    # FTS is rebuilt and its triggers restored
+    assert [r[0] for r in search_registry(merged, "globex")] == [deterministic_id("ORG", "globex")]
+    assert merged.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'").fetchone()[0] == 6
+
+
+def test_merge_remaps_canonicals_with_foreign_ids(tmp_path):
+    a = _registry(tmp_path / "a.sqlite", NODE_A)
+    b = tmp_path / "b.sqlite"
+    conn = open_registry(str(b))
+    with conn:
+        conn.execute("INSERT INTO entities VALUES ('legacy-acme', 'ORG', 'acme', 'Acme Inc')")
+        conn.execute("INSERT INTO aliases VALUES ('legacy-acme', 'Acme Inc')")
+    conn.close()
+
+    merged = open_registry(str(tmp_path / "m.sqlite"))
+    result = merge_registries(merged, [a, str(b)])
+    assert result["conflicts"]["counts"]["entities"] == 1
+    acme = deterministic_id("ORG", "acme")
+    assert ("legacy-acme",) not in merged.execute("SELECT canonical_id FROM entities").fetchall()
+    assert (acme, "Acme Inc") in _dump(merged)["aliases"]
+
+
+def test_merge_registries_command(tmp_path):
+    a = _registry(tmp_path / "a.sqlite", NODE_A)
+    b = _registry(tmp_path / "b.sqlite", NODE_B)
+    cmd = [sys.executable, "-m", "combo", "link", "merge-registries"]
+    res = subprocess.run(cmd + [a, b, "--out", str(tmp_path / "m.sqlite"), "--report", str(tmp_path / "rep.json")], capture_output=True, text=True)
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert json.loads(res.stdout)["conflicts"] == {"entities": 0, "external_ids": 1}
+    assert json.loads((tmp_path / "rep.json").read_text(encoding="utf-8"))["conflicts"]["external_ids"][0]["external_id"] == "Q1"
+
+    assert subprocess.run(cmd + [a, "--out", a], capture_output=True, text=True).returncode == 2
+    (tmp_path / "junk.sqlite").write_bytes(b"")
+    assert subprocess.run(cmd + [str(tmp_path / "junk.sqlite"), "--out", str(tmp_path / "m2.sqlite")], capture_output=True, text=True).returncode == 2
+
+
+def test_invalid_source_leaves_target_untouched(tmp_path):
+    import sqlite3
+
+    import pytest
+
+    a = _registry(tmp_path / "a.sqlite", NODE_A)
+    bogus = tmp_path / "bogus.sqlite"
+    sqlite3.connect(str(bogus)).execute("CREATE TABLE t (x)").connection.close()
+
+    merged = open_registry(str(tmp_path / "merged.sqlite"))
+    with pytest.raises(ValueError, match="not a registry"):
+        merge_registries(merged, [a, str(bogus)])
+    assert _dump(merged) == {"entities": [], "aliases": [], "external_ids": []}
@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+
+from combo.link.registry import BulkRegistryWriter, open_registry, search_registry
+
+
+def _ids(rows):
+    return [r[0] for r in rows]
+
+
+def test_fts_tracks_writes_without_reopening(tmp_path):
+    conn = open_registry(str(tmp_path / "r.sqlite"), enable_fts=True)
+    writer = BulkRegistryWriter(conn)
+    acme = writer.get_or_create_canonical("ORG", "acme", primary_name="Acme Corporation")
+    writer.add_alias(acme, "Road Runner Supplies")
+    jane = writer.get_or_create_canonical("PERSON", "jane doe", primary_name="Jane Doe")
+    writer.flush()
+
+    assert _ids(search_registry(conn, "acme")) == [acme]
+    assert _ids(search_registry(conn, "runner supplies")) == [acme]  # alias text is indexed
+    assert _ids(search_registry(conn, "doe")) == [jane]
+    assert search_registry(conn, 'acme" OR "doe') == []  # FTS syntax is taken literally
+
+    with conn:
+        conn.execute("DELETE FROM aliases WHERE canonical_id=?", (acme,))
+        conn.execute("UPDATE entities SET primary_name='Janet Doe' WHERE canonical_id=?", (jane,))
+    assert search_registry(conn, "runner") == []
+    assert _ids(search_registry(conn, "janet")) == [jane]
+
+
+def test_fts_migrates_legacy_registry_once(tmp_path):
+    path = str(tmp_path / "r.sqlite")
+    conn = open_registry(path)
+    writer = BulkRegistryWriter(conn)
+    acme = writer.get_or_create_canonical("ORG", "acme", primary_name="Acme")
+    writer.flush()
+    # Pre-trigger layout: entities_fts only, populated by hand
+    conn.execute("CREATE VIRTUAL TABLE entities_fts USING fts5(primary_name, content='entities', content_rowid='rowid')")
+    conn.commit()
+    conn.close()
+
+    conn = open_registry(path, enable_fts=True)
+    assert _ids(search_registry(conn, "acme")) == [acme]
+    triggers = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'").fetchone()[0]
+    assert triggers == 6
+
+
+def test_fts_rebuild_command(tmp_path):
+    path = tmp_path / "r.sqlite"
+    conn = open_registry(str(path), enable_fts=True)
+    writer = BulkRegistryWriter(conn)
+    writer.get_or_create_canonical("ORG", "acme", primary_name="Acme")
+    writer.flush()
+    conn.close()
+
+    res = subprocess.run([sys.executable, "-m", "combo", "link", "fts-rebuild", "--registry", str(path)], capture_output=True, text=True)
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert json.loads(res.stdout) == {"aliases": 1, "entities": 1}
+
+    res = subprocess.run([sys.executable, "-m", "combo", "link", "fts-rebuild", "--registry", str(tmp_path / "missing.sqlite")], capture_output=True, text=True)
+    assert res.returncode == 2
@@ -0,0 +1,98 @@
+import json
+import pickle
+import subprocess
+import sys
+
+from combo.link.registry import BulkRegistryWriter, open_registry
+from combo.link.snapshot import RegistrySnapshot, write_snapshot
+
+
+def _registry(path):
+    conn = open_registry(str(path))
+    writer = BulkRegistryWriter(conn)
+    ids = {}
+    for typ, label, name in [("ORG", "acme", "Acme"), ("ORGANIZATION", "acme", "ACME Inc"), ("PERSON", "zoë", "Zoë"), ("ORG", "globex", "Globex")]:
+        ids[(typ, label)] = writer.get_or_create_canonical(typ, label, primary_name=name)
+    writer.add_alias(ids[("ORG", "globex")], "Acme")  # shared alias
+    writer.add_external_id(ids[("ORG", "acme")], "wikidata", "Q1")
+    writer.flush()
+    return conn, ids
+
+
+def test_snapshot_lookups_match_registry(tmp_path):
+    conn, ids = _registry(tmp_path / "r.sqlite")
+    stats = write_snapshot(conn, str(tmp_path / "r.snap"))
+    assert stats == {"generation": 1, "entities": 4, "aliases": 5, "external_ids": 1, "canonicals": 4}
+
+    snap = RegistrySnapshot(str(tmp_path / "r.snap"))
+    assert snap.generation == 1
+    for (typ, label), cid in ids.items():
+        assert snap.canonical_id(typ.lower(), f" {label.upper()} ") == cid
+    assert snap.canonical_id("ORG", "initech") is None
+    assert snap.alias_ids("Acme") == sorted([ids[("ORG", "acme")], ids[("ORG", "globex")]])
+    assert snap.alias_ids("Nope") == []
+    assert snap.external("wikidata", "Q1") == ids[("ORG", "acme")]
+    assert snap.external("uei", "Q1") is None
+    assert snap.canonical(ids[("PERSON", "zoë")]) == ("PERSON", "zoë", "Zoë")
+    assert pickle.loads(pickle.dumps(snap)).canonical_id("ORG", "globex") == ids[("ORG", "globex")]
+
+    # The open mapping stays valid when a newer snapshot replaces the file
+    writer = BulkRegistryWriter(conn)
+    new_id = writer.get_or_create_canonical("ORG", "initech", primary_name="Initech")
+    writer.flush()
+    assert write_snapshot(conn, str(tmp_path / "r.snap"))["generation"] == 2
+    assert snap.canonical_id("ORG", "initech") is None
+    with RegistrySnapshot(str(tmp_path / "r.snap")) as newer:
+        assert newer.generation == 2 and newer.canonical_id("ORG", "initech") == new_id
+    snap.close()
+
+
+def test_snapshot_command(tmp_path):
+    conn, _ = _registry(tmp_path / "r.sqlite")
+    conn.close()
+    res = subprocess.run(
+        [sys.executable, "-m", "combo", "link", "snapshot", "--registry", str(tmp_path / "r.sqlite"), "--out", str(tmp_path / "r.snap")],
+        capture_output=True, text=True,
+    )
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert json.loads(res.stdout)["generation"] == 1
+    assert RegistrySnapshot(str(tmp_path / "r.snap")).counts["entities"] == 4
+
+
+def test_snapshot_does_not_wait_for_a_writer(tmp_path):
+    import sqlite3
+    import time
+
+    conn, ids = _registry(tmp_path / "r.sqlite")
+    conn.close()
+    writer = sqlite3.connect(str(tmp_path / "r.sqlite"), isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO entities(canonical_id, type, normalized_label) VALUES ('uncommitted', 'ORG', 'initech')")
+    try:
+        reader = open_registry(str(tmp_path / "r.sqlite"))
+        reader.execute("PRAGMA busy_timeout=5000")
+        t0 = time.perf_counter()
+        stats = write_snapshot(reader, str(tmp_path / "r.snap"))
+        assert time.perf_counter() - t0 < 2
+        assert stats["entities"] == 4 and stats["generation"] == 1
+        assert write_snapshot(reader, str(tmp_path / "r.snap"))["generation"] == 2
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    with RegistrySnapshot(str(tmp_path / "r.snap")) as snap:
+        assert snap.canonical_id("ORG", "initech") is None
+        assert snap.canonical_id("ORG", "acme") == ids[("ORG", "acme")]
+
+
+def test_snapshot_sections_sorted_by_bytes(tmp_path):
+    conn, _ = _registry(tmp_path / "r.sqlite")
+    writer = BulkRegistryWriter(conn)
+    for label in ("zz", "Ünïon", "a\tb", "a"):
+        writer.get_or_create_canonical("ORG", label, primary_name=label)
+    writer.flush()
+    write_snapshot(conn, str(tmp_path / "r.snap"))
+    with RegistrySnapshot(str(tmp_path / "r.snap")) as snap:
+        for sec in snap._sections.values():
+            records = [(sec.key(i), sec.value(i)) for i in range(sec.count)]
+            assert records == sorted(records, key=lambda r: (r[0], r[1].encode("utf-8")))
+        assert snap.canonical_id("ORG", "zoë") is None and snap.canonical_id("PERSON", "zoë")
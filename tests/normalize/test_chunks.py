@@ -31,3 +31,63 @@ def test_chunks_consecutive_and_token_budget():
             assert ch["page_start"] in (None, pmin)
             assert ch["page_end"] in (None, pmax)
 
+
+
+def test_chunks_with_token_counter_and_overlap():
+    from combo.normalize.segment import CachedTokenCounter
+
+    doc = load("pdf_cross_page.json")
+    sents = segment_to_sentences(doc)
+    # Character-based counter stands in for a model tokenizer
+    counter = CachedTokenCounter(lambda t: len(t), name="chars")
+    chunks = build_chunks(sents, doc_id=doc["doc_id"], max_tokens=60, token_counter=counter, overlap_sentences=1)
+    by_id = {s["sent_id"]: s for s in sents}
+    for ch in chunks:
+        if len(ch["sentence_ids"]) > 1:
+            assert sum(len(by_id[sid]["text"]) for sid in ch["sentence_ids"]) <= 60
+    assert len(chunks) > 1
+    # Consecutive chunks share one sentence
+    for a, b in zip(chunks, chunks[1:]):
+        if len(a["sentence_ids"]) > 1:
+            assert a["sentence_ids"][-1] == b["sentence_ids"][0]
+    assert chunks[-1]["sentence_ids"][-1] == sents[-1]["sent_id"]
+    assert counter.misses == len({s["text"] for s in sents})
+
+
+def test_joined_chunk_text_fits_token_budget():
+    from combo.normalize.segment import CachedTokenCounter
+
+    # Each join adds a space, so the joined text counts more than the sentence sum
+    sents = [
+        {"doc_id": "d", "sent_id": f"s{i}", "page": 1, "text": t, "char_start": 0, "char_end": len(t)}
+        for i, t in enumerate(["a" * 20, "b" * 20, "c" * 20, "d" * 20])
+    ]
+    counter = CachedTokenCounter(lambda t: len(t), name="chars")
+    chunks = build_chunks(sents, doc_id="d", max_tokens=40, token_counter=counter)
+    assert all(len(ch["text"]) <= 40 for ch in chunks)
+    assert [len(ch["sentence_ids"]) for ch in chunks] == [1, 1, 1, 1]
+
+
+def test_token_counter_cache_is_bounded():
+    from combo.normalize.segment import CachedTokenCounter
+
+    counter = CachedTokenCounter(lambda t: len(t), name="chars", maxsize=2)
+    for t in ["a", "bb", "a", "ccc", "bb"]:
+        counter(t)
+    # "bb" was the least recently used entry when "ccc" came in
+    assert (counter.hits, counter.misses) == (1, 4)
+    assert len(counter._cache) == 2
+
+
+def test_overlap_prefix_is_marked():
+    doc = load("pdf_cross_page.json")
+    sents = segment_to_sentences(doc)
+    by_id = {s["sent_id"]: s for s in sents}
+    chunks = build_chunks(sents, doc_id=doc["doc_id"], max_tokens=20, overlap_sentences=1)
+    assert "overlap_chars" not in chunks[0]
+    for a, b in zip(chunks, chunks[1:]):
+        shared = by_id[a["sentence_ids"][-1]]["text"]
+        assert b["sentence_ids"][0] == a["sentence_ids"][-1]
+        assert b["text"][: b["overlap_chars"]] == shared
+    plain = build_chunks(sents, doc_id=doc["doc_id"], max_tokens=20)
+    assert all("overlap_chars" not in ch for ch in plain)
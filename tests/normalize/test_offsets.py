@@ -0,0 +1,55 @@
+import json
+import pathlib
+
+from combo.normalize.offsets import OffsetIndex
+from combo.normalize.segment import normalize_item
+
+
+FIX = pathlib.Path(__file__).with_name("fixtures")
+
+
+def test_offset_index_maps_chunk_and_page_offsets_to_sentences():
+    item = json.loads((FIX / "pdf_cross_page.json").read_text(encoding="utf-8"))
+    norm = normalize_item(item, max_tokens=5)
+    assert "offsets" in norm
+    loc = OffsetIndex.from_normalized(norm)
+    sents = norm["sentences"]
+    order = {s["sent_id"]: i for i, s in enumerate(sents)}
+    for ch in norm["chunks"]:
+        starts = norm["offsets"]["chunks"][ch["chunk_id"]]["starts"]
+        for sid, start in zip(ch["sentence_ids"], starts):
+            s = sents[order[sid]]
+            assert ch["text"][start:start + len(s["text"])] == s["text"]
+            # Last character of the sentence still maps to it
+            idx, hit_sid, page = loc.locate_in_chunk(ch["chunk_id"], start + len(s["text"]) - 1)
+            assert (idx, hit_sid, page) == (order[sid], sid, s["page"])
+    for i, s in enumerate(sents):
+        assert loc.locate_on_page(s["page"], s["char_start"]) == i
+
+
+def test_offset_index_built_for_legacy_docs_without_offsets():
+    item = json.loads((FIX / "pdf_simple.json").read_text(encoding="utf-8"))
+    norm = normalize_item(item)
+    legacy = {k: v for k, v in norm.items() if k != "offsets"}
+    a = OffsetIndex.from_normalized(norm)
+    b = OffsetIndex.from_normalized(legacy)
+    ch = norm["chunks"][0]
+    assert a.locate_in_chunk(ch["chunk_id"], 0) == b.locate_in_chunk(ch["chunk_id"], 0)
+
+
+def test_chunk_offsets_follow_stripped_chunk_text():
+    from combo.normalize.offsets import build_offset_index
+
+    texts = ["", "ACME hired Alice.", "NASA hired Bob."]
+    sents = [
+        {"doc_id": "d", "sent_id": f"s{i}", "page": 1, "text": t, "char_start": 0, "char_end": len(t)}
+        for i, t in enumerate(texts)
+    ]
+    chunk = {"chunk_id": "c", "sentence_ids": ["s0", "s1", "s2"], "text": " ".join(texts).strip()}
+    index = build_offset_index(sents, [chunk])
+    starts = index["chunks"]["c"]["starts"]
+    for t, start in zip(texts[1:], starts[1:]):
+        assert chunk["text"][start:start + len(t)] == t
+    loc = OffsetIndex(index, [s["sent_id"] for s in sents])
+    assert loc.locate_in_chunk("c", 0)[1] == "s1"
+    assert loc.locate_in_chunk("c", chunk["text"].index("NASA"))[1] == "s2"
@@ -0,0 +1,52 @@
+import pathlib
+
+from combo.embed.api import LocalDeterministicAdapter
+from combo.embed.cli import embed_dir
+from combo.io.shards import list_normalized, read_normalized_doc
+from combo.normalize.segment import normalize_dir
+from combo.normalize.validate import validate_dir
+
+
+FIX = pathlib.Path(__file__).with_name("fixtures")
+
+
+def test_sharded_output_is_read_transparently(tmp_path):
+    flat = tmp_path / "flat"
+    sharded = tmp_path / "sharded"
+    flat_outs = normalize_dir(str(FIX), str(flat))
+    normalize_dir(str(FIX), str(sharded), shard_size=3)
+
+    assert not list(sharded.glob("*.normalized.json"))
+    assert len(list((sharded / "_shards").glob("normalized-*.jsonl"))) == 3
+    refs = list_normalized(str(sharded))
+    assert len(refs) == len(flat_outs)
+    assert {r.base for r in refs} == {pathlib.Path(p).stem for p in flat_outs}
+
+    # Random access through the offset index
+    doc = read_normalized_doc(str(sharded), refs[-1].doc_id)
+    assert doc["doc"]["doc_id"] == refs[-1].doc_id
+
+    results = validate_dir(str(sharded))
+    assert len(results) == len(flat_outs)
+    assert not any(results.values())
+
+    model = LocalDeterministicAdapter(dim=8)
+    flat_written, flat_rows = embed_dir(str(flat), str(tmp_path / "emb_flat"), model)
+    shard_written, shard_rows = embed_dir(str(sharded), str(tmp_path / "emb_sharded"), model)
+    assert sorted(pathlib.Path(p).name for p in flat_written) == sorted(pathlib.Path(p).name for p in shard_written)
+    assert flat_rows == shard_rows
+
+
+def test_switching_layout_replaces_previous_outputs(tmp_path):
+    out = tmp_path / "out"
+    flat_outs = normalize_dir(str(FIX), str(out))
+    normalize_dir(str(FIX), str(out), shard_size=2)
+    assert not list(out.glob("*.normalized.json"))
+    assert len(list_normalized(str(out))) == len(flat_outs)
+
+    normalize_dir(str(FIX), str(out))
+    refs = list_normalized(str(out))
+    assert len(refs) == len(flat_outs)
+    assert all(r.offset is None for r in refs)
+    assert read_normalized_doc(str(out), "missing") is None
+    assert len(validate_dir(str(out))) == len(flat_outs)
@@ -0,0 +1,72 @@
+import json
+import pathlib
+
+from combo.io.tables import CHUNK_COLUMNS, iter_table
+from combo.normalize.segment import normalize_dir
+
+
+FIX = pathlib.Path(__file__).with_name("fixtures")
+
+
+def test_tables_cover_every_sentence_and_chunk(tmp_path):
+    outs = normalize_dir(str(FIX), str(tmp_path), tables=True, table_shard_rows=3)
+    n_sents = n_chunks = 0
+    for p in outs:
+        obj = json.loads(pathlib.Path(p).read_text(encoding="utf-8"))
+        n_sents += len(obj["sentences"])
+        n_chunks += len(obj["chunks"])
+
+    tables_dir = tmp_path / "_tables"
+    sents = list(iter_table(str(tables_dir), "sentences"))
+    chunks = list(iter_table(str(tables_dir), "chunks", columns=["doc_id", "chunk_id", "n_tokens"]))
+    assert len(sents) == n_sents
+    assert len(chunks) == n_chunks
+    # Small shard size forces several shard files
+    assert len(list(tables_dir.glob("sentences-*"))) > 1
+    # One file per column, so narrow reads open only those files
+    assert sorted(p.name for p in (tables_dir / "chunks-00000").iterdir()) == sorted(f"{c}.jsonl" for c in CHUNK_COLUMNS)
+    # Projection keeps only the requested columns
+    assert all(set(c) == {"doc_id", "chunk_id", "n_tokens"} for c in chunks)
+    manifest = json.loads((tables_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["tables"]["sentences"]["rows_written"] == n_sents
+
+
+def test_tables_rewritten_on_rerun(tmp_path):
+    normalize_dir(str(FIX), str(tmp_path), tables=True)
+    first = list(iter_table(str(tmp_path / "_tables"), "chunks"))
+    normalize_dir(str(FIX), str(tmp_path), tables=True)
+    second = list(iter_table(str(tmp_path / "_tables"), "chunks"))
+    assert len(first) == len(second)
+
+
+def test_table_token_counts_use_chunk_counter(tmp_path):
+    from combo.normalize.segment import CachedTokenCounter
+
+    counter = CachedTokenCounter(lambda t: len(t), name="chars")
+    normalize_dir(str(FIX), str(tmp_path), tables=True, token_counter=counter)
+    for row in iter_table(str(tmp_path / "_tables"), "chunks"):
+        assert row["n_tokens"] == len(row["text"])
+    for row in iter_table(str(tmp_path / "_tables"), "sentences"):
+        assert row["n_tokens"] == len(row["text"])
+
+
+def test_embed_reads_chunk_table_without_loading_documents(tmp_path, monkeypatch):
+    import combo.embed.cli as embed_cli
+    from combo.embed.api import LocalDeterministicAdapter
+
+    model = LocalDeterministicAdapter(dim=8)
+    plain, with_tables = tmp_path / "plain", tmp_path / "tables"
+    normalize_dir(str(FIX), str(plain))
+    normalize_dir(str(FIX), str(with_tables), tables=True, shard_size=2)
+    expected = {pathlib.Path(p).name: pathlib.Path(p).read_text(encoding="utf-8") for p in embed_cli.embed_dir(str(plain), str(tmp_path / "e1"), model)[0]}
+
+    def _no_load(ref):
+        raise AssertionError("document loaded")
+
+    monkeypatch.setattr(embed_cli, "load_normalized", _no_load)
+    written, _ = embed_cli.embed_dir(str(with_tables), str(tmp_path / "e2"), model)
+    assert {pathlib.Path(p).name: pathlib.Path(p).read_text(encoding="utf-8") for p in written} == expected
+
+    # Re-normalizing without tables removes them, so embed falls back to the documents
+    normalize_dir(str(FIX), str(with_tables))
+    assert not (with_tables / "_tables").exists()
@@ -0,0 +1,78 @@
+import json
+import pathlib
+
+from combo.normalize.segment import normalize_dir
+from combo.normalize.validate import validate_dir, validate_dir_with_stats
+
+
+FIX = pathlib.Path(__file__).with_name("fixtures")
+
+
+def test_parallel_matches_serial(tmp_path):
+    normalize_dir(str(FIX), str(tmp_path))
+    serial = validate_dir(str(tmp_path))
+    parallel = validate_dir(str(tmp_path), workers=2)
+    assert serial == parallel
+    sampled = validate_dir(str(tmp_path), sample=1, seed=7)
+    assert sampled.keys() == serial.keys()
+    assert not any(sampled.values())
+
+
+def test_manifest_fast_path_trusts_unchanged_docs(tmp_path):
+    norm = tmp_path / "norm"
+    outs = normalize_dir(str(FIX), str(norm))
+    manifest = tmp_path / "validated.json"
+
+    results, trusted = validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+    assert not any(results.values()) and not trusted
+    results, trusted = validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+    assert trusted == set(results)
+
+    # A re-normalized document with a different checksum is re-validated
+    p = pathlib.Path(outs[0])
+    obj = json.loads(p.read_text(encoding="utf-8"))
+    obj["meta"]["doc_sha1"] = "0" * 40
+    obj["sentences"][0]["text"] += "!"
+    p.write_text(json.dumps(obj), encoding="utf-8")
+    results, trusted = validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+    assert p.name not in trusted
+    assert results[p.name]
+
+
+def test_manifest_fast_path_revalidates_rechunked_docs(tmp_path):
+    norm = tmp_path / "norm"
+    manifest = tmp_path / "validated.json"
+    normalize_dir(str(FIX), str(norm), max_tokens=512)
+    validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+
+    # Same text, different chunking settings: the stamp no longer matches
+    normalize_dir(str(FIX), str(norm), max_tokens=8, overlap_sentences=1)
+    results, trusted = validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+    assert results and not trusted
+
+
+def test_manifest_fast_path_skips_reading_unchanged_docs(tmp_path, monkeypatch):
+    from combo.normalize import validate
+
+    norm = tmp_path / "norm"
+    manifest = tmp_path / "validated.json"
+    normalize_dir(str(FIX), str(norm), shard_size=2)
+    validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+
+    def fail(ref):
+        raise AssertionError(f"{ref.label} was read")
+
+    monkeypatch.setattr(validate, "load_normalized", fail)
+    results, trusted = validate_dir_with_stats(str(norm), manifest_path=str(manifest))
+    assert results and trusted == set(results)
+
+
+def test_budget_is_not_checked_with_whitespace_for_other_counters():
+    from combo.normalize.segment import normalize_item
+    from combo.normalize.validate import validate_normalized_object
+
+    item = {"doc_id": "D", "source_path": "x", "pages": ["one two three four five six."], "images": []}
+    obj = normalize_item(item, max_tokens=512)
+    assert validate_normalized_object(obj, token_budget=3) == ["chunk %s exceeds token budget" % obj["chunks"][0]["chunk_id"]]
+    obj["meta"]["chunking"]["token_counter"] = "llama.cpp:model.gguf"
+    assert validate_normalized_object(obj, token_budget=3) == []
@@ -0,0 +1,155 @@
+"""
+Benchmark within-document coreference on large synthetic documents: the
+legacy per-candidate implementation against the precomputed-feature scan
+in `combo.coref.within_doc.resolve_coref`. Outputs are checked for equality.
+
+Usage: python tools/bench_coref.py [--mentions 100000] [--seed 0] [--shuffle-sents]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from combo.coref.within_doc import (  # noqa: E402
+    _derive_mention_features,
+    _estimate_number_for_candidate,
+    _is_device_like,
+    _sent_ord,
+    resolve_coref,
+)
+
+
+def legacy_resolve_coref(
+    ents: List[Dict],
+    max_sent_back: int = 3,
+    max_mentions_back: int = 30,
+) -> List[Dict]:
+    """The pre-vectorization implementation, kept verbatim for comparison."""
+    aug = [_derive_mention_features(e) for e in ents]
+    # Keep original order; create an index for lookup
+    out: List[Dict] = []
+    for i, m in enumerate(aug):
+        m2 = dict(m)
+        m2.update({
+            "antecedent_mention_id": None,
+            "resolved_entity_id": None,
+            "coref_rule": "unresolved",
+            "coref_conf": 0.0,
+        })
+        if not m2.get("is_pronoun"):
+            out.append(m2)
+            continue
+        # Look back
+        candidates: List[Tuple[int, Dict]] = []
+        cur_sent = _sent_ord(m2)
+        back_count = 0
+        j = i - 1
+        while j >= 0 and back_count < max_mentions_back:
+            c = aug[j]
+            if abs(cur_sent - _sent_ord(c)) <= max_sent_back:
+                candidates.append((j, c))
+                back_count += 1
+            j -= 1
+
+        form = (m2.get("pronoun_form") or "").lower()
+        num = m2.get("number") or "unknown"
+        gen = m2.get("gender") or "unknown"
+        chosen: Optional[Dict] = None
+        rule = "unresolved"
+        conf = 0.0
+
+        # Filter candidates by basic agreement
+        def compatible(c: Dict) -> bool:
+            # Gender agreement only for he/she/him/her
+            if form in {"he", "him"} and (c.get("gender", "unknown") not in {"masc", "unknown"}):
+                return False
+            if form in {"she", "her"} and (c.get("gender", "unknown") not in {"fem", "unknown"}):
+                return False
+            # Number agreement
+            if num == "plural" and _estimate_number_for_candidate(c) != "plural":
+                return False
+            if num == "singular" and _estimate_number_for_candidate(c) != "singular":
+                return False
+            return True
+
+        compat = [(idx, c) for idx, c in candidates if compatible(c)]
+
+        # Device-over-org preference for it/this/that
+        if form in {"it", "this", "that"}:
+            dev_first = [(idx, c) for idx, c in compat if _is_device_like(c)]
+            if dev_first:
+                chosen = dev_first[0][1]
+                rule = "prefer_device_over_org"
+                conf = 0.85
+            elif compat:
+                chosen = compat[0][1]
+                rule = "nearest_compatible"
+                conf = 0.75
+        else:
+            if compat:
+                chosen = compat[0][1]
+                rule = "nearest_compatible"
+                conf = 0.75 if num == "singular" else 0.7
+
+        if chosen is not None:
+            m2["antecedent_mention_id"] = chosen.get("mention_id")
+            # Prefer upstream entity id if present, else antecedent mention_id
+            m2["resolved_entity_id"] = chosen.get("id") or chosen.get("mention_id")
+            m2["coref_rule"] = rule
+            m2["coref_conf"] = conf
+        out.append(m2)
+    return out
+
+
+WORDS = [
+    ("ACME", "ORG"), ("NASA", "ORG"), ("Alice", "PERSON"), ("Bob", "PERSON"), ("Drone", "PRODUCT"),
+    ("battery pack", "OTHER"), ("Systems", "OTHER"), ("Paris", "GPE"), ("railgun prototype", "OTHER"),
+    ("it", "OTHER"), ("they", "OTHER"), ("she", "OTHER"), ("he", "OTHER"), ("this", "OTHER"), ("those", "OTHER"),
+]
+
+
+def synthetic_doc(n: int, seed: int, shuffle_sents: bool) -> List[Dict]:
+    """Builds n mentions, ~4 per sentence, about a third of them pronouns."""
+    rng = random.Random(seed)
+    ents: List[Dict] = []
+    for i in range(n):
+        text, etype = rng.choice(WORDS)
+        sent = i // 4
+        if shuffle_sents and rng.random() < 0.05:
+            sent = rng.randrange(0, max(1, n // 4))
+        ents.append({"mention_id": f"m{i}", "doc_id": "D", "type": etype, "text": text, "sent_index": sent})
+    return ents
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark within-doc coref (legacy vs precomputed features)")
+    ap.add_argument("--mentions", type=int, default=100000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--shuffle-sents", action="store_true", help="Make sentence ordinals non-monotonic")
+    args = ap.parse_args(argv)
+    ents = synthetic_doc(args.mentions, args.seed, args.shuffle_sents)
+    t0 = time.perf_counter()
+    old = legacy_resolve_coref(ents)
+    t1 = time.perf_counter()
+    new = resolve_coref(ents)
+    t2 = time.perf_counter()
+    if old != new:
+        print("MISMATCH between legacy and new output")
+        return 1
+    resolved = sum(1 for m in new if m["coref_rule"] != "unresolved")
+    print(f"mentions={len(ents)} resolved={resolved} shuffle_sents={args.shuffle_sents}")
+    print(f"legacy  : {t1 - t0:8.3f} s ({len(ents) / (t1 - t0):10.0f} mentions/sec)")
+    print(f"features: {t2 - t1:8.3f} s ({len(ents) / (t2 - t1):10.0f} mentions/sec)")
+    print(f"speedup : {(t1 - t0) / (t2 - t1):.2f}x (outputs identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark NER throughput (chunks/sec): the legacy four-pass `simple_ner`
+against the compiled single-pass rule engine, called directly and through
+the public `simple_ner` wrapper.
+
+Usage: python tools/bench_er.py [--repeat N] [normalized_dir ...]
+
+Without directories, the normalize test fixtures are normalized into a
+temporary directory and used together with `normalized/` (if present).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from combo.er.api import simple_ner  # noqa: E402
+from combo.er.contracts import Entity, _sha16  # noqa: E402
+from combo.er.rules import DEFAULT_ENGINE  # noqa: E402
+from combo.io.shards import iter_normalized  # noqa: E402
+from combo.normalize.segment import normalize_dir  # noqa: E402
+
+
+def legacy_simple_ner(text: str, doc_id: str, chunk_id: str, source_sha1: str) -> List[Entity]:
+    """The pre-engine implementation, kept verbatim for comparison."""
+    ents: List[Entity] = []
+    email_pat = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+    url_pat = re.compile(r"https?://\S+|www\.\S+")
+    allcaps_pat = re.compile(r"\b[A-Z]{2,}\b")
+    proper_pat = re.compile(r"\b[A-Z][a-z]+\b")
+
+    def _add(span: Tuple[int, int], etype: str):
+        a, b = span
+        t = text[a:b]
+        eid = _sha16(f"{doc_id}|{chunk_id}|{a}|{b}|{t}")
+        ents.append(Entity(
+            id=eid, chunk_id=chunk_id, doc_id=doc_id, type=etype, text=t, start=a, end=b, conf=0.8, source_sha1=source_sha1
+        ))
+
+    for m in email_pat.finditer(text):
+        _add((m.start(), m.end()), "EMAIL")
+    for m in url_pat.finditer(text):
+        _add((m.start(), m.end()), "URL")
+    for m in allcaps_pat.finditer(text):
+        _add((m.start(), m.end()), "ORG")
+    for m in proper_pat.finditer(text):
+        _add((m.start(), m.end()), "PERSON")
+
+    seen = set()
+    uniq: List[Entity] = []
+    for e in sorted(ents, key=lambda e: (e.start, e.end, e.type)):
+        key = (e.start, e.end, e.type)
+        if key in seen:
+            continue
+        seen.add(key)
+        uniq.append(e)
+    return uniq
+
+
+def _load_chunks(dirs: List[str]) -> List[Tuple[str, str, str]]:
+    chunks: List[Tuple[str, str, str]] = []
+    for d in dirs:
+        for _ref, obj in iter_normalized(d):
+            doc_id = (obj.get("doc") or {}).get("doc_id") or ""
+            for ch in obj.get("chunks") or []:
+                chunks.append((doc_id, ch.get("chunk_id") or "", ch.get("text") or ""))
+    return chunks
+
+
+def _bench(fn: Callable[..., List[Entity]], chunks: List[Tuple[str, str, str]], repeat: int) -> Tuple[float, int]:
+    n_ents = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for doc_id, chunk_id, text in chunks:
+            n_ents += len(fn(text, doc_id, chunk_id, "x"))
+    dt = time.perf_counter() - t0
+    return (len(chunks) * repeat) / dt if dt > 0 else float("inf"), n_ents // repeat
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark NER chunks/sec (legacy vs compiled rules)")
+    ap.add_argument("dirs", nargs="*", help="Normalized directories (default: fixtures + normalized/)")
+    ap.add_argument("--repeat", type=int, default=20, help="Passes over the corpus per implementation")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dirs = list(args.dirs)
+        if not dirs:
+            normalize_dir(os.path.join(ROOT, "tests", "normalize", "fixtures"), tmp)
+            dirs.append(tmp)
+            if os.path.isdir(os.path.join(ROOT, "normalized")):
+                dirs.append(os.path.join(ROOT, "normalized"))
+        chunks = _load_chunks(dirs)
+    if not chunks:
+        print("No chunks found")
+        return 2
+    chars = sum(len(t) for _, _, t in chunks)
+    print(f"corpus: {len(chunks)} chunks, {chars} chars, repeat={args.repeat}")
+    legacy_rate, legacy_n = _bench(legacy_simple_ner, chunks, args.repeat)
+    engine_rate, engine_n = _bench(DEFAULT_ENGINE.extract, chunks, args.repeat)
+    api_rate, api_n = _bench(simple_ner, chunks, args.repeat)
+    print(f"legacy simple_ner : {legacy_rate:10.1f} chunks/sec ({legacy_n} entities)")
+    print(f"compiled engine   : {engine_rate:10.1f} chunks/sec ({engine_n} entities)")
+    print(f"simple_ner (api)  : {api_rate:10.1f} chunks/sec ({api_n} entities)")
+    print(f"speedup           : {engine_rate / legacy_rate:.2f}x (engine), {api_rate / legacy_rate:.2f}x (api)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())